@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark for smartwatch vitals ingestion and queries (vitals_store.py)
+
+Simulates members uploading 1 Hz heart rate, SpO2 and step samples in
+batches (a watch sync), with threshold alerts enabled and sealed chunks
+persisted to a temporary directory. Reports ingestion throughput against
+the 100k samples/s target, storage per sample, and the latency of rolling
+and downsampling queries over a day of data.
+
+Usage:
+    python benchmarks/bench_vitals_store.py [--members 20] [--hours 6] [--batch 600]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vitals_store import VitalsStore  # noqa: E402
+
+TARGET_SAMPLES_PER_SECOND = 100_000
+
+
+def member_day(rng, seconds, start_ms):
+    timestamps = start_ms + np.arange(seconds, dtype=np.int64) * 1000 + rng.integers(0, 50, seconds)
+    heart_rate = np.clip(72 + np.cumsum(rng.integers(-2, 3, seconds)), 45, 180)
+    spo2 = np.clip(97 + rng.integers(-1, 2, seconds), 90, 100)
+    steps = rng.poisson(1.2, seconds)
+    return timestamps, {"heart_rate": heart_rate, "spo2": spo2, "steps": steps}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--members", type=int, default=20)
+    parser.add_argument("--hours", type=float, default=6)
+    parser.add_argument("--batch", type=int, default=600, help="Samples per metric per upload")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    seconds = int(args.hours * 3600)
+    start_ms = 1_760_000_000_000
+    data = {f"member-{i}": member_day(rng, seconds, start_ms) for i in range(args.members)}
+
+    print("\n🚀 Vitals store benchmark")
+    print("=" * 72)
+    with tempfile.TemporaryDirectory() as tmp:
+        alerts = []
+        store = VitalsStore(tmp, on_alert=alerts.append)
+        total = 0
+        begin = time.perf_counter()
+        for offset in range(0, seconds, args.batch):
+            for member_id, (timestamps, metrics) in data.items():
+                ts = timestamps[offset:offset + args.batch]
+                for metric, values in metrics.items():
+                    accepted, _ = store.ingest(member_id, metric, ts, values[offset:offset + args.batch])
+                    total += accepted
+        elapsed = time.perf_counter() - begin
+        store.flush()
+
+        rate = total / elapsed
+        verdict = "✅" if rate >= TARGET_SAMPLES_PER_SECOND else "❌"
+        status = store.status()
+        disk = sum(p.stat().st_size for p in Path(tmp).glob("*.vts"))
+        print(f"\n📥 Ingested {total:,} samples in {elapsed:.2f}s: {rate:,.0f} samples/s {verdict} "
+              f"(target {TARGET_SAMPLES_PER_SECOND:,}; batches of {args.batch})")
+        print(f"💾 {status['bytesPerSample']} bytes/sample in memory, {disk / total:.2f} on disk "
+              f"(16 raw), {len(alerts)} alerts")
+
+        member = "member-0"
+        queries = {
+            "raw read (all)": lambda: store.read(member, "heart_rate"),
+            "rolling mean 5 min": lambda: store.rolling(member, "heart_rate", 300_000),
+            "rolling max 5 min": lambda: store.rolling(member, "heart_rate", 300_000, aggregate="max"),
+            "downsample 1 min": lambda: store.downsample(member, "heart_rate", 60_000),
+            "downsample 1 h": lambda: store.downsample(member, "steps", 3_600_000),
+        }
+        print(f"\n🔎 Queries over {seconds:,} samples of one member")
+        for label, query in queries.items():
+            query()
+            best = float("inf")
+            for _ in range(5):
+                t = time.perf_counter()
+                query()
+                best = min(best, time.perf_counter() - t)
+            print(f"   {label:<22} {best * 1000:8.2f} ms")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Versioned change log for the family health JSON collections.
+
+Every write to a collection is diffed against the last known snapshot and
+each added, updated or removed record is appended to the log with a new,
+monotonically increasing sequence number. Clients keep the last sequence
+number they have seen and ask only for newer changes (``?since=<seq>``),
+revalidate with ETags, or subscribe to the server-sent event stream.
+
+The log is persisted as append-only JSON lines so sequence numbers survive a
+restart; only the most recent ``max_changes`` entries are retained; clients
+asking for anything older receive a full reset instead of a delta.
+
+Several instances may share the data directory. Appends take an exclusive
+lock on ``<log>.lock`` and first read any entries other instances appended,
+so sequence numbers stay global, and ``refresh`` reloads a collection when
+its file's mtime or size changes. Edits made to a file outside the feed are
+logged as changes by whichever instance notices them first.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows - no advisory locks, assume a single instance
+    fcntl = None
+
+
+class ChangeFeed:
+    """
+    Collection snapshots plus a bounded, persisted change log.
+
+    Args:
+        log_file: JSON lines file the change log is appended to
+        max_changes: Number of changes kept for delta queries
+    """
+
+    def __init__(self, log_file, max_changes=1000):
+        self.log_file = Path(log_file)
+        self.lock_file = self.log_file.with_suffix(".lock")
+        self.max_changes = max_changes
+        self.seq = 0
+
+        self._changes = deque(maxlen=max_changes)
+        self._files = {}  # collection -> data file path
+        self._stamps = {}  # collection -> (mtime_ns, size) of the file its snapshot was read from
+        self._snapshots = {}  # collection -> {record key: record}
+        self._snapshot_seq = {}  # collection -> seq the snapshot is consistent with
+        self._positions = {}  # collection -> {record key: index}
+        self._collection_seq = {}  # collection -> seq of its latest change
+        self._serialized = {}  # (collection, encoder) -> (seq, body)
+        self._cond = threading.Condition()
+        self._log_lines = 0
+        self._log_offset = 0  # bytes of the log file already read
+        self._log_inode = None
+
+        with self._cond:
+            self._catch_up()
+
+    # --- persistence -----------------------------------------------------
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock shared with the other instances (caller holds self._cond)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, "a") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _catch_up(self):
+        """
+        Read log entries appended since the last read, by any instance.
+
+        Returns:
+            List of the entries that are new to this process
+        """
+        try:
+            stat = os.stat(self.log_file)
+        except FileNotFoundError:
+            return []
+        if stat.st_ino != self._log_inode or stat.st_size < self._log_offset:
+            # First read, or another instance compacted the log: read it all
+            self._log_inode = stat.st_ino
+            self._log_offset = 0
+            self._log_lines = 0
+            self._changes.clear()
+        if stat.st_size == self._log_offset:
+            return []
+
+        new = []
+        with open(self.log_file, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # being appended right now; read it next time
+                self._log_offset += len(line)
+                try:
+                    change = json.loads(line)
+                except ValueError:
+                    continue
+                self._log_lines += 1
+                self._changes.append(change)
+                self._collection_seq[change["collection"]] = max(
+                    self._collection_seq.get(change["collection"], 0), change["seq"]
+                )
+                if change["seq"] > self.seq:
+                    self.seq = change["seq"]
+                    new.append(change)
+        return new
+
+    def _append_log(self, changes):
+        # Caller holds the file lock and has caught up, so the file ends with our entries
+        with open(self.log_file, "a") as f:
+            f.write("".join(json.dumps(change) + "\n" for change in changes))
+        stat = os.stat(self.log_file)
+        self._log_inode, self._log_offset = stat.st_ino, stat.st_size
+        self._log_lines += len(changes)
+        if self._log_lines > 2 * self.max_changes:
+            self._compact_log()
+
+    def _compact_log(self):
+        tmp_path = self.log_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            for change in self._changes:
+                f.write(json.dumps(change) + "\n")
+        tmp_path.replace(self.log_file)
+        stat = os.stat(self.log_file)
+        self._log_inode, self._log_offset = stat.st_ino, stat.st_size
+        self._log_lines = len(self._changes)
+
+    def _file_stamp(self, collection):
+        try:
+            stat = os.stat(self._files[collection])
+        except (KeyError, OSError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    # --- writes ----------------------------------------------------------
+
+    @staticmethod
+    def _keyed(records):
+        """
+        Records by key: their id, or ``#<position>`` when a record has no id
+        or repeats an id already seen, so no record is ever collapsed.
+        """
+        keyed = {}
+        for i, record in enumerate(records):
+            key = str(record["id"]) if isinstance(record, dict) and "id" in record else None
+            if key is None or key in keyed:
+                key = f"#{i}"
+            keyed[key] = record
+        return keyed
+
+    def _set_snapshot(self, collection, keyed):
+        self._snapshots[collection] = keyed
+        self._positions[collection] = {key: i for i, key in enumerate(keyed)}
+        self._snapshot_seq[collection] = self.seq
+
+    def track(self, collection, path):
+        """Register a collection and the JSON file holding it, without logging changes"""
+        with self._cond:
+            self._files[collection] = Path(path)
+            stamp = self._file_stamp(collection)
+            with open(path, "r") as f:
+                records = json.load(f)
+            self._stamps[collection] = stamp
+            self._set_snapshot(collection, self._keyed(records))
+            self._collection_seq.setdefault(collection, self.seq)
+
+    def _sync(self, collection, records):
+        # Caller holds self._cond
+        with self._locked():
+            baseline = self._snapshot_seq.get(collection, self.seq)
+            self._catch_up()
+            # Latest change per record that other instances logged after our snapshot
+            logged = {
+                c["id"]: c for c in self._changes
+                if c["seq"] > baseline and c["collection"] == collection
+            }
+            previous = self._snapshots.get(collection, {})
+            current = self._keyed(records)
+
+            changes = []
+            for key, record in current.items():
+                if key not in previous:
+                    changes.append(("add", key, record))
+                elif previous[key] != record:
+                    changes.append(("update", key, record))
+            for key in previous:
+                if key not in current:
+                    changes.append(("delete", key, None))
+
+            entries = []
+            for op, key, record in changes:
+                seen = logged.get(key)
+                if seen is not None and seen["data"] == record:
+                    continue  # already logged by the instance that made it
+                self.seq += 1
+                entries.append({
+                    "seq": self.seq,
+                    "collection": collection,
+                    "op": op,
+                    "id": key,
+                    "data": record,
+                })
+            if entries:
+                self._changes.extend(entries)
+                self._collection_seq[collection] = self.seq
+                self._append_log(entries)
+
+            self._set_snapshot(collection, current)
+            if entries or self.seq > baseline:
+                self._cond.notify_all()
+            return entries
+
+    def record(self, collection, records):
+        """
+        Diff a collection's new contents against its snapshot and log the changes.
+
+        Args:
+            collection: Collection name (e.g. "family-members")
+            records: Full new list of records, as just written to disk
+
+        Returns:
+            List of change entries that were logged
+        """
+        with self._cond:
+            entries = self._sync(collection, records)
+            # Another instance may have written the file after us; re-read it
+            # on the next refresh rather than trusting its current stamp
+            self._stamps[collection] = None
+            return entries
+
+    def refresh(self, collection=None):
+        """
+        Pick up changes made by other instances or outside the feed.
+
+        Reads new log entries and reloads the collection's file (every
+        tracked collection by default) when its mtime or size changed.
+        """
+        collections = list(self._files) if collection is None else [collection]
+        with self._cond:
+            for name in collections:
+                stamp = self._file_stamp(name)
+                if stamp is not None and stamp == self._stamps.get(name):
+                    continue
+                try:
+                    with open(self._files[name], "r") as f:
+                        records = json.load(f)
+                except (KeyError, OSError, ValueError):
+                    continue  # missing or mid-write; keep serving the snapshot
+                self._sync(name, records)
+                self._stamps[name] = stamp
+            if collection is None:
+                seq = self.seq
+                self._catch_up()
+                if self.seq > seq:
+                    self._cond.notify_all()
+
+    # --- reads -----------------------------------------------------------
+
+    def collection_seq(self, collection):
+        """Sequence number of the latest change to a collection"""
+        with self._cond:
+            return self._collection_seq.get(collection, 0)
+
+    def items(self, collection):
+        with self._cond:
+            return list(self._snapshots.get(collection, {}).values())
+
+    def serialized(self, collection, encode=json.dumps):
+        """Encoded body of the whole collection, re-encoded only after it changes
+
+        Args:
+            collection: Collection name
+            encode: Encoder for the list of records (cached separately per encoder)
+        """
+        key = (collection, encode)
+        with self._cond:
+            seq = self._collection_seq.get(collection, 0)
+            cached = self._serialized.get(key)
+            if cached is None or cached[0] != seq:
+                body = encode(list(self._snapshots.get(collection, {}).values()))
+                cached = (seq, body)
+                self._serialized[key] = cached
+            return cached[1]
+
+    def page(self, collection, cursor=None, limit=50):
+        """
+        Keyset page over a collection in file order.
+
+        Cursors are ``<position>:<key>`` of the last record of the previous
+        page. The next page starts after that record; if it has been deleted
+        since, it starts at the position the record had, where the records
+        after it have moved up to, so a delete never breaks pagination.
+
+        Args:
+            collection: Collection name
+            cursor: Cursor returned with the previous page
+            limit: Maximum records to return
+
+        Returns:
+            Tuple of (records, next cursor or None)
+
+        Raises:
+            KeyError: for a malformed cursor
+        """
+        with self._cond:
+            snapshot = self._snapshots.get(collection, {})
+            positions = self._positions.get(collection, {})
+            keys = list(snapshot)
+            start = 0
+            if cursor is not None:
+                position, _, key = cursor.partition(":")
+                if not position.isdigit() or not key:
+                    raise KeyError(cursor)
+                start = positions[key] + 1 if key in positions else min(int(position), len(keys))
+            page_keys = keys[start:start + limit]
+            next_cursor = None
+            if start + limit < len(keys) and page_keys:
+                next_cursor = f"{start + len(page_keys) - 1}:{page_keys[-1]}"
+            return [snapshot[k] for k in page_keys], next_cursor
+
+    def changes_since(self, since, collection=None):
+        """
+        Changes newer than ``since``.
+
+        Returns:
+            Tuple of (changes, reset). ``reset`` is True when ``since`` is older
+            than the retained log and the caller has to re-fetch everything.
+        """
+        with self._cond:
+            oldest = self._changes[0]["seq"] if self._changes else self.seq + 1
+            reset = since < oldest - 1 and since < self.seq
+            changes = [
+                c for c in self._changes
+                if c["seq"] > since and (collection is None or c["collection"] == collection)
+            ]
+            return changes, reset
+
+    def wait(self, since, timeout):
+        """Block until a change newer than ``since`` exists or the timeout passes"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > since, timeout)
+            return self.seq
@@ -1,16 +1,28 @@
 import os
 import json
+import atexit
 import datetime
+import threading
 import time
-import schedule
+from contextlib import contextmanager
 from pathlib import Path
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
 
+try:
+    import fcntl
+except ImportError:  # Windows - no advisory locks, assume a single instance
+    fcntl = None
+
+from change_feed import ChangeFeed
+from reminder_scheduler import ReminderScheduler, member_timezone
+from serialization import ENCODERS, negotiated_mimetype, read_json, respond
+from vitals_store import AGGREGATES, METRIC_ALIASES, METRICS, VitalsStore
+
 # Load environment variables
 load_dotenv()
 
@@ -21,6 +33,10 @@ CORS(app)
 DATA_DIR = Path(os.path.dirname(os.path.abspath(__file__))) / "data"
 FAMILY_DATA_FILE = DATA_DIR / "family_members.json"
 NOTIFICATIONS_FILE = DATA_DIR / "notifications.json"
+SCHEDULER_STATE_FILE = DATA_DIR / "scheduler_state.json"
+SCHEDULER_LOCK_FILE = DATA_DIR / "scheduler.lock"
+CHANGE_LOG_FILE = DATA_DIR / "changes.jsonl"
+VITALS_DIR = DATA_DIR / "vitals"
 
 # Create data directory if it doesn't exist
 DATA_DIR.mkdir(exist_ok=True)
@@ -34,6 +50,16 @@ if not NOTIFICATIONS_FILE.exists():
     with open(NOTIFICATIONS_FILE, "w") as f:
         json.dump([], f)
 
+# Change feed: every save bumps a sequence number so clients can fetch deltas
+COLLECTIONS = {
+    FAMILY_DATA_FILE: "family-members",
+    NOTIFICATIONS_FILE: "notifications",
+}
+SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+# How often an open stream checks for changes written by other instances
+SSE_REFRESH_SECONDS = float(os.getenv("SSE_REFRESH_SECONDS", 2))
+change_feed = ChangeFeed(CHANGE_LOG_FILE, max_changes=int(os.getenv("CHANGE_LOG_SIZE", 1000)))
+
 # Email configuration
 EMAIL_SENDER = os.getenv("EMAIL_SENDER", "")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "")
@@ -46,9 +72,82 @@ def load_data(file_path):
         return json.load(f)
 
 def save_data(data, file_path):
-    """Save data to a JSON file"""
-    with open(file_path, "w") as f:
+    """Save data to a JSON file and record the changes in the change feed"""
+    # Swap in a complete file so unlocked readers never see a partial write
+    tmp_path = Path(file_path).with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w") as f:
         json.dump(data, f, indent=2)
+    os.replace(tmp_path, file_path)
+    collection = COLLECTIONS.get(Path(file_path))
+    if collection:
+        change_feed.record(collection, data)
+
+_data_locks = {path: threading.Lock() for path in COLLECTIONS}
+
+@contextmanager
+def modify_data(file_path):
+    """Read-modify-write a data file: yields its records and saves them on exit
+
+    Every change to a collection goes through here. The file stays locked
+    (a thread lock plus an fcntl lock on <file>.lock shared with the other
+    instances) from the read to the save, so concurrent writers never
+    overwrite each other's changes. Keep slow work such as email outside.
+    """
+    file_path = Path(file_path)
+    with _data_locks[file_path], open(file_path.with_suffix(".lock"), "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            data = load_data(file_path)
+            yield data
+            save_data(data, file_path)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+for _path, _collection in COLLECTIONS.items():
+    change_feed.track(_collection, _path)
+
+def collection_response(collection):
+    """Serve a collection as a full list, a delta (?since=<seq>) or a page (?limit=&cursor=)
+
+    Responses carry an ETag derived from the collection's sequence number, so
+    unchanged collections are answered with 304 without encoding anything.
+    Changes written by other instances are picked up first.
+    """
+    change_feed.refresh(collection)
+    mimetype = negotiated_mimetype()
+    tag = f"{collection}-{change_feed.collection_seq(collection)}"
+    if mimetype != "application/json":
+        tag += "-msgpack"  # distinct validator per representation
+    if tag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(tag)
+        return response
+
+    since = request.args.get("since", type=int)
+    limit = request.args.get("limit", type=int)
+
+    if since is not None:
+        changes, reset = change_feed.changes_since(since, collection)
+        payload = {"seq": change_feed.seq, "reset": reset, "changes": changes}
+        if reset:
+            payload["items"] = change_feed.items(collection)
+        response = respond(payload)
+    elif limit is not None:
+        if limit <= 0:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+        try:
+            items, next_cursor = change_feed.page(collection, request.args.get("cursor"), limit)
+        except KeyError:
+            return jsonify({"error": "Malformed cursor"}), 400
+        response = respond({"seq": change_feed.seq, "items": items, "nextCursor": next_cursor})
+    else:
+        response = Response(change_feed.serialized(collection, ENCODERS[mimetype]), mimetype=mimetype)
+        response.vary.add("Accept")
+
+    response.set_etag(tag)
+    return response
 
 def send_email_notification(subject, message):
     """Send an email notification"""
@@ -76,13 +175,30 @@ def send_email_notification(subject, message):
         print(f"Failed to send email: {e}")
         return False
 
-def check_upcoming_events():
-    """Check for upcoming health events and send notifications"""
+def check_upcoming_events(member_ids=None, today=None):
+    """Check for upcoming health events and send notifications
+
+    Args:
+        member_ids: Only check these members (defaults to everyone)
+        today: Date to count days from, in the members' local timezone
+
+    Returns:
+        Set of member ids with a reminder email that could not be sent; the
+        notification stays "pending" and is re-sent on the next run
+
+    Emails are sent without holding the notifications lock; each result is
+    then merged into the current file, so alerts stored meanwhile are kept.
+    """
     family_members = load_data(FAMILY_DATA_FILE)
-    notifications = load_data(NOTIFICATIONS_FILE)
-    today = datetime.datetime.now().date()
+    notifications = {n["id"]: n for n in load_data(NOTIFICATIONS_FILE)}
+    if today is None:
+        today = datetime.datetime.now().date()
+    email_configured = bool(EMAIL_SENDER and EMAIL_PASSWORD and EMAIL_RECIPIENT)
+    failed = set()
     
     for member in family_members:
+        if member_ids is not None and member.get("id") not in member_ids:
+            continue
         if "upcomingEvents" in member and member["upcomingEvents"]:
             for event in member["upcomingEvents"]:
                 event_date = datetime.datetime.strptime(event["date"], "%Y-%m-%d").date()
@@ -93,22 +209,27 @@ def check_upcoming_events():
                     notification_id = f"{member['id']}_{event['title']}_{event['date']}"
                     
                     # Check if we've already sent a notification for this event
-                    if not any(n["id"] == notification_id for n in notifications):
-                        # Create notification
-                        notification = {
-                            "id": notification_id,
-                            "memberId": member["id"],
-                            "memberName": member["name"],
-                            "eventTitle": event["title"],
-                            "eventDate": event["date"],
-                            "daysUntil": days_until,
-                            "notifiedAt": datetime.datetime.now().isoformat(),
-                            "status": "pending"
-                        }
-                        
-                        # Send email notification
-                        subject = f"Health Reminder: {event['title']} for {member['name']}"
-                        message = f"""Hello,
+                    existing = notifications.get(notification_id)
+                    if existing is not None and existing.get("status") == "sent":
+                        continue
+                    if existing is not None and not email_configured:
+                        continue
+
+                    # Create notification (or retry one whose email failed)
+                    notification = dict(existing) if existing else {
+                        "id": notification_id,
+                        "memberId": member["id"],
+                        "memberName": member["name"],
+                        "eventTitle": event["title"],
+                        "eventDate": event["date"],
+                        "daysUntil": days_until,
+                        "notifiedAt": datetime.datetime.now().isoformat(),
+                        "status": "pending"
+                    }
+                    
+                    # Send email notification
+                    subject = f"Health Reminder: {event['title']} for {member['name']}"
+                    message = f"""Hello,
 
 This is a reminder that {member['name']} has {event['title']} scheduled in {days_until} days on {event['date']}.
 
@@ -117,83 +238,288 @@ Please make sure to prepare accordingly.
 Best regards,
 SwasThAI Health Assistant
 """
-                        
-                        if send_email_notification(subject, message):
-                            notification["status"] = "sent"
-                        
-                        notifications.append(notification)
-                        save_data(notifications, NOTIFICATIONS_FILE)
-                        print(f"Notification created for {member['name']}'s {event['title']}")
+                    
+                    if send_email_notification(subject, message):
+                        notification["status"] = "sent"
+                    elif email_configured:
+                        failed.add(member["id"])
+                    
+                    with modify_data(NOTIFICATIONS_FILE) as current:
+                        stored = next((n for n in current if n["id"] == notification_id), None)
+                        if stored is None:
+                            current.append(notification)
+                        elif notification["status"] == "sent":
+                            stored["status"] = "sent"
+                    notifications[notification_id] = notification
+                    print(f"Notification created for {member['name']}'s {event['title']}")
+    return failed
+
+# Smartwatch vitals: threshold alerts become notifications like event reminders
+def record_vitals_alert(alert):
+    """Store a vitals alert as a notification and send the email"""
+    members = {m.get("id"): m for m in load_data(FAMILY_DATA_FILE)}
+    member = members.get(alert["memberId"], {"id": alert["memberId"]})
+    name = member.get("name", alert["memberId"])
+    at = datetime.datetime.fromtimestamp(alert["at"] / 1000, tz=member_timezone(member))
+    notification = {
+        "id": f"{alert['memberId']}_{alert['rule']}_{alert['at']}",
+        "type": "vitals",
+        "memberId": alert["memberId"],
+        "memberName": name,
+        "eventTitle": alert["label"],
+        "eventDate": at.date().isoformat(),
+        "metric": alert["metric"],
+        "value": alert["value"],
+        "threshold": alert["threshold"],
+        "unit": alert["unit"],
+        "measuredAt": at.isoformat(),
+        "notifiedAt": datetime.datetime.now().isoformat(),
+        "status": "pending"
+    }
+
+    subject = f"Health Alert: {alert['label']} for {name}"
+    message = f"""Hello,
+
+{name}'s {alert['metric'].replace('_', ' ')} averaged {alert['value']} {alert['unit']} over {alert['windowSeconds']} seconds at {at:%Y-%m-%d %H:%M}, {alert['direction']} the alert threshold of {alert['threshold']} {alert['unit']}.
+
+Please check on them and seek medical advice if this persists.
+
+Best regards,
+SwasThAI Health Assistant
+"""
+
+    if send_email_notification(subject, message):
+        notification["status"] = "sent"
+
+    with modify_data(NOTIFICATIONS_FILE) as notifications:
+        notifications.append(notification)
+    print(f"Vitals alert for {name}: {alert['label']} ({alert['value']} {alert['unit']})")
+
+def _on_vitals_alert(alert):
+    # Email delivery is slow; keep it off the ingestion request
+    threading.Thread(target=record_vitals_alert, args=(alert,), daemon=True).start()
+
+vitals_store = VitalsStore(VITALS_DIR, on_alert=_on_vitals_alert)
+atexit.register(vitals_store.flush)
+
+def _to_millis(value):
+    """Epoch milliseconds from a number or an ISO 8601 string"""
+    if isinstance(value, str):
+        stamp = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if stamp.tzinfo is None:
+            stamp = stamp.astimezone()
+        return int(stamp.timestamp() * 1000)
+    return int(value)
+
+def _time_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    return int(value) if value.isdigit() else _to_millis(value)
 
 # API Routes
 @app.route("/api/family-members", methods=["GET"])
 def get_family_members():
-    """Get all family members"""
-    family_members = load_data(FAMILY_DATA_FILE)
-    return jsonify(family_members)
+    """Get all family members (supports ?since=, ?limit=&cursor= and ETags)"""
+    return collection_response("family-members")
 
 @app.route("/api/family-members", methods=["POST"])
 def add_family_member():
     """Add a new family member"""
-    family_members = load_data(FAMILY_DATA_FILE)
-    new_member = request.json
+    new_member = read_json()
+    if not isinstance(new_member, dict):
+        return jsonify({"error": "Request body must be a JSON or MessagePack object"}), 400
     
     # Ensure the new member has an ID
     if "id" not in new_member:
         new_member["id"] = str(int(time.time() * 1000))
     
-    family_members.append(new_member)
-    save_data(family_members, FAMILY_DATA_FILE)
+    with modify_data(FAMILY_DATA_FILE) as family_members:
+        family_members.append(new_member)
+    _sync_scheduler()
     
     return jsonify(new_member), 201
 
 @app.route("/api/family-members/<member_id>", methods=["PUT"])
 def update_family_member(member_id):
     """Update a family member"""
-    family_members = load_data(FAMILY_DATA_FILE)
-    updated_member = request.json
+    updated_member = read_json()
+    if not isinstance(updated_member, dict):
+        return jsonify({"error": "Request body must be a JSON or MessagePack object"}), 400
     
-    for i, member in enumerate(family_members):
-        if member["id"] == member_id:
-            family_members[i] = updated_member
-            save_data(family_members, FAMILY_DATA_FILE)
-            return jsonify(updated_member)
+    found = False
+    with modify_data(FAMILY_DATA_FILE) as family_members:
+        for i, member in enumerate(family_members):
+            if member["id"] == member_id:
+                family_members[i] = updated_member
+                found = True
+                break
+    if not found:
+        return jsonify({"error": "Family member not found"}), 404
     
-    return jsonify({"error": "Family member not found"}), 404
+    _sync_scheduler()
+    return jsonify(updated_member)
 
 @app.route("/api/family-members/<member_id>", methods=["DELETE"])
 def delete_family_member(member_id):
     """Delete a family member"""
-    family_members = load_data(FAMILY_DATA_FILE)
-    
-    for i, member in enumerate(family_members):
-        if member["id"] == member_id:
-            del family_members[i]
-            save_data(family_members, FAMILY_DATA_FILE)
-            return jsonify({"message": "Family member deleted"})
+    found = False
+    with modify_data(FAMILY_DATA_FILE) as family_members:
+        for i, member in enumerate(family_members):
+            if member["id"] == member_id:
+                del family_members[i]
+                found = True
+                break
+    if not found:
+        return jsonify({"error": "Family member not found"}), 404
     
-    return jsonify({"error": "Family member not found"}), 404
+    _sync_scheduler()
+    return jsonify({"message": "Family member deleted"})
 
 @app.route("/api/notifications", methods=["GET"])
 def get_notifications():
-    """Get all notifications"""
-    notifications = load_data(NOTIFICATIONS_FILE)
-    return jsonify(notifications)
+    """Get all notifications (supports ?since=, ?limit=&cursor= and ETags)"""
+    return collection_response("notifications")
+
+@app.route("/api/changes/stream", methods=["GET"])
+def stream_changes():
+    """Server-sent event stream of changes to all collections
+
+    Resumes from ?since=<seq> or the Last-Event-ID header; defaults to "now".
+    """
+    change_feed.refresh()
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = request.args.get("since", default=change_feed.seq, type=int)
+
+    def generate():
+        cursor = since
+        yield f"event: hello\ndata: {json.dumps({'seq': change_feed.seq})}\n\n"
+        idle_since = time.monotonic()
+        while True:
+            changes, reset = change_feed.changes_since(cursor)
+            if reset:
+                cursor = change_feed.seq
+                yield f"event: reset\ndata: {json.dumps({'seq': cursor})}\n\n"
+                continue
+            for change in changes:
+                cursor = change["seq"]
+                yield f"id: {cursor}\nevent: change\ndata: {json.dumps(change)}\n\n"
+                idle_since = time.monotonic()
+            if change_feed.wait(cursor, SSE_REFRESH_SECONDS) <= cursor:
+                change_feed.refresh()
+                if time.monotonic() - idle_since >= SSE_HEARTBEAT_SECONDS:
+                    yield ": keep-alive\n\n"
+                    idle_since = time.monotonic()
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/api/vitals/<member_id>", methods=["POST"])
+def ingest_vitals(member_id):
+    """Ingest smartwatch samples for a member
+
+    Body (JSON or MessagePack), columnar:
+        {"t": [ms or ISO, ...], "heartRate": [...], "spo2": [...], "steps": [...]}
+    or one record per sample:
+        {"samples": [{"timestamp": ..., "heartRate": 72, "spo2": 98}, ...]}
+    """
+    body = read_json()
+    if not isinstance(body, dict):
+        return jsonify({"error": "Request body must be a JSON or MessagePack object"}), 400
+    try:
+        if isinstance(body.get("samples"), list):
+            columns = {"t": []}
+            metrics = {METRIC_ALIASES.get(k, k) for sample in body["samples"] for k in sample} & set(METRICS)
+            for metric in metrics:
+                columns[metric] = []
+            for sample in body["samples"]:
+                columns["t"].append(_to_millis(sample.get("t", sample.get("timestamp"))))
+                values = {METRIC_ALIASES.get(k, k): v for k, v in sample.items()}
+                for metric in metrics:
+                    columns[metric].append(values.get(metric))
+        else:
+            columns = {METRIC_ALIASES.get(k, k): v for k, v in body.items()}
+            timestamps = columns.pop("timestamp", None)
+            columns["t"] = [_to_millis(v) for v in columns.get("t", timestamps) or []]
+        unknown = set(columns) - set(METRICS) - {"t"}
+        if unknown:
+            return jsonify({"error": f"Unknown metrics: {', '.join(sorted(unknown))}"}), 400
+        accepted, alerts = vitals_store.ingest_columns(member_id, columns)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid samples: {e}"}), 400
+    return jsonify({"accepted": accepted, "alerts": alerts})
+
+@app.route("/api/vitals/<member_id>/<metric>", methods=["GET"])
+def query_vitals(member_id, metric):
+    """Query a member's vitals
+
+    ?start=&end= (ms or ISO) bound the range; ?bucket=<seconds> downsamples
+    (mean/min/max/sum/count per bucket); ?window=<seconds>&agg=mean|min|max|sum
+    returns a trailing rolling aggregate at every sample; otherwise raw samples.
+    """
+    metric = METRIC_ALIASES.get(metric, metric)
+    if metric not in METRICS:
+        return jsonify({"error": f"Unknown metric '{metric}'"}), 404
+    try:
+        start, end = _time_arg("start"), _time_arg("end")
+    except ValueError:
+        return jsonify({"error": "start/end must be epoch milliseconds or ISO 8601"}), 400
+    bucket = request.args.get("bucket", type=float)
+    window = request.args.get("window", type=float)
+    aggregate = request.args.get("agg", "mean")
+
+    if bucket:
+        result = vitals_store.downsample(member_id, metric, int(bucket * 1000), start, end)
+    elif window:
+        if aggregate not in AGGREGATES:
+            return jsonify({"error": f"agg must be one of {', '.join(AGGREGATES)}"}), 400
+        result = vitals_store.rolling(member_id, metric, int(window * 1000), start, end, aggregate)
+    else:
+        timestamps, values = vitals_store.read(member_id, metric, start, end)
+        result = {"t": timestamps, "value": values}
+    payload = {key: column.tolist() for key, column in result.items()}
+    payload.update({"memberId": member_id, "metric": metric, "unit": METRICS[metric]["unit"]})
+    return respond(payload)
+
+@app.route("/api/vitals/status", methods=["GET"])
+def get_vitals_status():
+    """Series, samples and storage of the vitals store"""
+    return jsonify(vitals_store.status())
+
+@app.route("/api/scheduler/status", methods=["GET"])
+def get_scheduler_status():
+    """Get leader state and the next reminder run for each member"""
+    if reminder_scheduler is None:
+        return jsonify({"error": "Scheduler is not running"}), 503
+    return jsonify(reminder_scheduler.status())
+
+# Reminder scheduler: one daily job per member, delivered inside the
+# member's timezone window (see reminder_scheduler.py)
+reminder_scheduler = None
+
+def _sync_scheduler():
+    """Pick up family member changes in the reminder schedule"""
+    if reminder_scheduler is not None:
+        reminder_scheduler.sync()
 
-# Schedule the notification check to run every day at 8:00 AM
 def start_scheduler():
-    schedule.every().day.at("08:00").do(check_upcoming_events)
-    
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Sleep for 1 minute between checks
+    global reminder_scheduler
+    reminder_scheduler = ReminderScheduler(
+        load_members=lambda: load_data(FAMILY_DATA_FILE),
+        run_reminders=check_upcoming_events,
+        state_file=SCHEDULER_STATE_FILE,
+        lock_file=SCHEDULER_LOCK_FILE,
+        members_file=FAMILY_DATA_FILE,
+    )
+    return reminder_scheduler.start()
 
 if __name__ == "__main__":
-    # Start the scheduler in a separate thread
-    import threading
-    scheduler_thread = threading.Thread(target=start_scheduler)
-    scheduler_thread.daemon = True
-    scheduler_thread.start()
+    # Start the scheduler in a background thread
+    start_scheduler()
     
     # Start the Flask app
     app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,379 @@
+"""
+Event-driven reminder scheduler for the family health service.
+
+Jobs are kept in a min-heap ordered by their next due time and the worker
+thread sleeps until the earliest one is due (or until it is woken because the
+schedule changed), instead of polling every minute.
+
+Each family member gets one daily reminder job that is delivered inside the
+member's own timezone window (``timezone`` and ``reminderWindow`` fields on the
+member record). The time of the last successful run is persisted so that runs
+missed while the process was down are caught up at the next opportunity inside
+the delivery window, and an exclusive file lock elects a single leader so that
+several instances sharing the data directory never send duplicate emails.
+"""
+
+import datetime
+import heapq
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = Exception
+
+try:
+    import fcntl
+except ImportError:  # Windows - no advisory locks, every instance is leader
+    fcntl = None
+
+DEFAULT_WINDOW_START = os.getenv("REMINDER_WINDOW_START", "08:00")
+DEFAULT_WINDOW_END = os.getenv("REMINDER_WINDOW_END", "20:00")
+DEFAULT_TIMEZONE = os.getenv("REMINDER_TIMEZONE", "")
+
+# How often a non-leader instance retries to take over the lock
+LEADER_RETRY_SECONDS = int(os.getenv("SCHEDULER_LEADER_RETRY", 30))
+# Backoff for members whose reminder run failed (doubles per failure)
+RETRY_SECONDS = int(os.getenv("REMINDER_RETRY_SECONDS", 300))
+RETRY_MAX_SECONDS = int(os.getenv("REMINDER_RETRY_MAX_SECONDS", 3600))
+# How often the leader checks the member file for changes made elsewhere
+MEMBERS_RECHECK_SECONDS = int(os.getenv("SCHEDULER_MEMBERS_RECHECK", 60))
+
+
+def _parse_hhmm(value, fallback=datetime.time(8, 0)):
+    """Parse an "HH:MM" string into a datetime.time"""
+    try:
+        hours, minutes = str(value).split(":")
+        return datetime.time(int(hours), int(minutes))
+    except (ValueError, TypeError):
+        return fallback
+
+
+def member_timezone(member):
+    """Resolve the tzinfo for a member, falling back to the process local zone"""
+    name = member.get("timezone") or DEFAULT_TIMEZONE
+    if name and ZoneInfo is not None:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            print(f"Unknown timezone '{name}' for member {member.get('id')}, using local time")
+    return datetime.datetime.now().astimezone().tzinfo
+
+
+def delivery_window(member):
+    """Return the (start, end) local delivery times for a member"""
+    window = member.get("reminderWindow") or {}
+    default_start = _parse_hhmm(DEFAULT_WINDOW_START)
+    default_end = _parse_hhmm(DEFAULT_WINDOW_END, datetime.time(20, 0))
+    start = _parse_hhmm(window.get("start"), default_start)
+    end = _parse_hhmm(window.get("end"), default_end)
+    if end <= start:
+        end = datetime.time(23, 59)
+    return start, end
+
+
+def next_due(member, last_run, now):
+    """
+    Compute when the reminder job for a member should next run.
+
+    Args:
+        member: Family member record
+        last_run: Aware datetime of the last completed run, or None
+        now: Aware datetime used as "now"
+
+    Returns:
+        Tuple of (aware due datetime, local date the run is for)
+    """
+    tz = member_timezone(member)
+    start, end = delivery_window(member)
+    local_now = now.astimezone(tz)
+    today = local_now.date()
+
+    window_start = datetime.datetime.combine(today, start, tzinfo=tz)
+    window_end = datetime.datetime.combine(today, end, tzinfo=tz)
+    tomorrow = today + datetime.timedelta(days=1)
+    tomorrow_start = datetime.datetime.combine(tomorrow, start, tzinfo=tz)
+
+    if last_run is not None and last_run >= window_start:
+        # Today's run is done
+        return tomorrow_start, tomorrow
+    if local_now < window_start:
+        return window_start, today
+    if local_now <= window_end:
+        # Missed (or exactly at) today's slot but still inside the window: catch up now
+        return now, today
+    # Window already closed today - don't email at odd hours, wait for tomorrow
+    return tomorrow_start, tomorrow
+
+
+class LeaderLock:
+    """Non-blocking exclusive lock on a file shared by all scheduler instances"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._handle = None
+
+    @property
+    def held(self):
+        return self._handle is not None
+
+    def try_acquire(self):
+        if self._handle is not None:
+            return True
+        if fcntl is None:
+            self._handle = True
+            return True
+        handle = open(self.path, "a+")
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(f"{os.getpid()}\n")
+        handle.flush()
+        self._handle = handle
+        return True
+
+    def release(self):
+        if self._handle is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+            self._handle.close()
+        self._handle = None
+
+
+class ReminderScheduler:
+    """
+    Priority-queue scheduler running one daily reminder job per family member.
+
+    Args:
+        load_members: Callable returning the current list of member records
+        run_reminders: Callable(member_ids, today) that performs the reminder
+            check and returns the ids of members whose run failed (raising
+            fails all of them); failed members are retried with backoff
+        state_file: JSON file used to persist the last run time of each job
+        lock_file: File used for leader election between instances
+        members_file: File ``load_members`` reads; when given, the leader
+            reloads the members whenever it changes
+    """
+
+    def __init__(self, load_members, run_reminders, state_file, lock_file, members_file=None):
+        self.load_members = load_members
+        self.run_reminders = run_reminders
+        self.state_file = Path(state_file)
+        self.members_file = Path(members_file) if members_file is not None else None
+        self.lock = LeaderLock(lock_file)
+
+        self._heap = []
+        self._due = {}  # member_id -> (due timestamp, local date)
+        self._members = {}
+        self._members_stamp = None  # (mtime_ns, size) of members_file when last loaded
+        self._failures = {}  # member_id -> consecutive failed runs
+        self._last_run = self._load_state()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    # --- persistence -----------------------------------------------------
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, "r") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        state = {}
+        for member_id, stamp in raw.get("lastRun", {}).items():
+            try:
+                state[member_id] = datetime.datetime.fromisoformat(stamp)
+            except (TypeError, ValueError):
+                continue
+        return state
+
+    def _save_state(self):
+        payload = {"lastRun": {k: v.isoformat() for k, v in self._last_run.items()}}
+        tmp_path = self.state_file.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    # --- scheduling ------------------------------------------------------
+
+    def _push(self, member, now):
+        member_id = member["id"]
+        due, local_date = next_due(member, self._last_run.get(member_id), now)
+        entry = (due.timestamp(), local_date)
+        self._due[member_id] = entry
+        heapq.heappush(self._heap, (entry[0], member_id))
+
+    def _members_file_stamp(self):
+        try:
+            stat = os.stat(self.members_file)
+        except (OSError, TypeError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_members(self):
+        """Current members by id, or None when the file can't be read right now"""
+        stamp = self._members_file_stamp()
+        try:
+            records = self.load_members()
+        except (OSError, ValueError) as e:
+            print(f"Could not load family members for the scheduler: {e}")
+            return None
+        self._members_stamp = stamp
+        return {m["id"]: m for m in records if "id" in m}
+
+    def _reconcile(self, members, now):
+        # Caller holds self._cond
+        for member_id in list(self._due):
+            if member_id not in members:
+                del self._due[member_id]
+                self._last_run.pop(member_id, None)
+                self._failures.pop(member_id, None)
+        for member_id, member in members.items():
+            previous = self._members.get(member_id)
+            if member_id not in self._due or previous != member:
+                self._push(member, now)
+        self._members = members
+
+    def sync(self):
+        """Reconcile the job queue with the current family member list"""
+        members = self._load_members()
+        if members is None:
+            return
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._cond:
+            self._reconcile(members, now)
+            self._cond.notify()
+
+    def _refresh_members(self):
+        """Pick up member changes written by other instances (caller holds self._cond)"""
+        if self.members_file is None or self._members_file_stamp() == self._members_stamp:
+            return
+        members = self._load_members()
+        if members is not None:
+            self._reconcile(members, datetime.datetime.now(datetime.timezone.utc))
+
+    def _reload_after_election(self):
+        """Re-read run state and members written while another instance led, and rebuild the queue"""
+        self._last_run = self._load_state()
+        self._failures = {}
+        self._heap = []
+        self._due = {}
+        members = self._load_members()
+        if members is not None:
+            self._members = members
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for member in self._members.values():
+            self._push(member, now)
+
+    def _pop_due(self, now_ts):
+        """Pop every job that is due, skipping stale heap entries"""
+        ready = []
+        while self._heap and self._heap[0][0] <= now_ts:
+            due_ts, member_id = heapq.heappop(self._heap)
+            entry = self._due.get(member_id)
+            if entry is None or entry[0] != due_ts:
+                continue  # rescheduled or removed since it was pushed
+            ready.append((member_id, entry[1]))
+        return ready
+
+    def _run_ready(self, ready):
+        by_date = {}
+        for member_id, local_date in ready:
+            by_date.setdefault(local_date, []).append(member_id)
+
+        failed = set()
+        for local_date, member_ids in by_date.items():
+            try:
+                failed.update(self.run_reminders(member_ids, local_date) or ())
+            except Exception as e:
+                print(f"Reminder job failed for {member_ids}: {e}")
+                failed.update(member_ids)
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._cond:
+            for member_id, _ in ready:
+                member = self._members.get(member_id)
+                if member_id in failed:
+                    # Not marked as run: retry later today (or in tomorrow's window)
+                    attempts = self._failures.get(member_id, 0) + 1
+                    self._failures[member_id] = attempts
+                    delay = min(RETRY_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+                    if member is not None:
+                        self._push(member, now + datetime.timedelta(seconds=delay))
+                    continue
+                self._failures.pop(member_id, None)
+                self._last_run[member_id] = now
+                if member is not None:
+                    self._push(member, now)
+            self._save_state()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    break
+                if not self.lock.held:
+                    if not self.lock.try_acquire():
+                        # Another instance is leader; check back later
+                        self._cond.wait(LEADER_RETRY_SECONDS)
+                        continue
+                    self._reload_after_election()
+                else:
+                    self._refresh_members()
+                now_ts = time.time()
+                ready = self._pop_due(now_ts)
+                if not ready:
+                    timeout = self._heap[0][0] - now_ts if self._heap else None
+                    if self.members_file is not None and (timeout is None or timeout > MEMBERS_RECHECK_SECONDS):
+                        timeout = MEMBERS_RECHECK_SECONDS
+                    self._cond.wait(timeout)
+                    continue
+            self._run_ready(ready)
+        self.lock.release()
+
+    # --- lifecycle -------------------------------------------------------
+
+    def start(self):
+        self.sync()
+        self._thread = threading.Thread(target=self._loop, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self):
+        with self._cond:
+            upcoming = sorted(
+                (due_ts, member_id) for member_id, (due_ts, _) in self._due.items()
+            )
+            return {
+                "leader": self.lock.held,
+                "jobs": [
+                    {
+                        "memberId": member_id,
+                        "nextRun": datetime.datetime.fromtimestamp(
+                            due_ts, datetime.timezone.utc
+                        ).isoformat(),
+                        "lastRun": self._last_run[member_id].isoformat()
+                        if member_id in self._last_run else None,
+                        "failedRuns": self._failures.get(member_id, 0),
+                    }
+                    for due_ts, member_id in upcoming
+                ],
+            }
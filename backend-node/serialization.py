@@ -0,0 +1,70 @@
+"""
+JSON/MessagePack encoding with content negotiation for the scheduler API.
+
+Responses are encoded with orjson when it is installed (falling back to the
+stdlib encoder) and as ``application/msgpack`` when the client's Accept
+header prefers it. Request bodies may be sent as JSON or MessagePack. This
+service pins Flask 2.0, which has no pluggable JSON provider, so routes that
+return large payloads call ``respond()`` instead of ``jsonify()``.
+"""
+
+import json
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/msgpack"
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, "application/x-msgpack")
+
+
+def dumps(obj):
+    """Encode obj as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def packb(obj):
+    """Encode obj as MessagePack bytes"""
+    if msgpack is None:
+        raise RuntimeError("MessagePack support requires the msgpack package")
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+ENCODERS = {JSON_MIMETYPE: dumps, MSGPACK_MIMETYPE: packb}
+
+
+def negotiated_mimetype():
+    """JSON or MessagePack, whichever the current request's Accept header prefers"""
+    if msgpack is None:
+        return JSON_MIMETYPE
+    best = request.accept_mimetypes.best_match((JSON_MIMETYPE,) + MSGPACK_MIMETYPES)
+    return MSGPACK_MIMETYPE if best in MSGPACK_MIMETYPES else JSON_MIMETYPE
+
+
+def respond(obj, status=200):
+    """Build a response for obj in the negotiated format"""
+    mimetype = negotiated_mimetype()
+    response = Response(ENCODERS[mimetype](obj), status=status, mimetype=mimetype)
+    response.vary.add("Accept")
+    return response
+
+
+def read_json():
+    """Request body as JSON or MessagePack (by Content-Type); None if unreadable"""
+    if request.mimetype in MSGPACK_MIMETYPES and msgpack is not None:
+        try:
+            return msgpack.unpackb(request.get_data(), raw=False)
+        except Exception:
+            return None
+    return request.get_json(silent=True)
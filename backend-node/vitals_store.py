@@ -0,0 +1,472 @@
+"""
+Compact time-series store for smartwatch vitals.
+
+Samples (heart rate, SpO2, steps) are kept per family member and metric in
+columnar chunks. New samples go into a fixed-size NumPy append buffer; when
+it fills up it is sorted by time and sealed into an immutable ``Chunk``
+holding:
+
+- timestamp deltas in the smallest unsigned integer type that fits
+  (2 bytes per sample for 1 Hz data, deltas being in milliseconds);
+- value deltas in the smallest signed integer type (heart rate and SpO2
+  change by a few units between samples, so usually 1 byte).
+
+A 16-byte raw sample thus takes about 3 bytes. Decoding a chunk is two
+cumsums. Sealed chunks are appended to one file per series under ``data_dir``, so
+only the open buffer (at most ``chunk_size`` samples per series) is lost if
+the process dies; ``flush()`` seals and persists it.
+
+Queries are vectorized over the decoded arrays: downsampling with
+``ufunc.reduceat`` over time buckets, trailing time-window rolling
+aggregates with prefix sums (sum/mean/count) or a sparse table (min/max).
+Threshold rules (e.g. mean heart rate above 120 over a minute) are checked
+against every ingested batch, and breaches are passed to an ``on_alert``
+callback with a per-member cooldown.
+"""
+
+import os
+import struct
+import threading
+from collections import namedtuple
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+METRICS = {
+    "heart_rate": {"unit": "bpm", "min": 20, "max": 250},
+    "spo2": {"unit": "%", "min": 50, "max": 100},
+    "steps": {"unit": "steps", "min": 0, "max": 100000},
+}
+METRIC_ALIASES = {"heartRate": "heart_rate", "hr": "heart_rate", "spO2": "spo2", "SpO2": "spo2"}
+
+Threshold = namedtuple("Threshold", "name metric direction value window_ms min_samples label")
+
+DEFAULT_THRESHOLDS = (
+    Threshold("high_heart_rate", "heart_rate", "above", 120, 60_000, 5, "High heart rate"),
+    Threshold("low_heart_rate", "heart_rate", "below", 40, 60_000, 5, "Low heart rate"),
+    Threshold("low_spo2", "spo2", "below", 92, 60_000, 3, "Low blood oxygen"),
+)
+
+AGGREGATES = ("mean", "min", "max", "sum", "count")
+CHUNK_SIZE = int(os.getenv("VITALS_CHUNK_SIZE", 4096))
+ALERT_COOLDOWN_MS = int(os.getenv("VITALS_ALERT_COOLDOWN", 900)) * 1000
+
+_TS_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+_VALUE_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+_HEADER = struct.Struct("<qqI2s")  # start, first value, count, dtype chars
+
+
+def _narrow(deltas, dtypes):
+    """Cast deltas to the first dtype in dtypes that holds all of them"""
+    if len(deltas):
+        low, high = deltas.min(), deltas.max()
+        for dtype in dtypes:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return deltas.astype(dtype)
+    return deltas.astype(dtypes[0])
+
+
+class Chunk:
+    """An immutable, delta-encoded block of time-sorted samples"""
+
+    __slots__ = ("start", "end", "count", "first_value", "ts_deltas", "value_deltas")
+
+    def __init__(self, start, end, count, first_value, ts_deltas, value_deltas):
+        self.start = start
+        self.end = end
+        self.count = count
+        self.first_value = first_value
+        self.ts_deltas = ts_deltas
+        self.value_deltas = value_deltas
+
+    @classmethod
+    def encode(cls, timestamps, values):
+        """Encode int64 arrays sorted by timestamp"""
+        return cls(
+            int(timestamps[0]), int(timestamps[-1]), len(timestamps), int(values[0]),
+            _narrow(np.diff(timestamps), _TS_DTYPES), _narrow(np.diff(values), _VALUE_DTYPES),
+        )
+
+    def decode(self):
+        timestamps = np.empty(self.count, dtype=np.int64)
+        values = np.empty(self.count, dtype=np.int64)
+        timestamps[0], values[0] = self.start, self.first_value
+        np.cumsum(self.ts_deltas, dtype=np.int64, out=timestamps[1:])
+        np.cumsum(self.value_deltas, dtype=np.int64, out=values[1:])
+        timestamps[1:] += self.start
+        values[1:] += self.first_value
+        return timestamps, values
+
+    @property
+    def nbytes(self):
+        return _HEADER.size + self.ts_deltas.nbytes + self.value_deltas.nbytes
+
+    def to_bytes(self):
+        dtypes = (self.ts_deltas.dtype.char + self.value_deltas.dtype.char).encode("ascii")
+        header = _HEADER.pack(self.start, self.first_value, self.count, dtypes)
+        return header + self.ts_deltas.tobytes() + self.value_deltas.tobytes()
+
+    @classmethod
+    def read_all(cls, data):
+        """Decode every chunk in a series file's bytes"""
+        chunks, offset = [], 0
+        while offset + _HEADER.size <= len(data):
+            start, first_value, count, dtypes = _HEADER.unpack_from(data, offset)
+            offset += _HEADER.size
+            ts_dtype, value_dtype = np.dtype(chr(dtypes[0])), np.dtype(chr(dtypes[1]))
+            ts_end = offset + (count - 1) * ts_dtype.itemsize
+            value_end = ts_end + (count - 1) * value_dtype.itemsize
+            if value_end > len(data):
+                break  # truncated by a crash mid-write
+            ts_deltas = np.frombuffer(data, ts_dtype, count - 1, offset)
+            value_deltas = np.frombuffer(data, value_dtype, count - 1, ts_end)
+            end = start + int(ts_deltas.sum(dtype=np.int64))
+            chunks.append(cls(start, end, count, first_value, ts_deltas, value_deltas))
+            offset = value_end
+        return chunks
+
+
+class Series:
+    """Sealed chunks plus an open append buffer for one member and metric"""
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self._ts = np.empty(chunk_size, dtype=np.int64)
+        self._values = np.empty(chunk_size, dtype=np.int64)
+        self._open = 0
+
+    def __len__(self):
+        return sum(chunk.count for chunk in self.chunks) + self._open
+
+    def append(self, timestamps, values):
+        """Append samples; returns the chunks sealed on the way"""
+        sealed = []
+        i, n = 0, len(timestamps)
+        while i < n:
+            take = min(n - i, self.chunk_size - self._open)
+            self._ts[self._open:self._open + take] = timestamps[i:i + take]
+            self._values[self._open:self._open + take] = values[i:i + take]
+            self._open += take
+            i += take
+            if self._open == self.chunk_size:
+                sealed.append(self.seal())
+        return sealed
+
+    def seal(self):
+        """Seal the open buffer into a chunk (None if it is empty)"""
+        if not self._open:
+            return None
+        timestamps, values = self._ts[:self._open], self._values[:self._open]
+        if self._open > 1 and (np.diff(timestamps) < 0).any():
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+        chunk = Chunk.encode(timestamps, values)
+        self.chunks.append(chunk)
+        self._open = 0
+        return chunk
+
+    def read(self, start=None, end=None):
+        """Samples with start <= t < end, sorted by time"""
+        start = np.iinfo(np.int64).min if start is None else start
+        end = np.iinfo(np.int64).max if end is None else end
+        parts = [chunk.decode() for chunk in self.chunks if chunk.end >= start and chunk.start < end]
+        if self._open:
+            parts.append((self._ts[:self._open].copy(), self._values[:self._open].copy()))
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        timestamps = np.concatenate([p[0] for p in parts])
+        values = np.concatenate([p[1] for p in parts])
+        if len(timestamps) > 1 and (np.diff(timestamps) < 0).any():
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+        mask = (timestamps >= start) & (timestamps < end)
+        return timestamps[mask], values[mask]
+
+    @property
+    def nbytes(self):
+        return sum(chunk.nbytes for chunk in self.chunks) + self._open * 16
+
+
+# -------------------------
+# Vectorized aggregates
+# -------------------------
+
+def downsample(timestamps, values, bucket_ms, aggregates=AGGREGATES):
+    """
+    Aggregate sorted samples into fixed time buckets.
+
+    Returns:
+        Dict with "t" (bucket start, ms) and one array per aggregate;
+        empty buckets are omitted
+    """
+    result = {"t": np.empty(0, dtype=np.int64), **{agg: np.empty(0) for agg in aggregates}}
+    if not len(timestamps):
+        return result
+    buckets = timestamps // bucket_ms
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    counts = np.diff(np.append(starts, len(values)))
+    sums = np.add.reduceat(values, starts)
+    result["t"] = buckets[starts] * bucket_ms
+    for agg in aggregates:
+        if agg == "mean":
+            result[agg] = sums / counts
+        elif agg == "sum":
+            result[agg] = sums
+        elif agg == "count":
+            result[agg] = counts
+        elif agg == "min":
+            result[agg] = np.minimum.reduceat(values, starts)
+        elif agg == "max":
+            result[agg] = np.maximum.reduceat(values, starts)
+        else:
+            raise ValueError(f"Unknown aggregate '{agg}'")
+    return result
+
+
+def _range_reduce(values, left, right, ufunc):
+    """ufunc-reduce values[left[i]:right[i] + 1] for every i with a sparse table"""
+    lengths = right - left + 1
+    levels = [values]
+    while (1 << len(levels)) <= lengths.max():
+        previous, half = levels[-1], 1 << (len(levels) - 1)
+        levels.append(ufunc(previous[:-half], previous[half:]))
+    level = np.floor(np.log2(lengths)).astype(np.int64)
+    out = np.empty(len(left), dtype=values.dtype)
+    for k in np.unique(level):
+        mask = level == k
+        table = levels[k]
+        out[mask] = ufunc(table[left[mask]], table[right[mask] - (1 << k) + 1])
+    return out
+
+
+def rolling(timestamps, values, window_ms, aggregate="mean"):
+    """
+    Trailing time-window aggregate at every sample: over samples with
+    t - window_ms < t' <= t. Timestamps must be sorted.
+
+    Returns:
+        (aggregate values, sample counts per window)
+    """
+    n = len(timestamps)
+    if not n:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    right = np.arange(n)
+    left = np.searchsorted(timestamps, timestamps - window_ms, side="right")
+    counts = right - left + 1
+    if aggregate in ("mean", "sum", "count"):
+        prefix = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+        sums = prefix[right + 1] - prefix[left]
+        return {"mean": sums / counts, "sum": sums, "count": counts}[aggregate], counts
+    if aggregate == "min":
+        return _range_reduce(values, left, right, np.minimum), counts
+    if aggregate == "max":
+        return _range_reduce(values, left, right, np.maximum), counts
+    raise ValueError(f"Unknown aggregate '{aggregate}'")
+
+
+# -------------------------
+# Store
+# -------------------------
+
+class VitalsStore:
+    """
+    Per-member vitals series with threshold alerts.
+
+    Args:
+        data_dir: Directory for sealed chunks (None keeps everything in memory)
+        chunk_size: Samples per chunk
+        thresholds: Threshold rules checked on every ingested batch
+        on_alert: Callable(alert dict) invoked for each new alert
+        cooldown_ms: Minimum time between alerts of one rule for one member
+    """
+
+    def __init__(self, data_dir=None, chunk_size=CHUNK_SIZE, thresholds=DEFAULT_THRESHOLDS,
+                 on_alert=None, cooldown_ms=ALERT_COOLDOWN_MS):
+        self.data_dir = Path(data_dir) if data_dir else None
+        self.chunk_size = chunk_size
+        self.thresholds = tuple(thresholds)
+        self.on_alert = on_alert
+        self.cooldown_ms = cooldown_ms
+
+        self._series = {}  # (member_id, metric) -> Series
+        self._last_alert = {}  # (member_id, rule name) -> sample timestamp
+        self._lock = threading.Lock()
+        self.counters = {"ingested": 0, "rejected": 0, "alerts": 0}
+        if self.data_dir is not None:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    # --- persistence -----------------------------------------------------
+
+    def _path(self, member_id, metric):
+        return self.data_dir / f"{quote(str(member_id), safe='')}.{metric}.vts"
+
+    def _load(self):
+        for path in self.data_dir.glob("*.vts"):
+            member, metric, _ = path.name.rsplit(".", 2)
+            if metric not in METRICS:
+                continue
+            series = Series(self.chunk_size)
+            series.chunks = Chunk.read_all(path.read_bytes())
+            self._series[(unquote(member), metric)] = series
+
+    def _persist(self, member_id, metric, chunks):
+        if self.data_dir is None or not chunks:
+            return
+        with open(self._path(member_id, metric), "ab") as f:
+            f.write(b"".join(chunk.to_bytes() for chunk in chunks))
+
+    def flush(self):
+        """Seal and persist every open buffer"""
+        with self._lock:
+            for (member_id, metric), series in self._series.items():
+                chunk = series.seal()
+                if chunk is not None:
+                    self._persist(member_id, metric, [chunk])
+
+    # --- ingestion -------------------------------------------------------
+
+    def ingest(self, member_id, metric, timestamps, values):
+        """
+        Add samples for one member and metric.
+
+        Args:
+            timestamps: Milliseconds since the epoch (array-like)
+            values: Sample values (array-like, rounded to integers)
+
+        Returns:
+            (accepted count, list of alerts raised by this batch)
+        """
+        metric = METRIC_ALIASES.get(metric, metric)
+        limits = METRICS.get(metric)
+        if limits is None:
+            raise ValueError(f"Unknown metric '{metric}'")
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if timestamps.shape != values.shape or timestamps.ndim != 1:
+            raise ValueError("timestamps and values must be 1-D and the same length")
+        present = np.isfinite(values)  # NaN marks a missing sample, not a bad one
+        valid = present & (values >= limits["min"]) & (values <= limits["max"])
+        rejected = int(present.sum()) - int(valid.sum())
+        if not valid.all():
+            timestamps, values = timestamps[valid], values[valid]
+        values = np.rint(values).astype(np.int64)
+
+        key = (member_id, metric)
+        with self._lock:
+            self.counters["rejected"] += rejected
+            if not len(values):
+                return 0, []
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = Series(self.chunk_size)
+            self._persist(member_id, metric, series.append(timestamps, values))
+            self.counters["ingested"] += len(values)
+            alerts = self._check_thresholds(member_id, metric, series, timestamps)
+            self.counters["alerts"] += len(alerts)
+
+        if self.on_alert is not None:
+            for alert in alerts:
+                self.on_alert(alert)
+        return len(values), alerts
+
+    def ingest_columns(self, member_id, columns):
+        """
+        Ingest {"t": [...], "<metric>": [...], ...} (missing samples as None/NaN).
+
+        Returns:
+            (accepted count, alerts)
+        """
+        timestamps = columns.get("t")
+        if timestamps is None:
+            raise ValueError("Missing 't' column")
+        accepted, alerts = 0, []
+        for name, column in columns.items():
+            if name == "t":
+                continue
+            values = np.array(column, dtype=np.float64)  # None -> NaN, dropped as invalid
+            count, raised = self.ingest(member_id, name, timestamps, values)
+            accepted += count
+            alerts.extend(raised)
+        return accepted, alerts
+
+    def _check_thresholds(self, member_id, metric, series, batch_ts):
+        rules = [rule for rule in self.thresholds if rule.metric == metric]
+        if not rules:
+            return []
+        first, last = int(batch_ts.min()), int(batch_ts.max())
+        window = max(rule.window_ms for rule in rules)
+        timestamps, values = series.read(first - window, last + 1)
+        in_batch = timestamps >= first
+        alerts = []
+        for rule in rules:
+            means, counts = rolling(timestamps, values, rule.window_ms, "mean")
+            if rule.direction == "above":
+                breach = means > rule.value
+            else:
+                breach = means < rule.value
+            hits = np.flatnonzero(breach & in_batch & (counts >= rule.min_samples))
+            if not len(hits):
+                continue
+            at = int(timestamps[hits[0]])
+            previous = self._last_alert.get((member_id, rule.name))
+            if previous is not None and abs(at - previous) < self.cooldown_ms:
+                continue
+            self._last_alert[(member_id, rule.name)] = at
+            alerts.append({
+                "memberId": member_id,
+                "rule": rule.name,
+                "label": rule.label,
+                "metric": metric,
+                "unit": METRICS[metric]["unit"],
+                "value": round(float(means[hits[0]]), 1),
+                "threshold": rule.value,
+                "direction": rule.direction,
+                "windowSeconds": rule.window_ms // 1000,
+                "at": at,
+            })
+        return alerts
+
+    # --- queries ---------------------------------------------------------
+
+    def read(self, member_id, metric, start=None, end=None):
+        metric = METRIC_ALIASES.get(metric, metric)
+        with self._lock:
+            series = self._series.get((member_id, metric))
+            if series is None:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+            return series.read(start, end)
+
+    def downsample(self, member_id, metric, bucket_ms, start=None, end=None, aggregates=AGGREGATES):
+        timestamps, values = self.read(member_id, metric, start, end)
+        return downsample(timestamps, values, bucket_ms, aggregates)
+
+    def rolling(self, member_id, metric, window_ms, start=None, end=None, aggregate="mean"):
+        """Rolling aggregate at every sample in [start, end), using samples back to start - window"""
+        lookback = None if start is None else start - window_ms
+        timestamps, values = self.read(member_id, metric, lookback, end)
+        result, counts = rolling(timestamps, values, window_ms, aggregate)
+        if start is not None:
+            keep = timestamps >= start
+            timestamps, result, counts = timestamps[keep], result[keep], counts[keep]
+        return {"t": timestamps, aggregate: result, "count": counts}
+
+    def members(self):
+        with self._lock:
+            return sorted({member_id for member_id, _ in self._series})
+
+    def status(self):
+        with self._lock:
+            samples = sum(len(series) for series in self._series.values())
+            stored = sum(series.nbytes for series in self._series.values())
+            return {
+                "series": len(self._series),
+                "samples": samples,
+                "chunks": sum(len(series.chunks) for series in self._series.values()),
+                "bytes": stored,
+                "bytesPerSample": round(stored / samples, 2) if samples else None,
+                **self.counters,
+            }
@@ -1,12 +1,34 @@
-from flask import Flask, request, jsonify
+# Profile startup from the first import on (report at /status/startup)
+from utils.startup import Lazy, StartupReport
+startup = StartupReport.begin()
+
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import joblib
+import hmac
+import io
 import numpy as np
 import os
 import requests
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
 
+from utils.admission import AdmissionController, Lane, Overloaded, overloaded_body
+from utils.feature_schema import load_schemas
+from utils.job_queue import IdempotencyConflict, JobQueue, PermanentJobError
+from utils.knowledge_index import get_index as get_knowledge_index, retry_wait as knowledge_retry_wait
+from utils.ocr import DocumentTooLarge, OcrError, detect_kind, get_pipeline as get_ocr_pipeline
+from utils.profiling import RequestProfiler
+from utils.screening import Screener
+from utils.serialization import dumps as json_dumps, install as install_serialization
+from utils.shadow import ShadowEvaluator
+from utils.symptom_extractor import condense_for_llm, extract_symptoms, present_symptoms
+from utils.symptom_lookup import get_engine as get_symptom_engine
+from utils.transcription import TranscriptionError, get_transcriber, loaded_transcriber
+from utils.voice_features import get_extractor as get_voice_extractor
+
 # Configure logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -16,6 +38,12 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+install_serialization(app)  # orjson encoding, MessagePack via Accept/Content-Type
+# On-demand request profiling (/admin/profile); idle unless armed
+profiler = RequestProfiler(app)
+# Bearer token for /admin/* routes; unset disables them
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+startup.mark("imports")
 
 # Production settings
 if os.environ.get('FLASK_ENV') == 'production':
@@ -40,50 +68,261 @@ def _model_path(filename: str) -> str:
             return str(p)
     raise FileNotFoundError(f"Model file not found for {filename} in {base_paths + alt_paths}")
 
-# Load ML models with error handling
-diabetes_model = None
-heart_model = None
-parkinsons_model = None
+ARTIFACT_DIR = os.environ.get('MODEL_ARTIFACT_DIR', str(Path(__file__).parent / "models" / "artifacts"))
+PREDICTION_MODELS = {
+    "diabetes": "diabetes_model.pkl",
+    "heart": "heart_disease_model.pkl",
+    "parkinsons": "parkinsons_model.pkl",
+}
+# When to load them: "background" (right after startup), "eager" (before serving) or "lazy" (first /predict)
+PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', 'background').lower()
+
+
+def load_model(store, name: str, legacy_filename: str):
+    """Load a model from the artifact manifest, falling back to the legacy .pkl files."""
+    if name in store:
+        return store.load(name)
+    import joblib
+    return joblib.load(_model_path(legacy_filename))
+
+
+def load_prediction_models() -> dict:
+    """
+    Load the ML models and build their explainers.
+    
+    Importing scikit-learn alone takes about a second, so this runs via the
+    ``prediction_models`` Lazy wrapper instead of at import time.
+    
+    Returns:
+        {"models": {name: model or None}, "explainers": {name: ModelExplainer}}
+    """
+    from utils.model_artifacts import ArtifactStore
+    from utils.model_explainer import build_explainers
+    
+    models = dict.fromkeys(PREDICTION_MODELS)
+    try:
+        logger.info("Loading ML models...")
+        artifact_store = ArtifactStore(ARTIFACT_DIR)
+        if artifact_store.models:
+            logger.info(f"Using model manifest in {ARTIFACT_DIR}")
+        for name, filename in PREDICTION_MODELS.items():
+            models[name] = load_model(artifact_store, name, filename)
+            logger.info(f"✓ {name.title()} model loaded successfully")
+    except Exception as e:
+        logger.warning(f"⚠️  Warning: Could not load ML models: {e}")
+        logger.warning("ML prediction endpoints will return error messages")
+    
+    # Probability calibration and attribution statistics, precomputed from the training CSVs
+    explainers = {}
+    try:
+        explainers = build_explainers(models, FEATURE_SCHEMAS)
+        logger.info(f"✓ Prediction explainers ready: {', '.join(explainers)}")
+    except Exception as e:
+        logger.warning(f"⚠️  Warning: Could not build prediction explainers: {e}")
+    return {"models": models, "explainers": explainers}
+
 
+prediction_models = Lazy("prediction_models", load_prediction_models, report=startup)
+
+# Candidate models scoring a sample of /predict traffic off the request path (SHADOW_MODELS)
+shadow = ShadowEvaluator.from_env(ARTIFACT_DIR)
+
+# Feature schemas generated from the training CSVs
+FEATURE_SCHEMAS = {}
 try:
-    logger.info("Loading ML models...")
-    diabetes_model = joblib.load(_model_path("diabetes_model.pkl"))
-    logger.info("✓ Diabetes model loaded successfully")
-    heart_model = joblib.load(_model_path("heart_disease_model.pkl"))
-    logger.info("✓ Heart disease model loaded successfully")
-    parkinsons_model = joblib.load(_model_path("parkinsons_model.pkl"))
-    logger.info("✓ Parkinsons model loaded successfully")
+    FEATURE_SCHEMAS = load_schemas()
+    logger.info(f"✓ Feature schemas loaded: {', '.join(FEATURE_SCHEMAS)}")
 except Exception as e:
-    logger.warning(f"⚠️  Warning: Could not load ML models: {e}")
-    logger.warning("ML prediction endpoints will return error messages")
+    logger.warning(f"⚠️  Warning: Could not load feature schemas: {e}")
+# Shared-field validation for /predict/screen
+screener = Screener(FEATURE_SCHEMAS)
+startup.mark("feature_schemas")
 
 # -------------------------
 # Medical Text Analysis Functions
 # -------------------------
 
-def analyze_medical_text(text: str) -> str:
+# Local symptom lookup answers confident matches without calling n8n
+PREFER_LOCAL_LOOKUP = os.environ.get('PREFER_LOCAL_LOOKUP', 'false').lower() == 'true'
+LOCAL_LOOKUP_MIN_SCORE = float(os.environ.get('LOCAL_LOOKUP_MIN_SCORE', 0.8))
+# Longer texts (e.g. downloaded reports) are condensed before being sent to n8n
+N8N_MAX_MESSAGE_CHARS = int(os.environ.get('N8N_MAX_MESSAGE_CHARS', 1500))
+# Top knowledge-base passages (utils/knowledge_index.py) attached to the n8n payload
+RETRIEVAL_ENABLED = os.environ.get('RETRIEVAL_ENABLED', 'true').lower() == 'true'
+RETRIEVAL_TOP_K = int(os.environ.get('RETRIEVAL_TOP_K', 3))
+RETRIEVAL_MIN_SCORE = float(os.environ.get('RETRIEVAL_MIN_SCORE', 0.3))
+
+
+def load_knowledge_index():
+    """Knowledge index for retrieval; raises while it is unavailable so Lazy retries it."""
+    index = get_knowledge_index()
+    if index is None:
+        raise RuntimeError("Knowledge retrieval is unavailable")
+    return index
+
+
+# Built (or loaded) in the background at startup, never on the request path
+knowledge_index = Lazy("knowledge_index", load_knowledge_index, report=startup)
+
+# Admission control for n8n/Ollama: an adaptive concurrency limit with a
+# bounded queue. LLM requests may hold at most ADMISSION_LLM_SLOTS worker
+# threads (running or queued) and voice transcription (decode, queue and
+# decode-to-text) at most ADMISSION_VOICE_SLOTS; the rest of the WEB_THREADS
+# gthread threads stay free for /predict/*.
+llm_lane = Lane("llm", int(os.environ.get('ADMISSION_LLM_SLOTS', 8)))
+voice_lane = Lane("voice", int(os.environ.get('ADMISSION_VOICE_SLOTS', 4)))
+WEB_THREADS = int(os.environ.get('WEB_THREADS', 16))
+if llm_lane.capacity + voice_lane.capacity >= WEB_THREADS:
+    logger.warning(
+        f"⚠️  ADMISSION_LLM_SLOTS + ADMISSION_VOICE_SLOTS ({llm_lane.capacity} + {voice_lane.capacity}) "
+        f"leave no thread of WEB_THREADS ({WEB_THREADS}) for /predict/*"
+    )
+n8n_admission = AdmissionController(
+    "n8n",
+    initial_limit=int(os.environ.get('ADMISSION_N8N_CONCURRENCY', 2)),
+    max_limit=int(os.environ.get('ADMISSION_N8N_MAX_CONCURRENCY', 8)),
+    max_queue=int(os.environ.get('ADMISSION_N8N_QUEUE', 8)),
+    queue_timeout=float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 15)),
+    lane=llm_lane,
+)
+
+
+def overloaded_response(error: Overloaded):
+    """429/503 response with Retry-After for a shed request."""
+    body, status, headers = overloaded_body(error)
+    return jsonify(body), status, headers
+
+
+def extract_text_symptoms(text: str) -> list:
+    """
+    Extract structured symptoms (with negation) from medical text.
+    
+    Returns:
+        List of {"symptom", "text", "negated"} dicts, empty on failure
+    """
+    try:
+        return extract_symptoms(text)
+    except Exception as e:
+        logger.warning(f"Symptom extraction unavailable: {e}")
+        return []
+
+
+def lookup_symptoms(text: str, top_k: int = 3, extracted: list = None) -> list:
+    """
+    Rank likely conditions for the symptoms mentioned in text using the local
+    symptom_disease.csv index.
+    
+    Args:
+        text: Medical text content (symptoms, reports, chat input)
+        top_k: Maximum number of conditions to return
+        extracted: Precomputed extract_text_symptoms() result, if available
+        
+    Returns:
+        List of matches (disease, recommendation, score, matched symptoms)
+    """
+    if extracted is None:
+        extracted = extract_text_symptoms(text)
+    symptoms = present_symptoms(extracted)
+    if not symptoms:
+        return []
+    try:
+        return get_symptom_engine().search(symptoms, top_k)
+    except Exception as e:
+        logger.warning(f"Local symptom lookup unavailable: {e}")
+        return []
+
+
+def format_local_matches(matches: list) -> str:
+    """Render local lookup matches as a short patient-facing answer."""
+    lines = ["Based on the symptoms you described, possible conditions are:"]
+    for match in matches:
+        symptoms = ", ".join(match["matched_symptoms"])
+        lines.append(f"- {match['disease'].title()} ({symptoms}): {match['recommendation']}")
+    lines.append("Please consult with a healthcare professional for proper diagnosis.")
+    return "\n".join(lines)
+
+
+def analyze_medical_text(text: str, matches: list = None) -> str:
     """
-    Placeholder ML function for medical text analysis.
-    This can be replaced with actual LLM integration or model inference.
+    Offline medical text analysis used when n8n is disabled or unavailable.
+    Answers from the local symptom lookup when it recognises symptoms.
     
     Args:
         text: Medical text content (symptoms, reports, chat input)
+        matches: Precomputed lookup_symptoms() result, if available
         
     Returns:
         Analysis result as string
     """
+    if matches is None:
+        matches = lookup_symptoms(text)
+    if matches:
+        return format_local_matches(matches)
+
     # Basic placeholder response
     excerpt = text[:100] if len(text) > 100 else text
     return f"AI medical analysis: Patient shows possible symptoms related to {excerpt}... Please consult with a healthcare professional for proper diagnosis."
 
 
-def call_n8n_workflow(message: str, n8n_url: str = None) -> str:
+def retrieve_context(text: str) -> list:
+    """
+    Nearest knowledge-base passages for the text.
+    
+    Returns an empty list when retrieval is disabled, still loading or
+    unavailable, so the n8n call never depends on it. A load that failed is
+    retried in the background once its backoff has passed.
+    """
+    if not RETRIEVAL_ENABLED:
+        return []
+    if not knowledge_index.loaded:
+        if not knowledge_retry_wait():
+            knowledge_index.warm()
+        return []
+    index = knowledge_index.get()
+    try:
+        return [
+            {"text": p["text"], "source": p["source"], "score": p["score"]}
+            for p in index.search(text, RETRIEVAL_TOP_K, RETRIEVAL_MIN_SCORE)
+        ]
+    except Exception as e:
+        logger.warning(f"Knowledge retrieval failed: {e}")
+        return []
+
+
+def is_confident_match(matches: list) -> bool:
+    """True when the best local match is good enough to skip the LLM."""
+    return bool(matches) and matches[0]["score"] >= LOCAL_LOOKUP_MIN_SCORE
+
+
+def build_n8n_payload(message: str, extracted: list = None) -> dict:
+    """
+    Payload for the n8n workflow: condensed message, symptoms and knowledge-base context.
+    
+    Build it before taking an n8n admission slot, so retrieval time is not
+    counted as upstream latency.
+    """
+    if extracted is None:
+        extracted = extract_text_symptoms(message)
+    payload = {
+        "message": condense_for_llm(message, extracted, N8N_MAX_MESSAGE_CHARS),
+        "symptoms": present_symptoms(extracted),
+        "negated_symptoms": [s["symptom"] for s in extracted if s["negated"]],
+    }
+    context = retrieve_context(payload["message"])
+    if context:
+        payload["context"] = context
+    return payload
+
+
+def call_n8n_workflow(message: str, n8n_url: str = None, extracted: list = None, payload: dict = None) -> str:
     """
     Call the n8n Swasth AI workflow to get home remedy suggestions.
     
     Args:
         message: User's message/symptoms
         n8n_url: Base URL for n8n (defaults to localhost:5678)
+        extracted: Precomputed extract_text_symptoms() result, if available
+        payload: Prebuilt build_n8n_payload() result, if available
         
     Returns:
         AI-generated response from n8n workflow
@@ -95,13 +334,16 @@ def call_n8n_workflow(message: str, n8n_url: str = None) -> str:
     webhook_path = os.environ.get('N8N_WEBHOOK_PATH', 'chat/swasth-ai')
     webhook_url = f"{n8n_url}/webhook/{webhook_path}"
     
+    if payload is None:
+        payload = build_n8n_payload(message, extracted)
+    
     logger.info(f"Calling n8n workflow at: {webhook_url}")
-    logger.info(f"Payload: {{'message': '{message}'}}")
+    logger.info(f"Payload: {payload}")
     
     try:
         response = requests.post(
             webhook_url,
-            json={"message": message},
+            json=payload,
             timeout=60,  # Increased timeout for Ollama processing
             headers={"Content-Type": "application/json"}
         )
@@ -194,34 +436,143 @@ def home():
     return "ML Backend is running 🚀"
 
 # -------------------------
-# Diabetes prediction
+# Prediction helpers
 # -------------------------
-@app.route("/predict/diabetes", methods=["POST"])
-def predict_diabetes():
-    try:
-        if diabetes_model is None:
-            return jsonify({"error": "Diabetes model not loaded. Please check server logs."}), 503
-        
-        data = request.get_json()
+def validation_error_response(errors: list):
+    """400 response with structured per-field errors."""
+    missing = [e["field"] for e in errors if e["code"] == "missing"]
+    if missing and len(missing) == len(errors):
+        message = f"Missing features: {missing}"
+    else:
+        message = "Invalid features"
+    return jsonify({"error": message, "errors": errors}), 400
 
-        # Expected features
-        expected_features = [
-            "Pregnancies", "Glucose", "BloodPressure", "SkinThickness",
-            "Insulin", "BMI", "DiabetesPedigreeFunction", "Age"
-        ]
 
-        # Check missing features
-        missing = [f for f in expected_features if f not in data]
-        if missing:
-            return jsonify({"error": f"Missing features: {missing}"}), 400
+# name -> (positive label, negative label, include the 0/1 prediction_value)
+PREDICTION_LABELS = {
+    "diabetes": ("Diabetic", "Not Diabetic", False),
+    "heart": ("Heart Disease", "No Heart Disease", False),
+    "parkinsons": ("Parkinsons", "No Parkinsons", True),
+}
+
+
+def run_prediction(name: str, positive: str, negative: str, include_value: bool = False,
+                   data=None, annotations=None):
+    """
+    Validate a /predict request against the model's feature schema and score it.
+    
+    Accepts a single JSON record, a JSON list of records, or {"records": [...]}.
+    Query parameters ``?probability=true`` adds the calibrated probability of
+    the positive class and ``?explain=true`` adds it plus per-feature
+    contributions.
+    
+    Args:
+        data: Record(s) to score instead of the request's JSON body
+        annotations: Per-record dicts merged into each result
+    
+    Returns:
+        Flask response: {"prediction": ...} for a single record,
+        {"predictions": [...]} for a batch
+    """
+    loaded = prediction_models.get()
+    model = loaded["models"].get(name)
+    if model is None:
+        return jsonify({"error": f"{name.title()} model not loaded. Please check server logs."}), 503
+    schema = FEATURE_SCHEMAS.get(name)
+    if schema is None:
+        return jsonify({"error": f"Feature schema for {name} is unavailable. Please check server logs."}), 503
+
+    if data is None:
+        data = request.get_json(silent=True)
+    if isinstance(data, dict) and isinstance(data.get("records"), list):
+        data = data["records"]
+    if not isinstance(data, (dict, list)) or (isinstance(data, list) and not data):
+        return jsonify({"error": "Request body must be a JSON object or a non-empty list of objects"}), 400
+
+    features, errors, imputed, is_batch = schema.validate(data)
+    if errors:
+        return validation_error_response(errors)
+
+    start = time.perf_counter()
+    labels = model.predict(features)
+    if shadow is not None:
+        shadow.offer(name, features, labels, time.perf_counter() - start)
+
+    explain = _flag(request.args.get("explain"))
+    with_probability = explain or _flag(request.args.get("probability"))
+    explainer = loaded["explainers"].get(name) if with_probability else None
+    if with_probability and explainer is None:
+        return jsonify({"error": f"Explanations for {name} are unavailable. Please check server logs."}), 503
+    extras = explainer.explain(features, contributions=explain) if explainer else None
+
+    results = []
+    for i, label in enumerate(labels):
+        result = {"prediction": positive if label == 1 else negative}
+        if include_value:
+            result["prediction_value"] = int(label)
+        if extras:
+            result.update(extras[i])
+        if imputed[i]:
+            result["imputed"] = imputed[i]
+        if annotations:
+            result.update(annotations[i])
+        results.append(result)
+
+    if is_batch:
+        body = {"predictions": results}
+    else:
+        body = results[0]
+    if explain:
+        body["explanation"] = explainer.describe()
+    return jsonify(body)
 
-        # Prepare features in correct order
-        features = np.array([[data[f] for f in expected_features]])
 
-        prediction = diabetes_model.predict(features)
-        result = "Diabetic" if prediction[0] == 1 else "Not Diabetic"
-        return jsonify({"prediction": result})
+def _flag(value) -> bool:
+    return str(value).strip().lower() in ("1", "true", "yes")
 
+
+# -------------------------
+# Admission control status
+# -------------------------
+@app.route("/status/admission", methods=["GET"])
+def admission_status():
+    return jsonify({
+        "lane": llm_lane.status(),
+        "voice_lane": voice_lane.status(),
+        "upstreams": {"n8n": n8n_admission.status()},
+    })
+
+# -------------------------
+# Knowledge base search
+# -------------------------
+@app.route("/knowledge/search", methods=["GET"])
+def knowledge_search():
+    """Top knowledge-base passages for ?q=... (optional top_k)."""
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Missing 'q' parameter", "status": "error"}), 400
+    if not knowledge_index.loaded:
+        if not knowledge_retry_wait():
+            knowledge_index.warm()
+        return jsonify({"error": "Knowledge retrieval is loading or unavailable", "status": "error"}), 503
+    index = knowledge_index.get()
+    top_k = min(max(request.args.get("top_k", RETRIEVAL_TOP_K, type=int), 1), 20)
+    return jsonify({"query": query, "results": index.search(query, top_k), "index": index.status()})
+
+# -------------------------
+# Feature schemas
+# -------------------------
+@app.route("/predict/schema", methods=["GET"])
+def prediction_schemas():
+    return jsonify({name: schema.to_dict() for name, schema in FEATURE_SCHEMAS.items()})
+
+# -------------------------
+# Diabetes prediction
+# -------------------------
+@app.route("/predict/diabetes", methods=["POST"])
+def predict_diabetes():
+    try:
+        return run_prediction("diabetes", *PREDICTION_LABELS["diabetes"])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -231,27 +582,7 @@ def predict_diabetes():
 @app.route("/predict/heart", methods=["POST"])
 def predict_heart():
     try:
-        if heart_model is None:
-            return jsonify({"error": "Heart disease model not loaded. Please check server logs."}), 503
-        
-        data = request.get_json()
-
-        # List all 13 features expected by your heart disease model
-        expected_features = [
-            "age", "sex", "cp", "trestbps", "chol",
-            "fbs", "restecg", "thalach", "exang",
-            "oldpeak", "slope", "ca", "thal"
-        ]
-
-        missing = [f for f in expected_features if f not in data]
-        if missing:
-            return jsonify({"error": f"Missing features: {missing}"}), 400
-
-        features = np.array([[data[f] for f in expected_features]])
-        prediction = heart_model.predict(features)
-        result = "Heart Disease" if prediction[0] == 1 else "No Heart Disease"
-        return jsonify({"prediction": result})
-
+        return run_prediction("heart", *PREDICTION_LABELS["heart"])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -260,73 +591,216 @@ def predict_heart():
 # -------------------------
 @app.route("/predict/parkinsons", methods=["POST"])
 def predict_parkinsons():
+    # All 22 voice measures from parkinsons.csv are accepted; the 7 basic ones
+    # are required and the rest default to their training medians (reported
+    # back as "imputed")
     try:
-        if parkinsons_model is None:
-            return jsonify({"error": "Parkinsons model not loaded. Please check server logs."}), 503
+        return run_prediction("parkinsons", *PREDICTION_LABELS["parkinsons"])
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Recordings accepted per /predict/parkinsons/audio request
+VOICE_MAX_FILES = int(os.environ.get('VOICE_MAX_FILES', 16))
+
+
+@app.route("/predict/parkinsons/audio", methods=["POST"])
+def predict_parkinsons_audio():
+    """
+    Parkinson's prediction from voice recordings.
+    
+    The 22 voice measures the model expects are computed from the audio
+    (utils/voice_features.py) instead of being supplied by the client.
+    
+    Request:
+        Multipart form with one or more "audio" files, or a raw audio/wav
+        body: PCM WAV of a sustained vowel ("aaah"), at least 0.5 s voiced.
+        Several files are measured in parallel in a process pool.
+        Query: probability, explain (as for /predict/parkinsons)
         
-        data = request.get_json()
+    Returns:
+        The /predict/parkinsons response (a batch for several files), each
+        result with the measured "features", per-stage "timings_ms" and
+        "audio" details; 422 if a recording cannot be measured or its
+        measures fall outside the model's training ranges
+    """
+    try:
+        uploads = request.files.getlist("audio")
+        if uploads:
+            recordings = [upload.read() for upload in uploads]
+        elif request.mimetype.startswith("audio/") or request.mimetype == "application/octet-stream":
+            recordings = [request.get_data()]
+        else:
+            return jsonify({"error": "Upload WAV audio as multipart field 'audio' or an audio/wav body"}), 400
+        if len(recordings) > VOICE_MAX_FILES:
+            return jsonify({"error": f"At most {VOICE_MAX_FILES} recordings per request"}), 413
 
-        # Features expected by the Parkinsons model (voice-based features)
-        # Note: The model may require more features, but we'll accept what the frontend sends
-        # and handle missing features gracefully
-        expected_features = [
-            "fo", "fhi", "flo", "jitter_percent", "shimmer", "nhr", "hnr"
-        ]
+        measured = get_voice_extractor().extract_many(recordings)
+        failed = [{"row": i, "error": m["error"]} for i, m in enumerate(measured) if "error" in m]
+        if failed:
+            return jsonify({"error": "Could not measure voice features", "errors": failed}), 422
 
-        # Check if we have at least some features
-        provided_features = [f for f in expected_features if f in data]
-        if not provided_features:
-            return jsonify({"error": "No valid features provided. Expected: " + ", ".join(expected_features)}), 400
+        records = [m["features"] for m in measured]
+        schema = FEATURE_SCHEMAS.get("parkinsons")
+        if schema is not None:
+            _, errors, _, _ = schema.validate(records)
+            if errors:
+                return jsonify({
+                    "error": "Measured voice features are outside the model's training range",
+                    "errors": errors,
+                    "measurements": measured,
+                }), 422
+        return run_prediction(
+            "parkinsons", *PREDICTION_LABELS["parkinsons"],
+            data=records if len(records) > 1 else records[0],
+            annotations=measured,
+        )
+    except Exception as e:
+        logger.error(f"Error in predict_parkinsons_audio: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
 
-        # Try to build features array - use provided values or default to 0
-        try:
-            # If the model expects more features, we'll need to handle that
-            # For now, use what's provided
-            feature_values = [float(data.get(f, 0)) for f in expected_features]
-            features = np.array([feature_values])
-            
-            prediction = parkinsons_model.predict(features)
-            # Return both string and numeric for compatibility
-            result_str = "Parkinsons" if prediction[0] == 1 else "No Parkinsons"
-            return jsonify({"prediction": result_str, "prediction_value": int(prediction[0])})
-        except ValueError as ve:
-            return jsonify({"error": f"Invalid feature values: {str(ve)}"}), 400
-        except Exception as model_error:
-            # Model might expect different number of features
-            return jsonify({"error": f"Model prediction error: {str(model_error)}. Please check model requirements."}), 500
+# -------------------------
+# Multi-disease screening
+# -------------------------
+# One worker per model, so a screen costs about as much as its slowest model
+# (libsvm, liblinear and numpy release the GIL while scoring)
+screen_executor = ThreadPoolExecutor(max_workers=len(PREDICTION_LABELS), thread_name_prefix="screen")
+
+
+def score_model(name, model, explainer, features, explain: bool):
+    """Labels plus, with an explainer, probability (and contributions) for one model's rows."""
+    start = time.perf_counter()
+    labels = model.predict(features)
+    if shadow is not None:
+        shadow.offer(name, features, labels, time.perf_counter() - start)
+    extras = explainer.explain(features, contributions=explain) if explainer else None
+    return labels, extras
+
+
+def run_screen():
+    """
+    Validate a screening request once and score every applicable model.
+    
+    Accepts a single JSON record, a JSON list of records, or {"records": [...]},
+    with the union of the diabetes, heart and Parkinson's fields. Fields shared
+    by several models (age, sex, ...) are validated once. Every model whose
+    required fields are present and in range is scored, concurrently; the
+    others are reported under "skipped". ``?models=diabetes,heart`` restricts
+    the screen and makes missing or out-of-range fields errors. As on
+    /predict/<model>, ``?probability=true`` adds calibrated probabilities and
+    ``?explain=true`` adds them plus per-feature contributions; without
+    either, no explainer runs.
+    
+    Returns:
+        Flask response: a report {"results", "skipped", "positive"} for a
+        single record, {"reports": [...]} for a batch
+    """
+    requested = request.args.get("models")
+    if requested:
+        names = [name.strip().lower() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in PREDICTION_LABELS]
+        if unknown:
+            return jsonify({"error": f"Unknown models: {unknown}", "available": list(PREDICTION_LABELS)}), 400
+    else:
+        names = list(PREDICTION_LABELS)
 
+    loaded = prediction_models.get()
+    unavailable = [name for name in names
+                   if loaded["models"].get(name) is None or name not in screener.schemas]
+    if requested and unavailable:
+        return jsonify({"error": f"Models not loaded: {unavailable}. Please check server logs."}), 503
+    names = [name for name in names if name not in unavailable]
+    if not names:
+        return jsonify({"error": "No prediction models loaded. Please check server logs."}), 503
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and isinstance(data.get("records"), list):
+        data = data["records"]
+    if not isinstance(data, (dict, list)) or (isinstance(data, list) and not data):
+        return jsonify({"error": "Request body must be a JSON object or a non-empty list of objects"}), 400
+
+    plan, skipped, errors, is_batch = screener.validate(data, names, strict=bool(requested))
+    if errors:
+        return validation_error_response(errors)
+
+    explain = _flag(request.args.get("explain"))
+    with_probability = explain or _flag(request.args.get("probability"))
+    jobs = {name: part for name, part in plan.items() if part["rows"]}
+    explainers = {name: loaded["explainers"].get(name) if with_probability else None for name in jobs}
+    if with_probability:
+        missing = [name for name, explainer in explainers.items() if explainer is None]
+        if missing:
+            return jsonify({"error": f"Explanations for {missing} are unavailable. Please check server logs."}), 503
+    futures = {
+        name: screen_executor.submit(
+            score_model, name, loaded["models"][name], explainers[name], part["features"], explain
+        )
+        for name, part in jobs.items()
+    }
+
+    reports = [{"results": {}, "skipped": skipped[r], "positive": []} for r in range(len(skipped))]
+    for name in unavailable:
+        for report in reports:
+            report["skipped"][name] = {"reason": "model_unavailable", "fields": []}
+    for name, part in jobs.items():
+        labels, extras = futures[name].result()
+        positive, negative, include_value = PREDICTION_LABELS[name]
+        for j, (r, label) in enumerate(zip(part["rows"], labels)):
+            result = {"prediction": positive if label == 1 else negative}
+            if include_value:
+                result["prediction_value"] = int(label)
+            if extras:
+                result.update(extras[j])
+            if part["imputed"][j]:
+                result["imputed"] = part["imputed"][j]
+            reports[r]["results"][name] = result
+            if label == 1:
+                reports[r]["positive"].append(name)
+
+    if is_batch:
+        return jsonify({"reports": reports})
+    return jsonify(reports[0])
+
+
+@app.route("/predict/screen", methods=["POST"])
+def predict_screen():
+    try:
+        return run_screen()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 # -------------------------
 # Medical text analysis endpoint
 # -------------------------
-@app.route("/analyze", methods=["GET"])
-def analyze():
+def analyze_document(file_url: str):
     """
-    Analyze medical text from a URL.
+    Download a report and analyze it (shared by /analyze and /jobs/analyze).
     
-    Query Parameters:
-        file_url (str): URL to a text file containing patient symptoms/reports
+    Plain text is analyzed directly; images and PDFs go through the OCR
+    pipeline, and each page's text is fed to symptom extraction as soon as
+    that page is recognised.
+    
+    Args:
+        file_url: URL to a text, image or PDF file with patient symptoms/reports
         
     Returns:
-        JSON response with analysis results
+        Tuple of (response body, HTTP status)
+        
+    Raises:
+        Overloaded: when the n8n admission controller sheds the request
     """
-    file_url = request.args.get("file_url")
-    
     # Validate file_url parameter
     if not file_url:
-        return jsonify({
+        return {
             "error": "Missing 'file_url' parameter",
             "status": "error"
-        }), 400
+        }, 400
     
     # Validate URL format
     if not (file_url.startswith("http://") or file_url.startswith("https://")):
-        return jsonify({
+        return {
             "error": "Invalid URL format. Must start with http:// or https://",
             "status": "error"
-        }), 400
+        }, 400
     
     try:
         # Download the text file with timeout
@@ -334,49 +808,126 @@ def analyze():
         response = requests.get(file_url, timeout=download_timeout)
         response.raise_for_status()  # Raises exception for bad status codes
         
-        # Read file contents
-        text = response.text.strip()
+        # Read file contents (OCR for scanned reports)
+        input_type = detect_kind(response.content, response.headers.get("Content-Type", ""))
+        pages = 1
+        if input_type == "text":
+            text = response.text.strip()
+            extracted = extract_text_symptoms(text)
+        else:
+            parts, extracted = [], []
+            for page_text in get_ocr_pipeline().pages(response.content, input_type):
+                parts.append(page_text)
+                extracted.extend(extract_text_symptoms(page_text))
+            text = "\n\n".join(parts).strip()
+            pages = len(parts)
+            logger.info(f"OCR extracted {len(text)} characters from {pages} page(s)")
         
         # Validate file is not empty
         if not text:
-            return jsonify({
+            return {
                 "error": "Empty file content",
                 "file_url": file_url,
                 "status": "error"
-            }), 400
+            }, 400
         
         # Check if we should use n8n workflow or placeholder
         use_n8n = os.environ.get('USE_N8N', 'true').lower() == 'true'
+        local_matches = lookup_symptoms(text, extracted=extracted)
         
-        if use_n8n:
+        if PREFER_LOCAL_LOOKUP and is_confident_match(local_matches):
+            # Answer common symptom combinations locally
+            prediction = format_local_matches(local_matches)
+            source = "local"
+        elif use_n8n:
             # Call n8n workflow for AI-powered analysis
-            prediction = call_n8n_workflow(text)
+            payload = build_n8n_payload(text, extracted)
+            with n8n_admission.admit():
+                prediction = call_n8n_workflow(text, payload=payload)
+            source = "n8n"
         else:
-            # Use placeholder ML function
-            prediction = analyze_medical_text(text)
+            # Use offline analysis
+            prediction = analyze_medical_text(text, local_matches)
+            source = "placeholder"
         
         # Prepare response
-        return jsonify({
+        return {
             "file_url": file_url,
             "input_excerpt": text[:200],  # First 200 characters
             "prediction": prediction,
+            "symptoms": extracted,
+            "local_matches": local_matches,
+            "input_type": input_type,
+            "pages": pages,
             "status": "success",
-            "source": "n8n" if use_n8n else "placeholder"
-        })
+            "source": source
+        }, 200
+        
+    except DocumentTooLarge as e:
+        return {
+            "error": str(e),
+            "file_url": file_url,
+            "status": "error"
+        }, 413
+        
+    except OcrError as e:
+        return {
+            "error": str(e),
+            "file_url": file_url,
+            "status": "error"
+        }, 422
         
     except requests.exceptions.Timeout:
-        return jsonify({
+        return {
             "error": "Download timeout - file URL took too long to respond",
             "file_url": file_url,
             "status": "error"
-        }), 408
+        }, 408
+        
+    except requests.exceptions.ConnectionError as e:
+        return {
+            "error": f"Could not reach the file host: {str(e)}",
+            "file_url": file_url,
+            "status": "error"
+        }, 502
+        
+    except requests.exceptions.HTTPError as e:
+        # The host's own failures (5xx, rate limiting) are transient; other
+        # 4xx responses mean the URL itself is bad
+        upstream = e.response.status_code if e.response is not None else None
+        transient = upstream is None or upstream >= 500 or upstream == 429
+        return {
+            "error": f"Failed to download file: {str(e)}",
+            "file_url": file_url,
+            "status": "error"
+        }, 502 if transient else 400
         
     except requests.exceptions.RequestException as e:
-        return jsonify({
+        return {
             "error": f"Failed to download file: {str(e)}",
             "file_url": file_url,
             "status": "error"
-        }), 400
+        }, 400
+
+
+@app.route("/analyze", methods=["GET"])
+def analyze():
+    """
+    Analyze medical text from a URL.
+    
+    Query Parameters:
+        file_url (str): URL to a text file containing patient symptoms/reports
+        
+    Returns:
+        JSON response with analysis results
+    """
+    file_url = request.args.get("file_url")
+    try:
+        body, status = analyze_document(file_url)
+        return jsonify(body), status
+        
+    except Overloaded as e:
+        return overloaded_response(e)
         
     except Exception as e:
         return jsonify({
@@ -385,6 +936,163 @@ def analyze():
             "status": "error"
         }), 500
 
+# -------------------------
+# Async document analysis jobs
+# -------------------------
+def run_analyze_job(payload: dict) -> dict:
+    """Job handler: analysis errors other than overload, timeouts and file host failures are final."""
+    body, status = analyze_document(payload.get("file_url"))
+    if status == 408:
+        raise TimeoutError(body["error"])  # retried with backoff
+    if status == 502:
+        raise ConnectionError(body["error"])  # retried with backoff
+    if status != 200:
+        raise PermanentJobError(body["error"], body)
+    return body
+
+
+job_queue = JobQueue(
+    os.environ.get('JOBS_DB', str(Path(__file__).parent / "data" / "jobs.sqlite3")),
+    {"analyze": run_analyze_job},
+    workers=int(os.environ.get('JOB_WORKERS', 2)),
+    max_attempts=int(os.environ.get('JOB_MAX_ATTEMPTS', 3)),
+)
+job_queue.start()
+startup.mark("job_queue")
+
+
+@app.route("/jobs/analyze", methods=["POST"])
+def submit_analyze_job():
+    """
+    Queue a document analysis and return its job id immediately.
+    
+    Request Body:
+        file_url (str): URL to a text file containing patient symptoms/reports
+        callback_url (str, optional): URL that receives the finished job as a POST
+        idempotency_key (str, optional): Also accepted as the Idempotency-Key header
+        
+    Returns:
+        202 with the new job, or 200 with the existing job for a reused key
+    """
+    data = request.get_json(silent=True) or {}
+    file_url = data.get("file_url") or request.args.get("file_url")
+    callback_url = data.get("callback_url")
+    idempotency_key = request.headers.get("Idempotency-Key") or data.get("idempotency_key")
+    
+    for name, url in (("file_url", file_url), ("callback_url", callback_url)):
+        if url and not (url.startswith("http://") or url.startswith("https://")):
+            return jsonify({"error": f"Invalid {name}. Must start with http:// or https://", "status": "error"}), 400
+    if not file_url:
+        return jsonify({"error": "Missing 'file_url'", "status": "error"}), 400
+    
+    try:
+        job, created = job_queue.submit(
+            "analyze", {"file_url": file_url}, idempotency_key=idempotency_key, callback_url=callback_url
+        )
+    except IdempotencyConflict as e:
+        return jsonify({"error": str(e), "status": "error"}), 422
+    
+    job["status_url"] = f"/jobs/{job['id']}"
+    response = jsonify(job)
+    response.headers["Location"] = job["status_url"]
+    return response, 202 if created else 200
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found", "status": "error"}), 404
+    return jsonify(job)
+
+
+@app.route("/status/jobs", methods=["GET"])
+def job_status():
+    return jsonify(job_queue.stats())
+
+# -------------------------
+# Voice transcription
+# -------------------------
+if os.environ.get('WHISPER_PRELOAD', 'false').lower() == 'true':
+    try:
+        get_transcriber(voice_lane)
+    except Exception as e:
+        logger.warning(f"⚠️  Warning: Could not load Whisper model: {e}")
+
+
+def _audio_upload():
+    """Uploaded audio: multipart field "audio" or a raw audio/* body (None if absent)."""
+    upload = request.files.get("audio")
+    if upload is not None:
+        return upload.stream
+    if request.mimetype.startswith("audio/") or request.mimetype == "application/octet-stream":
+        return io.BytesIO(request.get_data())
+    return None
+
+
+def transcription_error_response(error: TranscriptionError):
+    return jsonify({"error": str(error), "status": "error"}), error.status
+
+
+@app.route("/transcribe", methods=["POST"])
+def transcribe():
+    """
+    Transcribe a voice query.
+    
+    Request:
+        Multipart form with an "audio" file, or a raw audio/* body
+        Query/form: language (optional, e.g. "en"), stream (optional, "true")
+        
+    Returns:
+        JSON with text, segments, language and timings (audio_seconds,
+        processing_seconds, real_time_factor). With stream=true the response
+        is NDJSON: a {"type": "segment", ...} line per segment as soon as it
+        is decoded, then a final {"type": "result", ...} line.
+    """
+    audio = _audio_upload()
+    if audio is None:
+        return jsonify({
+            "error": "Missing audio (multipart field 'audio' or an audio/* body)",
+            "status": "error"
+        }), 400
+    language = request.values.get("language") or None
+    
+    try:
+        transcriber = get_transcriber(voice_lane)
+        if not _flag(request.values.get("stream", "false")):
+            result = transcriber.transcribe(audio, language=language)
+            return jsonify({**result, "status": "success"})
+        
+        events = transcriber.stream(audio, language=language)
+        first = next(events)  # surfaces decode errors and shedding before the 200 is sent
+    except TranscriptionError as e:
+        return transcription_error_response(e)
+    except Overloaded as e:
+        logger.warning(f"Shedding /transcribe request: {e}")
+        return overloaded_response(e)
+    except Exception as e:
+        logger.error(f"Error in transcribe: {str(e)}", exc_info=True)
+        return jsonify({
+            "error": f"Internal server error: {str(e)}",
+            "status": "error"
+        }), 500
+    
+    def ndjson():
+        for kind, event in chain([first], events):
+            yield json_dumps({"type": kind, **event}) + b"\n"
+    
+    return Response(
+        stream_with_context(ndjson()),
+        mimetype="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
+    )
+
+
+@app.route("/status/transcription", methods=["GET"])
+def transcription_status():
+    transcriber = loaded_transcriber()
+    return jsonify(transcriber.status() if transcriber else {"loaded": False})
+
 # -------------------------
 # Direct chat endpoint (alternative to file_url)
 # -------------------------
@@ -399,11 +1107,26 @@ def analyze_text():
             "use_n8n": true  // optional, defaults to true
         }
         
+    Voice mode: send a multipart form with an "audio" file instead (plus
+    optional use_n8n/prefer_local/language fields); the audio is transcribed
+    and the transcript analyzed.
+        
     Returns:
         JSON response with analysis results
     """
     try:
-        data = request.get_json()
+        audio = _audio_upload()
+        transcription = None
+        if audio is not None:
+            data = request.form.to_dict()
+            for option in ("use_n8n", "prefer_local"):
+                if option in data:
+                    data[option] = _flag(data[option])
+            transcription = get_transcriber(voice_lane).transcribe(audio, language=data.get("language") or None)
+            data["text"] = transcription["text"]
+            logger.info(f"Transcribed voice query (RTF {transcription['real_time_factor']})")
+        else:
+            data = request.get_json()
         logger.info(f"Received /analyze/text request: {data}")
         
         if not data:
@@ -418,7 +1141,7 @@ def analyze_text():
         if not text:
             logger.error("Empty text field")
             return jsonify({
-                "error": "Missing or empty 'text' field",
+                "error": "No speech recognised in audio" if transcription else "Missing or empty 'text' field",
                 "status": "error"
             }), 400
         
@@ -426,30 +1149,51 @@ def analyze_text():
         
         # Check if n8n should be used
         use_n8n = data.get("use_n8n", os.environ.get('USE_N8N', 'true').lower() == 'true')
+        prefer_local = data.get("prefer_local", PREFER_LOCAL_LOOKUP)
         logger.info(f"Using n8n: {use_n8n}")
         
-        if use_n8n:
+        extracted = extract_text_symptoms(text)
+        local_matches = lookup_symptoms(text, extracted=extracted)
+        source = "n8n" if use_n8n else "placeholder"
+        
+        if prefer_local and is_confident_match(local_matches):
+            logger.info(f"Answering locally: {local_matches[0]['disease']} ({local_matches[0]['score']})")
+            prediction = format_local_matches(local_matches)
+            source = "local"
+        elif use_n8n:
             logger.info("Calling n8n workflow...")
-            prediction = call_n8n_workflow(text)
+            payload = build_n8n_payload(text, extracted)
+            with n8n_admission.admit():
+                prediction = call_n8n_workflow(text, payload=payload)
             logger.info(f"n8n returned prediction length: {len(prediction) if prediction else 0}")
             
             # If n8n returns empty, fallback to placeholder
             if not prediction or not prediction.strip():
                 logger.warning("n8n returned empty response, using fallback")
-                prediction = analyze_medical_text(text)
+                prediction = analyze_medical_text(text, local_matches)
         else:
             logger.info("Using placeholder function")
-            prediction = analyze_medical_text(text)
+            prediction = analyze_medical_text(text, local_matches)
         
         logger.info(f"Final prediction preview: {prediction[:200] if prediction else 'EMPTY'}...")
         
-        return jsonify({
+        body = {
             "input_excerpt": text[:200],
             "prediction": prediction if prediction else "Error: No response from AI service",
+            "symptoms": extracted,
+            "local_matches": local_matches,
             "status": "success",
-            "source": "n8n" if use_n8n else "placeholder"
-        })
+            "source": source
+        }
+        if transcription:
+            body["transcription"] = transcription
+        return jsonify(body)
         
+    except TranscriptionError as e:
+        return transcription_error_response(e)
+    except Overloaded as e:
+        logger.warning(f"Shedding /analyze/text request: {e}")
+        return overloaded_response(e)
     except Exception as e:
         logger.error(f"Error in analyze_text: {str(e)}", exc_info=True)
         return jsonify({
@@ -457,6 +1201,104 @@ def analyze_text():
             "status": "error"
         }), 500
 
+# -------------------------
+# Shadow model evaluation
+# -------------------------
+@app.route("/status/shadow", methods=["GET"])
+def shadow_status():
+    if shadow is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **shadow.status()})
+
+# -------------------------
+# Admin: on-demand profiling
+# -------------------------
+def admin_denied():
+    """Error response unless the request carries the admin token, else None."""
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Admin endpoints are disabled (set ADMIN_TOKEN)"}), 404
+    header = request.headers.get("Authorization", "")
+    token = header[7:] if header.startswith("Bearer ") else request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        return jsonify({"error": "Unauthorized"}), 401
+    return None
+
+
+@app.route("/admin/profile", methods=["POST"])
+def arm_profile():
+    """
+    Arm a profile of the next matching requests.
+    
+    JSON body: {"route": "/predict/*", "requests": 50, "seconds": 30,
+    "mode": "sampling" | "cprofile", "interval_ms": 5}; at least one of
+    requests/seconds. Fetch the result from /admin/profile/<id>.
+    """
+    denied = admin_denied()
+    if denied:
+        return denied
+    data = request.get_json(silent=True) or {}
+    try:
+        requests_limit = int(data["requests"]) if data.get("requests") is not None else None
+        seconds = float(data["seconds"]) if data.get("seconds") is not None else None
+        interval = float(data.get("interval_ms", 5)) / 1000
+        session = profiler.arm(data.get("route", ""), data.get("mode", "sampling"), requests_limit, seconds, interval)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    logger.info(f"Profile {session.id} armed for {session.route} ({session.mode})")
+    return jsonify(profiler.describe(session, include_data=False)), 202
+
+
+@app.route("/admin/profile", methods=["GET", "DELETE"])
+def profile_sessions():
+    """List recent profiles (GET) or finish the armed one early (DELETE)."""
+    denied = admin_denied()
+    if denied:
+        return denied
+    if request.method == "DELETE":
+        session = profiler.stop()
+        if session is None:
+            return jsonify({"error": "No profile is armed"}), 404
+        return jsonify(profiler.describe(session, include_data=False))
+    return jsonify({"profiles": [profiler.describe(s, include_data=False) for s in profiler.history]})
+
+
+@app.route("/admin/profile/<int:session_id>", methods=["GET"])
+def profile_result(session_id: int):
+    """A profile's progress and data; ?format=collapsed returns flamegraph input as text."""
+    denied = admin_denied()
+    if denied:
+        return denied
+    session = profiler.get(session_id)
+    if session is None:
+        return jsonify({"error": f"No profile {session_id}"}), 404
+    if request.args.get("format") == "collapsed":
+        if session.mode != "sampling":
+            return jsonify({"error": "Collapsed stacks are only collected in sampling mode"}), 400
+        return Response(profiler.collapsed(session) + "\n", mimetype="text/plain")
+    return jsonify(profiler.describe(session))
+
+# -------------------------
+# Startup report
+# -------------------------
+@app.route("/status/startup", methods=["GET"])
+def startup_status():
+    return jsonify(startup.to_dict())
+
+
+if PRELOAD_MODELS == "eager":
+    prediction_models.get()
+elif PRELOAD_MODELS == "background":
+    prediction_models.warm()
+startup.mark("preload_models")
+if RETRIEVAL_ENABLED:
+    knowledge_index.warm()
+if shadow is not None:
+    shadow.start()
+startup.mark("shadow_models")
+startup.ready(app)
+
 # -------------------------
 # Run app
 # -------------------------
@@ -6,7 +6,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 TEAM_API_KEY = os.getenv("TEAM_API_KEY")
-os.environ["TEAM_API_KEY"] = TEAM_API_KEY
+if TEAM_API_KEY:
+    os.environ["TEAM_API_KEY"] = TEAM_API_KEY
 
 
 from flask import Flask, request, jsonify
@@ -14,20 +15,57 @@ from flask_cors import CORS
 from langdetect import detect
 from aixplain.factories import ModelFactory, AgentFactory
 
+from utils.admission import AdmissionController, Lane, Overloaded, overloaded_body
+from utils.doctor_finder import format_doctors, get_doctor_index
+from utils.model_registry import ClientRegistry, ClientUnavailable
+from utils.serialization import install as install_serialization
+from utils.swr_cache import StaleWhileRevalidateCache
+
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 
-doc_model = ModelFactory.get(os.getenv("DOC_MODEL_ID"))
-summ_model = ModelFactory.get(os.getenv("SUMM_MODEL_ID"))
-news_model = ModelFactory.get(os.getenv("NEWS_MODEL_ID"))
-main_agent = AgentFactory.get(os.getenv("AGENT_MODEL_ID"))
+# aiXplain handles are resolved concurrently in the background (or lazily on
+# first use), so boot doesn't wait on four serial round trips and one bad id
+# only breaks the routes that need it
+clients = ClientRegistry(
+    {
+        "doc": (ModelFactory.get, os.getenv("DOC_MODEL_ID")),
+        "summ": (ModelFactory.get, os.getenv("SUMM_MODEL_ID")),
+        "news": (ModelFactory.get, os.getenv("NEWS_MODEL_ID")),
+        "agent": (AgentFactory.get, os.getenv("AGENT_MODEL_ID")),
+    },
+    cache_file=os.getenv("CLIENT_CACHE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".aixplain_clients.json")),
+)
+if os.getenv("AIXPLAIN_LAZY_INIT", "false").lower() != "true":
+    clients.resolve_all_in_background()
 
 app = Flask(__name__)
 CORS(app, origins=["*"])  # Configure for production domains later
+install_serialization(app)  # orjson encoding, MessagePack via Accept/Content-Type
 
 @app.route("/", methods=["GET"])
 def health_check():
     return jsonify({"status": "healthy", "message": "SwasthAI Backend API is running"})
 
+# Admission control for aixplain agent/model runs; /ask may hold at most
+# ADMISSION_LLM_SLOTS worker threads so cheap routes keep capacity.
+llm_lane = Lane("llm", int(os.getenv("ADMISSION_LLM_SLOTS", 12)))
+aixplain_admission = AdmissionController(
+    "aixplain",
+    initial_limit=int(os.getenv("ADMISSION_AIXPLAIN_CONCURRENCY", 4)),
+    max_limit=int(os.getenv("ADMISSION_AIXPLAIN_MAX_CONCURRENCY", 16)),
+    max_queue=int(os.getenv("ADMISSION_AIXPLAIN_QUEUE", 8)),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 15)),
+    lane=llm_lane,
+)
+
+@app.route("/status/clients", methods=["GET"])
+def client_status():
+    return jsonify(clients.status())
+
+@app.route("/status/admission", methods=["GET"])
+def admission_status():
+    return jsonify({"lane": llm_lane.status(), "upstreams": {"aixplain": aixplain_admission.status()}})
+
 def remove_markdown(text):
     text = re.sub(r'\*\*.*?\*\*', '', text)
     text = re.sub(r'[\*\-] ', '', text)
@@ -57,6 +95,27 @@ def clean_and_format_response(raw_response):
     formatted_summary = re.sub(r"\n{3,}", "\n\n", summary_part)
     return f"{formatted_articles}\n\n{'-'*100}\n\n{formatted_summary}"
 
+def fetch_news(language):
+    news = clients.get("news").run({"language": language})
+    return clean_and_format_response(str(news))
+
+# News only depends on the language and changes slowly: keep the cleaned
+# output per language and refresh it in the background
+news_cache = StaleWhileRevalidateCache(
+    fetch_news,
+    fresh_for=int(os.getenv("NEWS_FRESH_SECONDS", 900)),
+    stale_for=int(os.getenv("NEWS_STALE_SECONDS", 6 * 3600)),
+    name="news",
+)
+NEWS_PREFETCH_LANGUAGES = [l.strip().title() for l in os.getenv("NEWS_LANGUAGES", "").split(",") if l.strip()]
+# Languages offered by the news page; anything else is rejected so clients
+# can't grow the cache (and the upstream call rate) with arbitrary keys
+NEWS_SUPPORTED_LANGUAGES = frozenset([
+    "English", "Hindi", "Marathi", "Bengali", "Tamil", "Telugu", "Gujarati",
+    "Punjabi", "Malayalam", "Kannada", "Odia",
+] + NEWS_PREFETCH_LANGUAGES)
+news_cache.start_refresher(NEWS_PREFETCH_LANGUAGES)
+
 def get_nearest_health_centers(latitude, longitude):
     url = f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?location={latitude},{longitude}&radius=5000&type=hospital&keyword=public%20health%20center&key={GOOGLE_MAPS_API_KEY}"
     response = requests.get(url)
@@ -90,19 +149,32 @@ def ask():
             return jsonify({"error": "No question provided"}), 400
         output_language = detect(question)
         formatted_query = f"{question} Response in {output_language}"
-        agent_response = main_agent.run(formatted_query)
-        formatted_response = agent_response["data"]["output"]
-        form_response = remove_markdown(formatted_response)
-        agent_answer = format_text(form_response)
-        safe_response = agent_answer.replace("\n", " ").replace('"', '\\"').replace("'", "\\'")
-        summ = summ_model.run({"question": question, "response": f"{safe_response}", "language": output_language})["data"]
+        with aixplain_admission.admit():
+            agent_response = clients.get("agent").run(formatted_query)
+            formatted_response = agent_response["data"]["output"]
+            form_response = remove_markdown(formatted_response)
+            agent_answer = format_text(form_response)
+            safe_response = agent_answer.replace("\n", " ").replace('"', '\\"').replace("'", "\\'")
+            summ = clients.get("summ").run({"question": question, "response": f"{safe_response}", "language": output_language})["data"]
         corrected_text = summ.encode('latin1').decode('utf-8')
         corr_text = remove_markdown(corrected_text)
         summary = format_text(corr_text)
         return jsonify({"response": agent_answer, "summary": summary})
+    except Overloaded as e:
+        body, status, headers = overloaded_body(e)
+        return jsonify(body), status, headers
+    except ClientUnavailable as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def find_local_doctors(condition, location, latitude=None, longitude=None):
+    try:
+        return get_doctor_index().search(condition, location, latitude, longitude)
+    except Exception as e:
+        print(f"Local doctor search failed, using remote model: {e}")
+        return []
+
 @app.route("/doctors", methods=["POST"])
 def find_doctors():
     try:
@@ -111,8 +183,13 @@ def find_doctors():
         location = data.get("location", "")
         if not condition or not location:
             return jsonify({"error": "Condition and location required"}), 400
-        doctors = doc_model.run({"condition": condition, "location": location})
-        return jsonify({"doctors": doctors.data.encode('latin1').decode('utf-8')})
+        local = find_local_doctors(condition, location, data.get("latitude"), data.get("longitude"))
+        if local:
+            return jsonify({"doctors": format_doctors(local), "results": local, "source": "local"})
+        doctors = clients.get("doc").run({"condition": condition, "location": location})
+        return jsonify({"doctors": doctors.data.encode('latin1').decode('utf-8'), "source": "remote"})
+    except ClientUnavailable as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -140,8 +217,15 @@ def get_news():
         language = data.get("language", "")
         if not language:
             return jsonify({"error": "Language selection is required"}), 400
-        news = news_model.run({"language": language})
-        return jsonify({"news": clean_and_format_response(str(news))})
+        language = str(language).strip().title()
+        if language not in NEWS_SUPPORTED_LANGUAGES:
+            return jsonify({
+                "error": f"Unsupported language '{language}'",
+                "supported": sorted(NEWS_SUPPORTED_LANGUAGES),
+            }), 400
+        return jsonify({"news": news_cache.get(language)})
+    except ClientUnavailable as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
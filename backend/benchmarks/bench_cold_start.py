@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark for backend cold start (utils/startup.py)
+
+Starts a fresh interpreter per run, imports app.py and serves a first
+request through the Flask test client, for each PRELOAD_MODELS mode. Reports
+the median time from process start to the first request (the autoscaling
+target, STARTUP_TARGET_SECONDS), and the latency of the first
+/predict/diabetes call, which pays for any model loading still outstanding.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 5] [--target 1.0]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, logging, time
+logging.disable(logging.CRITICAL)
+import app
+client = app.app.test_client()
+client.get("/")
+first_request = app.startup.first_request_seconds
+start = time.perf_counter()
+client.post("/predict/diabetes", json={"Glucose": 120, "BMI": 25, "Age": 30})
+predict = time.perf_counter() - start
+print(json.dumps({"first_request": first_request, "predict": predict}))
+"""
+
+
+def run_once(mode):
+    env = {**os.environ, "PRELOAD_MODELS": mode, "USE_N8N": "false", "RETRIEVAL_ENABLED": "false",
+           "PYTHONWARNINGS": "ignore"}
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", type=float, default=1.0, help="Time-to-first-request target in seconds")
+    args = parser.parse_args()
+
+    print("\n🚀 Cold start benchmark")
+    print("=" * 72)
+    print(f"   median of {args.runs} fresh processes, target {args.target:.2f}s to first request\n")
+    for mode in ("eager", "background", "lazy"):
+        results = [run_once(mode) for _ in range(args.runs)]
+        first = statistics.median(r["first_request"] for r in results)
+        predict = statistics.median(r["predict"] for r in results)
+        verdict = "✅" if first <= args.target else "❌"
+        print(f"   {mode:<11} first request {first:6.3f}s {verdict}   first /predict {predict * 1000:8.1f} ms")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the local doctor search index (utils/doctor_finder.py)
+
+Generates a synthetic directory (1M doctors by default) spread over cities
+with realistic coordinates, builds the index and reports build time, memory
+and query latency for condition+city and condition+coordinates searches.
+
+Usage:
+    python benchmarks/bench_doctor_finder.py [--doctors 1000000] [--queries 2000]
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.doctor_finder import CONDITION_SPECIALTIES, DoctorIndex  # noqa: E402
+
+CITIES = {
+    "mumbai": (19.07, 72.87), "delhi": (28.61, 77.20), "bengaluru": (12.97, 77.59),
+    "hyderabad": (17.38, 78.48), "chennai": (13.08, 80.27), "kolkata": (22.57, 88.36),
+    "pune": (18.52, 73.85), "ahmedabad": (23.02, 72.57), "jaipur": (26.91, 75.78),
+    "lucknow": (26.84, 80.94), "kanpur": (26.44, 80.33), "nagpur": (21.14, 79.08),
+    "indore": (22.71, 75.85), "bhopal": (23.25, 77.41), "patna": (25.59, 85.13),
+}
+SPECIALTIES = sorted(set(CONDITION_SPECIALTIES.values()))
+
+
+def synthetic_doctors(n, seed=3):
+    rng = random.Random(seed)
+    # Many small towns as well as the big cities
+    towns = {f"town {i}": (rng.uniform(8, 32), rng.uniform(68, 92)) for i in range(2000)}
+    places = list(CITIES.items()) + list(towns.items())
+    cum_weights = list(itertools.accumulate([50.0] * len(CITIES) + [1.0] * len(towns)))
+    for i in range(n):
+        city, (lat, lon) = rng.choices(places, cum_weights=cum_weights)[0]
+        yield {
+            "name": f"Dr. Synthetic {i}",
+            "specialty": rng.choice(SPECIALTIES),
+            "city": city,
+            "latitude": lat + rng.gauss(0, 0.08),
+            "longitude": lon + rng.gauss(0, 0.08),
+            "rating": round(rng.uniform(2.5, 5.0), 1),
+        }
+
+
+def report(label, samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<26} p50 {statistics.median(samples):8.1f} µs   p99 {p99:8.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--doctors", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"\n🚀 Doctor finder benchmark ({args.doctors:,} doctors)")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    index = DoctorIndex(synthetic_doctors(args.doctors))
+    build_s = time.perf_counter() - start
+    columns = sum(a.nbytes for a in (index.specialty, index.city, index.lat, index.lon, index.rating))
+    postings = sum(ids.nbytes for group in (index.by_specialty, index.by_specialty_city, index.by_specialty_cell)
+                   for ids in group.values())
+    print(f"Build time:     {build_s:.1f} s (includes generating the data)")
+    print(f"Numeric columns {columns / 1e6:.0f} MB, index postings {postings / 1e6:.0f} MB")
+    print("-" * 50)
+
+    rng = random.Random(11)
+    conditions = list(CONDITION_SPECIALTIES)
+    cities = list(CITIES)
+
+    samples = []
+    for _ in range(args.queries):
+        condition, city = rng.choice(conditions), rng.choice(cities)
+        t0 = time.perf_counter()
+        index.search(condition, city)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    report("condition + city:", samples)
+
+    for radius in (5, 25):
+        samples = []
+        for _ in range(args.queries):
+            lat, lon = CITIES[rng.choice(cities)]
+            t0 = time.perf_counter()
+            index.search(rng.choice(conditions), latitude=lat, longitude=lon, radius_km=radius)
+            samples.append((time.perf_counter() - t0) * 1e6)
+        report(f"condition + coords ({radius} km):", samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark for knowledge-base nearest-neighbour search (utils/knowledge_index.py)
+
+Writes random L2-normalized float16 embedding matrices of increasing size,
+opens them memory-mapped as the service does, and times top-k search for a
+query vector with the resident float32 copy and with block streaming from
+the memmap (embedding the query itself is excluded; repeated queries are
+served from the LRU cache). Compares against a float32 search with a full
+argsort.
+
+Usage:
+    python benchmarks/bench_knowledge_index.py [--dim 384] [--top-k 3] [--repeats 20]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.knowledge_index import KnowledgeIndex  # noqa: E402
+
+
+def random_embeddings(n, dim, rng):
+    matrix = rng.standard_normal((n, dim)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def best_time(fn, repeats):
+    fn()
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    print("\n🚀 Knowledge index search benchmark")
+    print("=" * 72)
+    print(f"   {args.dim}-d embeddings, top {args.top_k}, best of {args.repeats}\n")
+    print(f"   {'passages':>9}  {'resident':>11}  {'streamed':>11}  {'full argsort':>12}  {'on disk':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            matrix = random_embeddings(n, args.dim, rng)
+            path = Path(tmp) / f"embeddings_{n}.npy"
+            np.save(path, matrix.astype(np.float16))
+            embeddings = np.load(path, mmap_mode="r")
+            resident = KnowledgeIndex(embeddings, [{}] * n, resident_bytes=float("inf"))
+            streamed = KnowledgeIndex(embeddings, [{}] * n, resident_bytes=0)
+            query = matrix[rng.integers(n)]
+
+            expected = int(np.argmax(matrix @ query))
+            for index in (resident, streamed):
+                assert index.search_vector(query, args.top_k)[0][0] == expected
+
+            times = [
+                best_time(lambda: resident.search_vector(query, args.top_k), args.repeats),
+                best_time(lambda: streamed.search_vector(query, args.top_k), args.repeats),
+                best_time(lambda: np.argsort(-(matrix @ query))[:args.top_k], args.repeats),
+            ]
+            print(
+                f"   {n:>9,}  " + "  ".join(f"{t * 1000:>8.3f} ms" for t in times)
+                + f"  {path.stat().st_size / 1e6:>6.1f} MB"
+            )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for combined multi-disease screening (/predict/screen)
+
+Loads the app with its models, builds patient records carrying the diabetes,
+heart and Parkinson's fields (sampled from the training CSVs), and times,
+through the Flask test client:
+
+- one /predict/screen call scoring all three models;
+- the three single-model /predict calls issued one after another;
+- the slowest of the single-model calls on its own (the latency a screen
+  should approach).
+
+Probabilities are requested everywhere so the work per model matches.
+
+Usage:
+    python benchmarks/bench_predict_screen.py [--sizes 1 100 2000] [--repeats 20]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("PRELOAD_MODELS", "eager")
+os.environ.setdefault("USE_N8N", "false")
+os.environ.setdefault("RETRIEVAL_ENABLED", "false")
+logging.disable(logging.CRITICAL)
+warnings.filterwarnings("ignore")
+
+import app  # noqa: E402
+from utils.feature_schema import load_dataset  # noqa: E402
+
+MODELS = ("diabetes", "heart", "parkinsons")
+
+
+def patient_records(n, rng):
+    """Records combining a random training row of each model (age taken from heart)."""
+    records = [{} for _ in range(n)]
+    for model in ("diabetes", "parkinsons", "heart"):
+        X, _, _ = load_dataset(model)
+        names = app.FEATURE_SCHEMAS[model].names
+        for record, row in zip(records, X[rng.integers(0, len(X), n)].tolist()):
+            record.update(zip(names, row))
+    for record in records:
+        record["Age"] = record["age"]
+    return records
+
+
+def best_time(fn, repeats):
+    fn()
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 2000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    client = app.app.test_client()
+    rng = np.random.default_rng(7)
+
+    def post(path, body):
+        response = client.post(path, json=body)
+        assert response.status_code == 200, response.get_json()
+        return response
+
+    print("\n🚀 Multi-disease screening benchmark")
+    print("=" * 72)
+    print(f"   best of {args.repeats}, {os.cpu_count()} CPU(s)\n")
+    print(f"   {'records':>8}  {'screen':>11}  {'3 sequential':>12}  {'slowest single':>16}")
+    for n in args.sizes:
+        records = patient_records(n, rng)
+        body = records if n > 1 else records[0]
+        report = post("/predict/screen", body).get_json()
+        first = report["reports"][0] if n > 1 else report
+        assert set(first["results"]) == set(MODELS), first["skipped"]
+
+        screen = best_time(lambda: post("/predict/screen", body), args.repeats)
+        singles = {
+            model: best_time(lambda: post(f"/predict/{model}?probability=true", body), args.repeats)
+            for model in MODELS
+        }
+        slowest = max(singles, key=singles.get)
+        print(
+            f"   {n:>8,}  {screen * 1000:>8.2f} ms  {sum(singles.values()) * 1000:>9.2f} ms"
+            f"  {singles[slowest] * 1000:>8.2f} ms ({slowest})"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark for on-demand request profiling overhead (utils/profiling.py)
+
+Times single-record /predict/diabetes requests through the Flask test client
+with the profiler's request hooks removed, installed but unarmed (the normal
+production state), and armed in sampling and cProfile mode. Reports median
+and mean latency per mode and the overhead relative to no hooks, plus the
+unarmed hooks timed directly (the end-to-end difference is within noise).
+
+Usage:
+    python benchmarks/bench_profiling.py [--requests 2000] [--interval-ms 5]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+import timeit
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("PRELOAD_MODELS", "eager")
+os.environ.setdefault("USE_N8N", "false")
+os.environ.setdefault("RETRIEVAL_ENABLED", "false")
+logging.disable(logging.CRITICAL)
+warnings.filterwarnings("ignore")
+
+import app  # noqa: E402
+
+RECORD = {"Pregnancies": 2, "Glucose": 140, "BloodPressure": 70, "SkinThickness": 20, "Insulin": 80,
+          "BMI": 31, "DiabetesPedigreeFunction": 0.5, "Age": 50}
+
+
+def run(client, n):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        client.post("/predict/diabetes", json=RECORD)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def set_hooks(enabled):
+    profiler, flask_app = app.profiler, app.app
+    before, teardown = flask_app.before_request_funcs[None], flask_app.teardown_request_funcs[None]
+    for hooks, hook in ((before, profiler._before_request), (teardown, profiler._teardown_request)):
+        if enabled and hook not in hooks:
+            hooks.append(hook)
+        elif not enabled and hook in hooks:
+            hooks.remove(hook)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    parser.add_argument("--rounds", type=int, default=3, help="Alternating rounds per mode (best kept)")
+    args = parser.parse_args()
+
+    client = app.app.test_client()
+    run(client, 200)  # warm up
+
+    def armed(mode):
+        def setup():
+            set_hooks(True)
+            app.profiler.arm("/predict/*", mode, requests=args.requests, interval=args.interval_ms / 1000)
+        return setup
+
+    modes = {
+        "no hooks": lambda: set_hooks(False),
+        "unarmed": lambda: set_hooks(True),
+        "sampling": armed("sampling"),
+        "cprofile": armed("cprofile"),
+    }
+    results = {mode: [] for mode in modes}
+    for _ in range(args.rounds):
+        for mode, setup in modes.items():
+            setup()
+            latencies = run(client, args.requests)
+            app.profiler.stop()
+            results[mode].append((statistics.median(latencies), statistics.fmean(latencies)))
+
+    print("\n🚀 Request profiling overhead benchmark")
+    print("=" * 72)
+    print(f"   {args.requests} requests per round, best of {args.rounds} rounds, "
+          f"sampling every {args.interval_ms:g} ms\n")
+    print(f"   {'mode':<10} {'median':>10} {'mean':>10} {'overhead':>10}")
+    baseline = min(median for median, _ in results["no hooks"])
+    for mode, rounds in results.items():
+        median, mean = min(rounds)
+        print(f"   {mode:<10} {median * 1e6:>7.1f} µs {mean * 1e6:>7.1f} µs {median / baseline - 1:>+9.1%}")
+    with app.app.test_request_context("/predict/diabetes", method="POST"):
+        n = 200_000
+        hooks = sum(timeit.timeit(hook, number=n) for hook in (app.profiler._before_request,
+                                                                app.profiler._teardown_request))
+    print(f"\n⏱️  Unarmed hooks: {hooks / n * 1e9:.0f} ns per request (direct timing)")
+    session = app.profiler.history[-2]
+    print(f"📊 Last sampling session: {session.samples} samples, {len(session.stacks)} distinct stacks")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark for API payload encoding (utils/serialization.py)
+
+Compares Flask's default encoder (stdlib json, sorted keys, as jsonify used
+before) with the orjson and MessagePack paths on representative payloads:
+a family-member list, a batch of prediction results with probabilities and
+contributions, and a NumPy array. Reports the encode cost per MB of output.
+
+Usage:
+    python benchmarks/bench_serialization.py [--records 20000] [--repeats 5]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import serialization  # noqa: E402
+
+
+def family_members(n, rng):
+    return [
+        {
+            "id": str(1700000000000 + i),
+            "name": f"Member {i}",
+            "relation": rng.choice(["self", "spouse", "child", "parent"]),
+            "age": rng.randint(1, 90),
+            "conditions": rng.sample(["diabetes", "hypertension", "asthma", "thyroid"], 2),
+            "medications": [
+                {"name": f"med-{j}", "dosage": "10mg", "time": "08:00"} for j in range(rng.randint(0, 3))
+            ],
+            "checkups": [{"type": "blood test", "date": "2026-11-02", "notes": ""}],
+            "timezone": "Asia/Kolkata",
+        }
+        for i in range(n)
+    ]
+
+
+def prediction_batch(n, rng):
+    features = ["Pregnancies", "Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI",
+                "DiabetesPedigreeFunction", "Age"]
+    return {
+        "predictions": [
+            {
+                "prediction": "Diabetic" if rng.random() > 0.5 else "Not Diabetic",
+                "probability": round(rng.random(), 6),
+                "contributions": {name: round(rng.uniform(-1, 1), 6) for name in features},
+            }
+            for _ in range(n)
+        ]
+    }
+
+
+def stdlib_flask_default(obj):
+    # Flask's DefaultJSONProvider: sort_keys=True, ensure_ascii=True; NumPy needs tolist()
+    return json.dumps(obj, sort_keys=True, default=lambda o: o.tolist()).encode("utf-8")
+
+
+def measure(encode, payload, repeats):
+    body = encode(payload)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encode(payload)
+        best = min(best, time.perf_counter() - start)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    payloads = {
+        f"family members ({args.records:,})": family_members(args.records, rng),
+        f"batch predictions ({args.records:,})": prediction_batch(args.records, rng),
+        "numpy float64 (1M)": {"values": np.random.default_rng(7).random(1_000_000)},
+    }
+    encoders = {"stdlib json (Flask default)": stdlib_flask_default}
+    if serialization.orjson is not None:
+        encoders["orjson"] = serialization.dumps
+    if serialization.msgpack is not None:
+        encoders["msgpack"] = serialization.packb
+
+    print("\n🚀 Payload encoding benchmark")
+    print("=" * 72)
+    for label, payload in payloads.items():
+        print(f"\n📦 {label}")
+        baseline = None
+        for name, encode in encoders.items():
+            seconds, size = measure(encode, payload, args.repeats)
+            mb = size / 1e6
+            baseline = baseline or seconds
+            print(
+                f"   {name:<28} {mb:7.2f} MB  {seconds * 1000:8.2f} ms  "
+                f"{seconds * 1000 / mb:7.2f} ms/MB  {baseline / seconds:5.1f}x"
+            )
+    print()
+
+
+if __name__ == "__main__":
+    main()
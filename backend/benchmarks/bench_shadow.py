@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark for shadow model evaluation (utils/shadow.py)
+
+Trains a deliberately slow candidate for the diabetes model (a large random
+forest) and measures /predict/diabetes latency through the Flask test client
+with every request shadowed (sample rate 1.0), against shadowing disabled
+and against the naive alternative of scoring the candidate inline on the
+request path. Reports latency percentiles for each mode, how many samples
+the candidate scored or dropped, and whether the shadowed p95 and p99 stayed
+within the tolerance of the no-shadow baseline.
+
+"off" and "shadow" run in many short rounds over the same records, in
+alternating order (the shadow workers are drained before each "off" round).
+On a shared host a single scheduling hiccup moves a pooled p99 by 100% even
+when both modes are identical, so the verdict compares each round's shadowed
+percentile with the same round's baseline and takes the median ratio across
+rounds; the pooled percentiles are printed alongside.
+
+Usage:
+    python benchmarks/bench_shadow.py [--requests 4000] [--rounds 40] [--interval-ms 2] [--trees 300]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("PRELOAD_MODELS", "eager")
+os.environ.setdefault("USE_N8N", "false")
+os.environ.setdefault("RETRIEVAL_ENABLED", "false")
+os.environ.pop("SHADOW_MODELS", None)
+logging.disable(logging.CRITICAL)
+warnings.filterwarnings("ignore")
+
+import app  # noqa: E402
+from sklearn.ensemble import RandomForestClassifier  # noqa: E402
+from utils.feature_schema import load_dataset  # noqa: E402
+from utils.shadow import ShadowEvaluator  # noqa: E402
+
+
+class InlineShadow:
+    """Scores the candidate synchronously, as a naive implementation would."""
+
+    def __init__(self, candidate):
+        self.candidate = candidate
+
+    def offer(self, name, features, primary_labels, primary_seconds):
+        self.candidate.predict(features)
+        return True
+
+
+def run(client, records, interval):
+    latencies = []
+    for record in records:
+        start = time.perf_counter()
+        response = client.post("/predict/diabetes", json=record)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_json()
+        time.sleep(interval)
+    return np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=4000, help="Requests per mode")
+    parser.add_argument("--rounds", type=int, default=40, help="Alternating off/shadow rounds")
+    parser.add_argument("--interval-ms", type=float, default=2.0, help="Pause between requests")
+    parser.add_argument("--trees", type=int, default=300, help="Trees in the slow candidate")
+    parser.add_argument("--no-idle-priority", action="store_true", help="Only nice the workers (no SCHED_IDLE)")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed p95/p99 increase over baseline")
+    args = parser.parse_args()
+
+    X, y, _ = load_dataset("diabetes")
+    names = app.FEATURE_SCHEMAS["diabetes"].names
+    rng = np.random.default_rng(7)
+    records = [dict(zip(names, row)) for row in X[rng.integers(0, len(X), args.requests)].tolist()]
+    client = app.app.test_client()
+    interval = args.interval_ms / 1000
+
+    print("\n🚀 Shadow evaluation benchmark")
+    print("=" * 72)
+    with tempfile.TemporaryDirectory() as tmp:
+        candidate = RandomForestClassifier(n_estimators=args.trees, random_state=0).fit(X, y)
+        path = Path(tmp) / "candidate.joblib"
+        joblib.dump(candidate, path)
+        start = time.perf_counter()
+        candidate.predict(X[:1])
+        single = (time.perf_counter() - start) * 1000
+        print(f"   candidate: random forest, {args.trees} trees, {single:.1f} ms per record; "
+              f"{args.requests} requests {args.interval_ms:g} ms apart, {os.cpu_count()} CPU(s)\n")
+
+        evaluator = ShadowEvaluator({"diabetes": path}, sample_rate=1.0, idle_priority=not args.no_idle_priority).start()
+        evaluator._pool.submit(int).result()  # workers forked and candidate loaded
+
+        def drain():
+            deadline = time.monotonic() + 30
+            while evaluator.status()["pending"] and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+        modes = {"off": None, "shadow": evaluator}
+        results = {mode: [] for mode in ("off", "shadow", "inline")}
+        per_round = max(args.requests // args.rounds, 1)
+        for mode, shadow in modes.items():
+            app.shadow = shadow
+            run(client, records[:20], interval)  # warm up
+        for i in range(args.rounds):
+            batch = records[i * per_round:(i + 1) * per_round]
+            order = list(modes.items()) if i % 2 == 0 else list(modes.items())[::-1]
+            for mode, shadow in order:
+                if shadow is None:
+                    drain()
+                app.shadow = shadow
+                results[mode].append(run(client, batch, interval))
+        app.shadow = InlineShadow(candidate)
+        results["inline"].append(run(client, records[:per_round], interval))
+        app.shadow = None
+
+        print(f"   {'mode':<8} {'p50':>8} {'p95':>8} {'p99':>8} {'mean':>8}   (ms)")
+        percentiles = {}
+        for mode, rounds in results.items():
+            latencies = np.concatenate(rounds)
+            percentiles[mode] = np.percentile(latencies, [50, 95, 99])
+            p50, p95, p99 = percentiles[mode]
+            print(f"   {mode:<8} {p50:8.3f} {p95:8.3f} {p99:8.3f} {latencies.mean():8.3f}")
+
+        drain()
+        stats = evaluator.status()["models"]["diabetes"]
+        evaluator.close()
+
+    print()
+    for label, q in (("p95", 95), ("p99", 99)):
+        ratios = [
+            np.percentile(shadowed, q) / np.percentile(baseline, q)
+            for baseline, shadowed in zip(results["off"], results["shadow"])
+        ]
+        increase = float(np.median(ratios)) - 1
+        worse = sum(r > 1 + args.tolerance for r in ratios)
+        verdict = "✅" if increase <= args.tolerance else "❌"
+        print(f"📊 Shadowed {label} {increase:+.1%} vs no shadow (median of {len(ratios)} rounds) {verdict} "
+              f"(tolerance {args.tolerance:.0%}; {worse} rounds over)")
+    print(f"   candidate scored {stats['scored']}, dropped {stats['dropped']} of {stats['sampled']} "
+          f"offered; agreement {stats['agreement_rate']}, latency delta {stats['latency_ms']['delta']} ms")
+    print()
+
+
+if __name__ == "__main__":
+    main()
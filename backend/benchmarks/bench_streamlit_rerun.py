@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Streamlit front-end (multiplediseaseprediction.py)
+
+Streamlit reruns the whole script on every widget interaction. This measures
+the script's own work per rerun (executed in bare mode from precompiled code,
+as Streamlit's script cache does), the per-rerun cost of the old pattern of
+unpickling all three models at module top level, and the latency of one
+prediction through the cached models.
+
+Usage:
+    python benchmarks/bench_streamlit_rerun.py [--reruns 300]
+"""
+
+import argparse
+import logging
+import pickle
+import statistics
+import time
+import warnings
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "models" / "ml" / "Multiple-Disease-Prediction-System-main"
+SCRIPT = APP_DIR / "multiplediseaseprediction.py"
+MODEL_FILES = ["diabetes_model.sav", "heart_disease_model.sav", "parkinsons_model.sav"]
+
+HEART_INPUTS = {
+    "age": "54", "sex": "1", "cp": "0", "trestbps": "130", "chol": "246", "fbs": "0",
+    "restecg": "1", "thalach": "150", "exang": "0", "oldpeak": "1.0", "slope": "1", "ca": "0", "thal": "2",
+}
+
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(label, times):
+    times = sorted(times)
+    p95 = times[int(len(times) * 0.95) - 1]
+    print(f"   {label:<34} p50 {statistics.median(times) * 1000:7.3f} ms   p95 {p95 * 1000:7.3f} ms")
+
+
+def legacy_load():
+    # What the script used to do on every rerun
+    for filename in MODEL_FILES:
+        pickle.load(open(APP_DIR / filename, "rb"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--reruns", type=int, default=300)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.CRITICAL)  # bare-mode "missing ScriptRunContext" noise
+
+    print("\n🚀 Streamlit rerun benchmark (bare mode)")
+    print("=" * 50)
+    code = compile(SCRIPT.read_text(), str(SCRIPT), "exec")
+
+    def rerun():
+        namespace = {"__file__": str(SCRIPT), "__name__": "__main__"}
+        exec(code, namespace)
+        return namespace
+
+    namespace = rerun()  # warm imports and the resource cache
+    namespace["load_models"]()
+    size_kb = sum((APP_DIR / f).stat().st_size for f in MODEL_FILES) / 1024
+
+    print(f"\n🔁 Rerun cost ({args.reruns} reruns, models {size_kb:.0f} KB on disk)")
+    report("script rerun (cached models)", timed(rerun, args.reruns))
+    report("old per-rerun model unpickling", timed(legacy_load, args.reruns))
+    report("cached load_models() lookup", timed(namespace["load_models"], args.reruns))
+
+    print("\n🩺 Prediction on click")
+    predict = namespace["predict"]
+    report("predict('heart', text inputs)", timed(lambda: predict("heart", HEART_INPUTS), args.reruns))
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the symptom extractor (utils/symptom_extractor.py)
+
+Measures single-core throughput of extract() on typical chat messages and on
+longer report-sized texts, with the bundled vocabulary and with a large
+synthetic vocabulary to show matching cost does not grow with its size.
+
+Usage:
+    python benchmarks/bench_symptom_extractor.py [--messages 20000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.symptom_extractor import SymptomExtractor, get_extractor  # noqa: E402
+from utils.symptom_lookup import get_engine  # noqa: E402
+
+CHAT_TEMPLATES = [
+    "I have had a {a} for two days and some {b}, no {c} though.",
+    "My son has {a} and {b} since last night. He denies {c}.",
+    "Feeling {a} with mild {b}. Should I see a doctor?",
+    "{a}, {b} and a bit of {c} after eating outside yesterday",
+    "No {a}, but a terrible {b} that gets worse in the evening.",
+]
+SYMPTOMS = [
+    "fever", "cough", "headache", "nausea", "sore throat", "chest pain",
+    "stomach ache", "loose motions", "shortness of breath", "tiredness",
+]
+
+
+def make_messages(n, seed=1):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(n):
+        a, b, c = rng.sample(SYMPTOMS, 3)
+        messages.append(rng.choice(CHAT_TEMPLATES).format(a=a, b=b, c=c))
+    return messages
+
+
+def throughput(extractor, texts):
+    start = time.perf_counter()
+    for text in texts:
+        extractor.extract(text)
+    elapsed = time.perf_counter() - start
+    return len(texts) / elapsed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--messages", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print("\n🚀 Symptom extractor benchmark (single core)")
+    print("=" * 50)
+
+    messages = make_messages(args.messages)
+    avg_len = sum(map(len, messages)) / len(messages)
+    reports = [" ".join(messages[i:i + 40]) for i in range(0, 4000, 40)]
+
+    extractor = get_extractor()
+    rate, elapsed = throughput(extractor, messages)
+    print(f"Chat messages ({avg_len:.0f} chars):   {rate:10,.0f} msg/s  ({elapsed:.2f} s)")
+    rate, _ = throughput(extractor, reports)
+    print(f"Reports (~{avg_len * 40 / 1000:.0f} KB):            {rate:10,.0f} docs/s")
+
+    start = time.perf_counter()
+    phrases = {f"synthetic symptom {i}": f"synthetic symptom {i}" for i in range(50_000)}
+    phrases.update(get_engine().phrase_map())
+    big = SymptomExtractor(phrases)
+    print(f"Compile 50k-phrase vocabulary:   {(time.perf_counter() - start) * 1000:8.0f} ms")
+    rate, _ = throughput(big, messages)
+    print(f"Chat messages, 50k vocabulary:   {rate:10,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the local symptom lookup engine (utils/symptom_lookup.py)
+
+Builds the engine over a synthetic symptom/disease table (100k rows by default)
+and reports build time, memory held by the index and lookup latency for
+uncached and cached queries.
+
+Usage:
+    python benchmarks/bench_symptom_lookup.py [--rows 100000] [--queries 5000]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.symptom_lookup import SymptomLookup  # noqa: E402
+
+
+def synthetic_rows(n_rows, n_terms=2000, n_diseases=5000, seed=42):
+    """Rows with 2-6 symptoms each, drawn from a skewed (Zipf-like) vocabulary"""
+    rng = random.Random(seed)
+    terms = [f"symptom {i}" for i in range(n_terms)]
+    weights = [1.0 / (i + 1) for i in range(n_terms)]
+    for i in range(n_rows):
+        symptoms = set(rng.choices(terms, weights=weights, k=rng.randint(2, 6)))
+        disease = f"disease {rng.randrange(n_diseases)}"
+        yield sorted(symptoms), disease, f"recommendation for {disease}"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"\n🚀 Symptom lookup benchmark ({args.rows:,} rows)")
+    print("=" * 50)
+
+    rows = list(synthetic_rows(args.rows))
+
+    start = time.perf_counter()
+    engine = SymptomLookup(rows, synonyms={})
+    build_s = time.perf_counter() - start
+
+    # Measured on a second build: tracemalloc slows allocation down considerably
+    tracemalloc.start()
+    SymptomLookup(rows, synonyms={})
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Build time:        {build_s * 1000:.1f} ms")
+    print(f"Index memory:      {current / 1e6:.1f} MB (peak {peak / 1e6:.1f} MB)")
+    print(f"Vocabulary terms:  {len(engine.terms):,}")
+
+    rng = random.Random(7)
+    # Queries are biased towards the long tail so postings lists stay realistic
+    queries = [
+        [f"symptom {rng.randrange(50, 2000)}" for _ in range(rng.randint(1, 3))]
+        for _ in range(args.queries)
+    ]
+
+    def run(label, fn):
+        samples = []
+        for query in queries:
+            t0 = time.perf_counter()
+            fn(query)
+            samples.append((time.perf_counter() - t0) * 1e6)
+        print(
+            f"{label:<18} p50 {statistics.median(samples):8.1f} µs   "
+            f"p99 {percentile(samples, 99):8.1f} µs   mean {statistics.fmean(samples):8.1f} µs"
+        )
+
+    print("-" * 50)
+    run("Uncached lookup:", lambda q: engine._search(tuple(sorted(q)), 3))
+    run("First search():", lambda q: engine.search(q))
+    run("Cached search():", lambda q: engine.search(q))
+    run("Fuzzy (typo):", lambda q: engine.search([t.replace("symptom", "symptm") for t in q]))
+
+
+if __name__ == "__main__":
+    main()
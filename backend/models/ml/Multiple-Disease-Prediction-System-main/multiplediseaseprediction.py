@@ -1,15 +1,72 @@
+import os
 import pickle
+from pathlib import Path
+
+import numpy as np
+import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
 from streamlit_option_menu import option_menu
 
+MODEL_DIR = Path(__file__).resolve().parent
+
+# Set PREDICTION_API_URL (e.g. http://localhost:5000) to score through the
+# Flask /predict API instead of loading the models in this process
+PREDICTION_API_URL = os.environ.get('PREDICTION_API_URL', '').rstrip('/')
+
+# Positive labels returned by the Flask API
+POSITIVE_LABELS = {'Diabetic', 'Heart Disease', 'Parkinsons'}
+
+
+# loading the saved models once per process (Streamlit reruns this script on
+# every widget interaction; cached resources survive reruns)
+@st.cache_resource
+def load_models():
+    models = {}
+    for name, filename in [('diabetes', 'diabetes_model.sav'),
+                           ('heart', 'heart_disease_model.sav'),
+                           ('parkinsons', 'parkinsons_model.sav')]:
+        with open(MODEL_DIR / filename, 'rb') as f:
+            models[name] = pickle.load(f)
+    return models
 
-# loading the saved models
 
-diabetes_model = pickle.load(open('diabetes_model.sav', 'rb'))
+@st.cache_resource
+def api_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
-heart_disease_model = pickle.load(open('heart_disease_model.sav','rb'))
 
-parkinsons_model = pickle.load(open('parkinsons_model.sav', 'rb'))
+def to_features(fields):
+    """Convert the text inputs to one float64 row, or return the first bad field."""
+    values = []
+    for label, value in fields.items():
+        try:
+            values.append(float(value))
+        except (TypeError, ValueError):
+            return None, label
+    return np.array([values], dtype=np.float64), None
+
+
+def predict(name, fields):
+    """Return (label, error) for one record from the API or the cached model."""
+    features, bad_field = to_features(fields)
+    if features is None:
+        return None, f'Please enter a number for "{bad_field}"'
+    if PREDICTION_API_URL:
+        payload = dict(zip(fields, features[0].tolist()))
+        try:
+            response = api_session().post(f'{PREDICTION_API_URL}/predict/{name}', json=payload, timeout=10)
+            body = response.json()
+        except (requests.RequestException, ValueError) as e:
+            return None, f'Prediction API unavailable: {e}'
+        if response.status_code != 200:
+            return None, body.get('error', 'Prediction failed')
+        return body.get('prediction_value', 1 if body['prediction'] in POSITIVE_LABELS else 0), None
+    return int(load_models()[name].predict(features)[0]), None
 
 
 
@@ -67,9 +124,14 @@ if (selected == 'Diabetes Prediction'):
     # creating a button for Prediction
     
     if st.button('Diabetes Test Result'):
-        diab_prediction = diabetes_model.predict([[Pregnancies, Glucose, BloodPressure, SkinThickness, Insulin, BMI, DiabetesPedigreeFunction, Age]])
-        
-        if (diab_prediction[0] == 1):
+        diab_prediction, error = predict('diabetes', {
+            'Pregnancies': Pregnancies, 'Glucose': Glucose, 'BloodPressure': BloodPressure,
+            'SkinThickness': SkinThickness, 'Insulin': Insulin, 'BMI': BMI,
+            'DiabetesPedigreeFunction': DiabetesPedigreeFunction, 'Age': Age})
+        
+        if error:
+          st.error(error)
+        elif (diab_prediction == 1):
           diab_diagnosis = 'The person is diabetic'
         else:
           diab_diagnosis = 'The person is not diabetic'
@@ -135,9 +197,14 @@ if (selected == 'Heart Disease Prediction'):
     # creating a button for Prediction
     
     if st.button('Heart Disease Test Result'):
-        heart_prediction = heart_disease_model.predict([[age, sex, cp, trestbps, chol, fbs, restecg,thalach,exang,oldpeak,slope,ca,thal]])                          
-        
-        if (heart_prediction[0] == 1):
+        heart_prediction, error = predict('heart', {
+            'age': age, 'sex': sex, 'cp': cp, 'trestbps': trestbps, 'chol': chol, 'fbs': fbs,
+            'restecg': restecg, 'thalach': thalach, 'exang': exang, 'oldpeak': oldpeak,
+            'slope': slope, 'ca': ca, 'thal': thal})
+        
+        if error:
+          st.error(error)
+        elif (heart_prediction == 1):
           heart_diagnosis = 'The person is having heart disease'
         else:
           heart_diagnosis = 'The person does not have any heart disease'
@@ -228,9 +295,17 @@ if (selected == "Parkinsons Prediction"):
     
     # creating a button for Prediction    
     if st.button("Parkinson's Test Result"):
-        parkinsons_prediction = parkinsons_model.predict([[fo, fhi, flo, Jitter_percent, Jitter_Abs, RAP, PPQ,DDP,Shimmer,Shimmer_dB,APQ3,APQ5,APQ,DDA,NHR,HNR,RPDE,DFA,spread1,spread2,D2,PPE]])                          
-        
-        if (parkinsons_prediction[0] == 1):
+        parkinsons_prediction, error = predict('parkinsons', {
+            'MDVP:Fo(Hz)': fo, 'MDVP:Fhi(Hz)': fhi, 'MDVP:Flo(Hz)': flo,
+            'MDVP:Jitter(%)': Jitter_percent, 'MDVP:Jitter(Abs)': Jitter_Abs, 'MDVP:RAP': RAP,
+            'MDVP:PPQ': PPQ, 'Jitter:DDP': DDP, 'MDVP:Shimmer': Shimmer, 'MDVP:Shimmer(dB)': Shimmer_dB,
+            'Shimmer:APQ3': APQ3, 'Shimmer:APQ5': APQ5, 'MDVP:APQ': APQ, 'Shimmer:DDA': DDA,
+            'NHR': NHR, 'HNR': HNR, 'RPDE': RPDE, 'DFA': DFA, 'spread1': spread1,
+            'spread2': spread2, 'D2': D2, 'PPE': PPE})
+        
+        if error:
+          st.error(error)
+        elif (parkinsons_prediction == 1):
           parkinsons_diagnosis = "The person has Parkinson's disease"
         else:
           parkinsons_diagnosis = "The person does not have Parkinson's disease"
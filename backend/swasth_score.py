@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+swasth-score: bulk-score CSV or Parquet files with the /predict models
+
+Streams the input in chunks, validates each chunk against the model's
+feature schema, scores chunks across a process pool and writes results
+incrementally, so files larger than RAM are fine.
+
+Usage:
+    python swasth_score.py diabetes patients.csv scored.csv
+    python swasth_score.py heart extract.parquet scored.parquet --workers 8 --chunk-size 100000
+    cat patients.csv | python swasth_score.py diabetes - - > scored.csv
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+from utils.bulk_scoring import DEFAULT_CHUNK_SIZE, LABELS, score_file
+from utils.model_artifacts import DEFAULT_ARTIFACT_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="swasth-score", description=__doc__.split("\n")[1])
+    parser.add_argument("model", choices=sorted(LABELS))
+    parser.add_argument("input", help="CSV or Parquet file ('-' for CSV on stdin)")
+    parser.add_argument("output", help="CSV or Parquet file ('-' for CSV on stdout)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: all cores)")
+    parser.add_argument("--artifact-dir", default=str(DEFAULT_ARTIFACT_DIR))
+    parser.add_argument("--input-format", choices=["csv", "parquet"], default=None)
+    parser.add_argument("--output-format", choices=["csv", "parquet"], default=None)
+    args = parser.parse_args()
+
+    # Progress goes to stderr so '-' output stays clean
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    try:
+        summary = score_file(
+            args.model, args.input, args.output,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            artifact_dir=args.artifact_dir,
+            input_format=args.input_format,
+            output_format=args.output_format,
+        )
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(
+        f"✅ Scored {summary['rows']:,} rows ({summary['invalid']:,} invalid) in {summary['seconds']:.2f}s "
+        f"— {summary['rows_per_second']:,} rows/s on {summary['workers']} worker(s)",
+        file=sys.stderr,
+    )
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the backend's modules the way app.py does (``from utils...``)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
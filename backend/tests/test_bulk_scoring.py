@@ -0,0 +1,57 @@
+"""Tests for utils/bulk_scoring.py output typing across chunks."""
+
+import pandas as pd
+import pytest
+
+from utils.bulk_scoring import score_file
+from utils.feature_schema import TRAINING_DATA_DIR
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture
+def diabetes_csv(tmp_path):
+    """diabetes.csv with an invalid Glucose in the last row only."""
+    frame = pd.read_csv(TRAINING_DATA_DIR / "diabetes.csv").drop(columns=["Outcome"])
+    frame["note"] = None
+    frame.loc[frame.index[-1], "Glucose"] = -5
+    frame.loc[frame.index[-1], "note"] = "entered by hand"
+    path = tmp_path / "patients.csv"
+    frame.to_csv(path, index=False)
+    return path, len(frame)
+
+
+def test_parquet_output_with_errors_only_in_a_later_chunk(tmp_path, diabetes_csv):
+    source, rows = diabetes_csv
+    destination = tmp_path / "scored.parquet"
+
+    summary = score_file("diabetes", source, destination, chunk_size=100, workers=1)
+
+    assert summary["rows"] == rows
+    assert summary["invalid"] == 1
+    table = pq.read_table(destination)
+    assert str(table.schema.field("prediction").type) == "string"
+    assert str(table.schema.field("prediction_value").type) == "int64"
+    assert str(table.schema.field("error").type) == "string"
+    assert str(table.schema.field("Glucose").type) == "double"
+    assert str(table.schema.field("note").type) == "string"
+
+    scored = table.to_pandas()
+    assert scored["error"].iloc[:-1].isna().all()
+    assert "out_of_range: Glucose" in scored["error"].iloc[-1]
+    assert scored["prediction_value"].iloc[-1] == -1
+    assert scored["note"].iloc[-1] == "entered by hand"
+
+
+def test_parquet_input_keeps_its_column_types(tmp_path, diabetes_csv):
+    source, rows = diabetes_csv
+    parquet_source = tmp_path / "patients.parquet"
+    pd.read_csv(source).assign(clinic_id=lambda f: range(len(f))).to_parquet(parquet_source)
+    destination = tmp_path / "scored.parquet"
+
+    score_file("diabetes", parquet_source, destination, chunk_size=100, workers=1)
+
+    table = pq.read_table(destination)
+    assert str(table.schema.field("clinic_id").type) == "int64"
+    assert table.num_rows == rows
+    assert table.column("error").null_count == rows - 1
@@ -0,0 +1,82 @@
+"""Tests for utils/job_queue.py leases (no network: handlers are local functions)."""
+
+import threading
+import time
+
+from utils.job_queue import JobQueue
+
+
+def wait_for(queue, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish: {queue.get(job_id)}")
+
+
+def test_heartbeat_keeps_a_slow_job_from_being_run_twice(tmp_path):
+    calls = []
+    lock = threading.Lock()
+
+    def slow(payload):
+        with lock:
+            calls.append(payload["n"])
+        time.sleep(1.0)  # several lease periods
+        return {"n": payload["n"]}
+
+    db = tmp_path / "jobs.sqlite3"
+    # Two queues on one file stand in for two gunicorn workers
+    first = JobQueue(db, {"slow": slow}, workers=1, lease_seconds=0.3, poll_interval=0.05)
+    second = JobQueue(db, {"slow": slow}, workers=1, lease_seconds=0.3, poll_interval=0.05)
+    job, _ = first.submit("slow", {"n": 1})
+    first.start()
+    second.start()
+    try:
+        finished = wait_for(first, job["id"])
+    finally:
+        first.stop()
+        second.stop()
+
+    assert finished["status"] == "succeeded"
+    assert finished["attempts"] == 1
+    assert calls == [1]
+
+
+def test_worker_that_lost_its_lease_cannot_overwrite_the_result(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", {"echo": lambda payload: payload}, workers=1)
+    job, _ = queue.submit("echo", {"n": 1})
+    stale = queue._claim()
+    # The lease expires and another worker claims and finishes the job
+    queue._connection().execute("UPDATE jobs SET lease_until = 0 WHERE id = ?", (job["id"],))
+    current = queue._claim()
+    assert current["lease_owner"] != stale["lease_owner"]
+    assert queue._finish(job["id"], current["lease_owner"], "succeeded", result={"winner": "current"})
+
+    assert not queue._finish(job["id"], stale["lease_owner"], "failed", error="stale")
+    finished = queue.get(job["id"])
+    assert finished["status"] == "succeeded"
+    assert finished["result"] == {"winner": "current"}
+    assert "error" not in finished
+
+
+def test_failed_attempt_is_requeued_only_by_the_lease_owner(tmp_path):
+    attempts = []
+
+    def flaky(payload):
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise ConnectionError("file host unavailable")
+        return {"ok": True}
+
+    queue = JobQueue(tmp_path / "jobs.sqlite3", {"flaky": flaky}, workers=1, poll_interval=0.05)
+    job, _ = queue.submit("flaky", {})
+    queue.start()
+    try:
+        finished = wait_for(queue, job["id"])
+    finally:
+        queue.stop()
+
+    assert finished["status"] == "succeeded"
+    assert finished["attempts"] == 2
@@ -0,0 +1,83 @@
+"""Tests for utils/knowledge_index.py builds and retries with a fake encoder (no model download)."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from utils import knowledge_index
+from utils.knowledge_index import KnowledgeIndex, build_index, get_index, read_manifest
+
+
+class FakeEncoder:
+    """Stands in for SentenceTransformer: a normalized character histogram."""
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        vectors = np.zeros((len(texts), 32), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for char in text.lower():
+                vectors[row, ord(char) % 32] += 1
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    docs = tmp_path / "knowledge"
+    docs.mkdir()
+    (docs / "hydration.md").write_text("# Hydration\n\nDrink oral rehydration salts for diarrhoea.\n")
+    return docs
+
+
+@pytest.fixture
+def reset_index(monkeypatch):
+    for name, value in (("_index", None), ("_index_error", None), ("_index_retry_at", 0.0),
+                        ("_index_failures", 0)):
+        monkeypatch.setattr(knowledge_index, name, value)
+
+
+def test_concurrent_builds_use_their_own_temp_files(tmp_path, docs_dir):
+    index_dir = tmp_path / "index"
+    errors = []
+
+    def build():
+        try:
+            build_index(index_dir, docs_dir=docs_dir, model_name="fake", encoder=FakeEncoder())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=build) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(p.name for p in index_dir.iterdir()) == ["embeddings.npy", "manifest.json", "passages.json"]
+    index = KnowledgeIndex.load(index_dir, encoder=FakeEncoder())
+    assert len(index.passages) == read_manifest(index_dir)["passages"]
+
+
+def test_get_index_retries_after_the_backoff(tmp_path, monkeypatch, reset_index):
+    attempts = []
+
+    def load_encoder(model_name):
+        attempts.append(model_name)
+        if len(attempts) == 1:
+            raise RuntimeError("model download failed")
+        return FakeEncoder()
+
+    monkeypatch.setattr(knowledge_index, "load_encoder", load_encoder)
+    monkeypatch.setattr(knowledge_index, "RETRY_SECONDS", 0.2)
+    index_dir = tmp_path / "index"
+
+    assert get_index(index_dir) is None
+    assert get_index(index_dir) is None  # still backing off
+    assert len(attempts) == 1
+    assert "download failed" in knowledge_index._index_error
+
+    monkeypatch.setattr(knowledge_index, "_index_retry_at", 0.0)  # backoff elapsed
+    index = get_index(index_dir)
+    assert index is not None
+    assert len(attempts) == 2
+    assert knowledge_index._index_error is None
+    assert get_index(index_dir) is index
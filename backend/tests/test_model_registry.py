@@ -0,0 +1,148 @@
+"""Tests for utils/model_registry.py with local fake factories (no network)."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from utils.model_registry import ClientRegistry, ClientUnavailable
+
+
+class FakeHandle:
+    def __init__(self, client_id):
+        self.id = client_id
+        self.name = f"fake {client_id}"
+
+
+class FakeFactory:
+    """Stands in for ModelFactory.get / AgentFactory.get."""
+
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures  # calls that raise before one succeeds
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, client_id):
+        with self._lock:
+            self.calls.append(client_id)
+            fail = len(self.calls) <= self.failures
+        time.sleep(self.delay)
+        if fail:
+            raise ConnectionError(f"upstream unavailable for {client_id}")
+        return FakeHandle(client_id)
+
+
+def test_nothing_is_resolved_at_construction():
+    factory = FakeFactory()
+    registry = ClientRegistry({"doc": (factory, "doc-id"), "news": (factory, "news-id")})
+
+    assert factory.calls == []
+    assert registry.status()["clients"]["doc"]["state"] == "pending"
+
+
+def test_get_resolves_only_the_requested_client_once():
+    doc, news = FakeFactory(), FakeFactory()
+    registry = ClientRegistry({"doc": (doc, "doc-id"), "news": (news, "news-id")})
+
+    first = registry.get("doc")
+    assert registry.get("doc") is first
+    assert first.id == "doc-id"
+    assert doc.calls == ["doc-id"]
+    assert news.calls == []
+    assert registry.status()["clients"]["doc"]["state"] == "ready"
+    assert not registry.status()["ready"]
+
+
+def test_concurrent_first_use_calls_the_factory_once():
+    factory = FakeFactory(delay=0.05)
+    registry = ClientRegistry({"agent": (factory, "agent-id")})
+    start = threading.Barrier(16)
+    handles = []
+
+    def use():
+        start.wait()
+        handles.append(registry.get("agent"))
+
+    threads = [threading.Thread(target=use) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert factory.calls == ["agent-id"]
+    assert len(handles) == 16 and all(h is handles[0] for h in handles)
+
+
+def test_resolve_all_runs_factories_in_parallel():
+    factories = {name: FakeFactory(delay=0.2) for name in ("doc", "summ", "news", "agent")}
+    registry = ClientRegistry({name: (f, f"{name}-id") for name, f in factories.items()})
+
+    start = time.monotonic()
+    registry.resolve_all()
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.6  # serially this would take 0.8 s
+    assert all(f.calls == [f"{name}-id"] for name, f in factories.items())
+    status = registry.status()
+    assert status["ready"]
+    assert status["time_to_ready_seconds"] is not None
+
+
+def test_failure_is_raised_to_the_caller_and_retried_on_next_use():
+    flaky, healthy = FakeFactory(failures=1), FakeFactory()
+    registry = ClientRegistry({"doc": (flaky, "doc-id"), "news": (healthy, "news-id")})
+
+    registry.resolve_all()  # logs the failure instead of raising
+    status = registry.status()
+    assert status["clients"]["doc"]["state"] == "error"
+    assert "upstream unavailable" in status["clients"]["doc"]["error"]
+    assert status["clients"]["news"]["state"] == "ready"
+    assert not status["ready"]
+
+    handle = registry.get("doc")
+    assert handle.id == "doc-id"
+    assert flaky.calls == ["doc-id", "doc-id"]
+    assert registry.status()["clients"]["doc"]["state"] == "ready"
+    assert registry.status()["ready"]
+
+
+def test_failure_chains_the_factory_error():
+    registry = ClientRegistry({"doc": (FakeFactory(failures=5), "doc-id")})
+
+    with pytest.raises(ClientUnavailable) as excinfo:
+        registry.get("doc")
+    assert isinstance(excinfo.value.__cause__, ConnectionError)
+
+
+def test_missing_id_and_unknown_client_are_unavailable():
+    factory = FakeFactory()
+    registry = ClientRegistry({"doc": (factory, None)})
+
+    with pytest.raises(ClientUnavailable, match="not configured"):
+        registry.get("doc")
+    with pytest.raises(ClientUnavailable, match="Unknown client"):
+        registry.get("nope")
+    assert factory.calls == []
+
+
+def test_metadata_persists_and_orders_the_next_start(tmp_path):
+    cache_file = tmp_path / "clients.json"
+    specs = {
+        "fast": (FakeFactory(), "fast-id"),
+        "slow": (FakeFactory(delay=0.1), "slow-id"),
+        "broken": (FakeFactory(failures=1), "broken-id"),
+    }
+    ClientRegistry(specs, cache_file=cache_file).resolve_all()
+
+    saved = json.loads(cache_file.read_text())
+    assert saved["slow"]["resolve_seconds"] >= saved["fast"]["resolve_seconds"]
+    assert saved["broken"]["error"]
+
+    restarted = ClientRegistry(specs, cache_file=cache_file)
+    # Never resolved before (no time recorded) first, then slowest first
+    assert restarted.resolution_order() == ["broken", "slow", "fast"]
+    previous = restarted.status()["clients"]["broken"]["previous_start"]
+    assert "upstream unavailable" in previous["error"]
+    assert restarted.status()["clients"]["slow"]["resolve_seconds"] is None
@@ -0,0 +1,75 @@
+"""Tests for utils/ocr.py document limits (no Tesseract: text-layer pages and size checks only)."""
+
+import io
+
+import pytest
+
+from utils import ocr
+from utils.ocr import DocumentTooLarge, OcrPipeline, split_pages
+
+fitz = pytest.importorskip("fitz")
+Image = pytest.importorskip("PIL.Image")
+
+PAGE_TEXT = "Patient reports persistent cough and mild fever for three days. "
+
+
+def make_pdf(pages, text=True):
+    document = fitz.open()
+    for number in range(pages):
+        page = document.new_page()
+        if text:
+            page.insert_text((72, 72), f"Page {number + 1}. {PAGE_TEXT}", fontsize=9)
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def make_tiff(frames, size):
+    buffer = io.BytesIO()
+    images = [Image.new("L", size, 255) for _ in range(frames)]
+    images[0].save(buffer, format="TIFF", save_all=True, append_images=images[1:])
+    return buffer.getvalue()
+
+
+def test_text_layer_pages_stream_in_order(tmp_path):
+    pipeline = OcrPipeline(workers=1, cache_dir=tmp_path)
+
+    texts = list(pipeline.pages(make_pdf(3), "pdf"))
+
+    assert [t.split(".")[0] for t in texts] == ["Page 1", "Page 2", "Page 3"]
+    assert pipeline.stats["text_layer"] == 3
+
+
+def test_page_limit_is_checked_before_any_page(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr, "OCR_MAX_PAGES", 2)
+    pages = OcrPipeline(workers=1, cache_dir=tmp_path).pages(make_pdf(3), "pdf")
+
+    with pytest.raises(DocumentTooLarge, match="3 pages"):
+        next(pages)
+
+
+def test_pdf_page_is_not_rasterized_past_the_pixel_limit(monkeypatch):
+    # A blank Letter page at 300 dpi is 2550x3300 pixels
+    monkeypatch.setattr(ocr, "OCR_MAX_PAGE_PIXELS", 2550 * 3300 - 1)
+
+    with pytest.raises(DocumentTooLarge, match="Page 1"):
+        list(split_pages(make_pdf(1, text=False), "pdf"))
+
+
+def test_total_pixel_limit_across_frames(monkeypatch):
+    monkeypatch.setattr(ocr, "OCR_MAX_PIXELS", 2500)
+    pages = split_pages(make_tiff(3, (40, 25)), "image")
+
+    assert next(pages)[0] == "image"
+    assert next(pages)[0] == "image"
+    with pytest.raises(DocumentTooLarge):
+        next(pages)
+
+
+def test_oversized_image_is_rejected_from_its_header(monkeypatch):
+    monkeypatch.setattr(ocr, "OCR_MAX_PAGE_PIXELS", 10_000)
+    buffer = io.BytesIO()
+    Image.new("L", (200, 100), 255).save(buffer, format="PNG")
+
+    with pytest.raises(DocumentTooLarge, match="200x100"):
+        list(split_pages(buffer.getvalue(), "image"))
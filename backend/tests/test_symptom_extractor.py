@@ -0,0 +1,50 @@
+"""Tests for negation scopes in utils/symptom_extractor.py."""
+
+import pytest
+
+from utils.symptom_extractor import extract_symptoms, present_symptoms
+
+
+def negations(text):
+    return {s["symptom"]: s["negated"] for s in extract_symptoms(text)}
+
+
+@pytest.mark.parametrize("text", [
+    "Patient denies fever, cough, or headache.",
+    "Denies fever, cough and headache",
+    "No fever, cough, headache.",
+])
+def test_negation_covers_every_item_of_a_list(text):
+    assert negations(text) == {"fever": True, "cough": True, "headache": True}
+
+
+def test_negated_list_of_multi_word_symptoms():
+    result = negations("Denies chest pain, shortness of breath.")
+
+    assert result and all(result.values())
+    assert present_symptoms(extract_symptoms("Denies chest pain, shortness of breath.")) == []
+
+
+def test_no_a_comma_b():
+    assert negations("no fever, cough") == {"fever": True, "cough": True}
+
+
+@pytest.mark.parametrize("text", [
+    "not fever today, cough",
+    "No fever, patient reports cough",
+    "denies fever, and reports cough",
+    "no fever but cough",
+])
+def test_clause_after_a_comma_is_affirmed(text):
+    assert negations(text) == {"fever": True, "cough": False}
+
+
+def test_post_negation_cue_stays_with_its_symptom():
+    assert negations("fever, cough absent") == {"fever": False, "cough": True}
+    assert negations("Headache, fever free since monday") == {"headache": False, "fever": True}
+
+
+def test_affirmed_list_without_cue():
+    assert negations("Cough, fever and headache for 3 days") == {
+        "cough": False, "fever": False, "headache": False,
+    }
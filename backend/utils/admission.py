@@ -0,0 +1,220 @@
+"""
+Admission control and load shedding for calls to slow LLM upstreams.
+
+Each upstream (n8n/Ollama, aixplain) gets an ``AdmissionController`` with:
+
+- a concurrency limit that adapts to observed latency (the gradient
+  algorithm: the limit shrinks when recent latency rises above the long-run
+  baseline and grows while latency stays flat);
+- a bounded FIFO queue for requests over the limit, with a maximum wait.
+
+When the queue is full a request is rejected immediately (429); when it
+waits too long it is rejected with 503. Both carry a Retry-After estimate, so
+under a burst some requests succeed quickly instead of all of them timing
+out.
+
+All LLM controllers in a process also share a ``Lane``: a cap on how many
+worker threads LLM requests may hold, running or queued. Other slow traffic
+(voice transcription) gets a lane of its own, and the lanes together stay
+below the thread count, so the remaining threads stay free for cheap routes
+such as /predict/*, which never pass through admission control and so are
+never starved by slow traffic.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request is shed.
+
+    Attributes:
+        status: HTTP status to answer with (429 queue full, 503 wait timeout/lane full)
+        retry_after: Suggested seconds before retrying
+    """
+
+    def __init__(self, message, status=503, retry_after=1):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+class Lane:
+    """A shared cap on the worker threads a class of traffic may occupy."""
+
+    def __init__(self, name, capacity):
+        self.name = name
+        self.capacity = capacity
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self._used >= self.capacity:
+                return False
+            self._used += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._used -= 1
+
+    @contextmanager
+    def hold(self, label=None, retry_after=1):
+        """
+        Hold a slot for the duration of the block.
+
+        Raises:
+            Overloaded: (503) when the lane is full
+        """
+        if not self.try_acquire():
+            raise Overloaded(f"{label or self.name}: server busy", 503, retry_after)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def status(self):
+        return {"name": self.name, "capacity": self.capacity, "in_use": self._used}
+
+
+class AdmissionController:
+    """
+    Args:
+        name: Upstream label for errors and status
+        initial_limit: Starting concurrency limit
+        min_limit, max_limit: Bounds for the adaptive limit
+        max_queue: Requests allowed to wait beyond the limit
+        queue_timeout: Seconds a request may wait for a slot
+        lane: Optional shared Lane
+        tolerance: Latency increase over the baseline tolerated before shrinking
+        smoothing: Weight of each new limit estimate (0-1)
+    """
+
+    def __init__(self, name, initial_limit=4, min_limit=1, max_limit=32, max_queue=16,
+                 queue_timeout=10.0, lane=None, tolerance=2.0, smoothing=0.2):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.lane = lane
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+
+        self._inflight = 0
+        self._waiters = deque()  # FIFO of threading.Event
+        self._lock = threading.Lock()
+        self._short_rtt = None  # fast EWMA of latency
+        self._long_rtt = None  # slow EWMA, the no-load baseline
+        self.counters = {"admitted": 0, "waited": 0, "rejected_queue_full": 0,
+                         "rejected_timeout": 0, "rejected_lane": 0, "completed": 0}
+
+    # --- admission -------------------------------------------------------
+
+    @contextmanager
+    def admit(self):
+        """
+        Hold a slot for the duration of the block.
+
+        Raises:
+            Overloaded: when the request is shed
+        """
+        if self.lane is not None and not self.lane.try_acquire():
+            self.counters["rejected_lane"] += 1
+            raise Overloaded(f"{self.name}: server busy", 503, self._retry_after())
+        try:
+            self._acquire()
+            start = time.monotonic()
+            ok = False
+            try:
+                yield
+                ok = True
+            finally:
+                self._release(time.monotonic() - start, ok)
+        finally:
+            if self.lane is not None:
+                self.lane.release()
+
+    def _acquire(self):
+        with self._lock:
+            if self._inflight < int(self.limit) and not self._waiters:
+                self._inflight += 1
+                self.counters["admitted"] += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                self.counters["rejected_queue_full"] += 1
+                raise Overloaded(f"{self.name}: queue full", 429, self._retry_after())
+            ready = threading.Event()
+            self._waiters.append(ready)
+            self.counters["waited"] += 1
+
+        if ready.wait(self.queue_timeout):
+            return  # the releasing thread handed its slot over
+        with self._lock:
+            if ready.is_set():
+                return  # handed over just as we timed out
+            self._waiters.remove(ready)
+            self.counters["rejected_timeout"] += 1
+        raise Overloaded(f"{self.name}: timed out waiting for capacity", 503, self._retry_after())
+
+    def _release(self, rtt, ok):
+        with self._lock:
+            self.counters["completed"] += 1
+            self._update_limit(rtt, ok)
+            self._inflight -= 1
+            # Hand freed slots straight to waiters, oldest first
+            while self._waiters and self._inflight < int(self.limit):
+                self._inflight += 1
+                self.counters["admitted"] += 1
+                self._waiters.popleft().set()
+
+    # --- adaptive limit --------------------------------------------------
+
+    def _update_limit(self, rtt, ok):
+        if not ok:
+            # Errors say nothing reliable about latency; back off gently
+            self.limit = max(self.min_limit, self.limit * 0.9)
+            return
+        if self._short_rtt is None:
+            self._short_rtt = self._long_rtt = rtt
+            return
+        self._short_rtt += 0.2 * (rtt - self._short_rtt)
+        self._long_rtt += 0.02 * (rtt - self._long_rtt)
+        if self._long_rtt > 2 * self._short_rtt:
+            # Latency dropped a lot (e.g. upstream recovered): let the baseline catch up
+            self._long_rtt *= 0.95
+        if self._inflight < self.limit / 2:
+            return  # not using the limit, so latency says nothing about it
+        gradient = max(0.5, min(1.0, self.tolerance * self._long_rtt / self._short_rtt))
+        estimate = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = min(self.max_limit, max(self.min_limit,
+                         (1 - self.smoothing) * self.limit + self.smoothing * estimate))
+
+    def _retry_after(self):
+        rtt = self._short_rtt or 1.0
+        return rtt * (len(self._waiters) + 1) / max(1.0, self.limit)
+
+    # --- reporting -------------------------------------------------------
+
+    def status(self):
+        return {
+            "limit": round(self.limit, 2),
+            "inflight": self._inflight,
+            "queued": len(self._waiters),
+            "max_queue": self.max_queue,
+            "latency_seconds": round(self._short_rtt, 3) if self._short_rtt else None,
+            "baseline_latency_seconds": round(self._long_rtt, 3) if self._long_rtt else None,
+            **self.counters,
+        }
+
+
+def overloaded_body(error):
+    """Response body and headers for an Overloaded error."""
+    body = {"error": str(error), "status": "overloaded", "retry_after": error.retry_after}
+    return body, error.status, {"Retry-After": str(error.retry_after)}
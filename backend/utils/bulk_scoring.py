@@ -0,0 +1,319 @@
+"""
+Streaming bulk scoring for the /predict models.
+
+Input CSV or Parquet files are read in fixed-size chunks. The parent process
+only parses each chunk and maps its columns onto the model's feature schema;
+a process pool (one model copy per worker, loaded once) validates and scores
+the chunk, and results are written back in input order as soon as they are
+ready. At most ``2 * workers`` chunks are in flight, so memory is bounded by
+the chunk size rather than the file size.
+
+Each output row is the input row plus ``prediction``, ``prediction_value``
+(-1 for rows that failed validation) and ``error``. Parquet output has a
+schema declared before the first chunk is written (``output_schema``), so a
+column that happens to be all-null or differently typed in one chunk cannot
+make a later chunk unwritable.
+"""
+
+import logging
+import os
+import sys
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.feature_schema import load_schemas
+from utils.model_artifacts import DEFAULT_ARTIFACT_DIR, LEGACY_MODEL_DIR, MODEL_FILES, ArtifactStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50_000
+PROGRESS_SECONDS = 5.0
+
+# Columns appended to every output row
+OUTPUT_COLUMNS = ("prediction", "prediction_value", "error")
+
+# name -> (positive label, negative label), as returned by /predict/*
+LABELS = {
+    "diabetes": ("Diabetic", "Not Diabetic"),
+    "heart": ("Heart Disease", "No Heart Disease"),
+    "parkinsons": ("Parkinsons", "No Parkinsons"),
+}
+
+
+def load_model(name, artifact_dir=DEFAULT_ARTIFACT_DIR):
+    """Load a model from the artifact manifest, falling back to the legacy .pkl."""
+    store = ArtifactStore(artifact_dir)
+    if name in store:
+        return store.load(name)
+    return joblib.load(LEGACY_MODEL_DIR / MODEL_FILES[name])
+
+
+# -------------------------
+# Input / output
+# -------------------------
+
+def _file_format(path, explicit=None):
+    if explicit:
+        return explicit
+    return "parquet" if str(path).lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, file_format=None):
+    """Yield DataFrames of at most chunk_size rows without loading the whole file."""
+    if _file_format(path, file_format) == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet input requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+    if str(path) == "-":
+        yield from pd.read_csv(sys.stdin, chunksize=chunk_size)
+        return
+    yield from pd.read_csv(path, chunksize=chunk_size, encoding="utf-8-sig")
+
+
+def input_types(path, file_format=None):
+    """Arrow type per column of a Parquet input, or None for CSV (typed per chunk by pandas)."""
+    if _file_format(path, file_format) != "parquet":
+        return None
+    import pyarrow.parquet as pq
+    return {field.name: field.type for field in pq.ParquetFile(path).schema_arrow}
+
+
+def output_schema(schema, matched, columns, source_types=None):
+    """
+    Arrow schema of the scored output.
+
+    Feature columns take the feature schema's dtype (int64 or float64), other
+    input columns keep their Parquet type or are strings for CSV input, and
+    the appended columns are ``prediction`` (string), ``prediction_value``
+    (int64) and ``error`` (string).
+
+    Args:
+        schema: FeatureSchema of the model
+        matched: schema.match_columns() result for the input header
+        columns: Input column names in order
+        source_types: input_types() result, if any
+    """
+    import pyarrow as pa
+    feature_types = {
+        column: pa.int64() if feature.dtype == "int" else pa.float64()
+        for feature, column in zip(schema.features, matched) if column is not None
+    }
+    fields = []
+    for column in columns:
+        if column in OUTPUT_COLUMNS:
+            continue  # overwritten by the scored values
+        if column in feature_types:
+            type_ = feature_types[column]
+        elif source_types is not None and column in source_types:
+            type_ = source_types[column]
+        else:
+            type_ = pa.string()
+        fields.append(pa.field(str(column), type_))
+    fields += [
+        pa.field("prediction", pa.string()),
+        pa.field("prediction_value", pa.int64()),
+        pa.field("error", pa.string()),
+    ]
+    return pa.schema(fields)
+
+
+def _arrow_column(values, type_):
+    import pyarrow as pa
+    if pa.types.is_integer(type_) or pa.types.is_floating(type_):
+        numeric = pd.to_numeric(values, errors="coerce")
+        if pa.types.is_integer(type_):
+            # Non-integral inputs are written as null; the row's error says why
+            numeric = numeric.where(numeric == np.round(numeric))
+        return pa.array(numeric, type=type_, from_pandas=True)
+    if pa.types.is_string(type_) or pa.types.is_large_string(type_):
+        text = values.astype(object).where(values.notna(), None)
+        return pa.array([v if v is None or isinstance(v, str) else str(v) for v in text], type=type_)
+    return pa.array(values, type=type_, from_pandas=True)
+
+
+class ChunkWriter:
+    """
+    Append scored chunks to a CSV (or stdout) or Parquet file.
+
+    Args:
+        path: Output path ("-" for CSV on stdout)
+        file_format: "csv" or "parquet" (default: from the extension)
+        schema: Arrow schema every Parquet chunk is converted to (required for Parquet)
+    """
+
+    def __init__(self, path, file_format=None, schema=None):
+        self.path = str(path)
+        self.format = _file_format(path, file_format)
+        self.schema = schema
+        if self.format == "parquet" and schema is None:
+            raise ValueError("Parquet output needs an explicit schema (see output_schema)")
+        self._file = None
+        self._parquet = None
+
+    def write(self, frame):
+        if self.format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_arrays(
+                [_arrow_column(frame[field.name], field.type) for field in self.schema], schema=self.schema
+            )
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, self.schema)
+            self._parquet.write_table(table)
+            return
+        first = self._file is None
+        if first:
+            self._file = sys.stdout if self.path == "-" else open(self.path, "w", newline="")
+        frame.to_csv(self._file, header=first, index=False)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._file is not None and self._file is not sys.stdout:
+            self._file.close()
+
+
+# -------------------------
+# Worker side
+# -------------------------
+
+_WORKER = {}
+
+
+def _init_worker(name, artifact_dir):
+    # The bundled heart model was fitted on a DataFrame; arrays are fine
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    _WORKER["model"] = load_model(name, artifact_dir)
+    _WORKER["schema"] = load_schemas()[name]
+
+
+def _score_matrix(matrix):
+    """Validate and score one chunk; returns (labels, error messages)."""
+    features, messages = _WORKER["schema"].validate_matrix(matrix)
+    labels = np.full(len(features), -1, dtype=np.int64)
+    valid = np.array([m is None for m in messages], dtype=bool)
+    if valid.any():
+        labels[valid] = _WORKER["model"].predict(features[valid])
+    return labels, messages
+
+
+# -------------------------
+# Driver
+# -------------------------
+
+def _feature_matrix(frame, columns):
+    """Numeric (n_rows, n_features) array in schema order; NaN marks missing/non-numeric."""
+    matrix = np.full((len(frame), len(columns)), np.nan, dtype=np.float64)
+    for i, column in enumerate(columns):
+        if column is not None:
+            matrix[:, i] = pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=np.float64)
+    return matrix
+
+
+def score_file(name, source, destination, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+               artifact_dir=DEFAULT_ARTIFACT_DIR, input_format=None, output_format=None):
+    """
+    Score every row of source with the named model and write to destination.
+
+    Args:
+        name: Model name (diabetes, heart, parkinsons)
+        source: Input CSV/Parquet path ("-" for CSV on stdin)
+        destination: Output CSV/Parquet path ("-" for CSV on stdout)
+        chunk_size: Rows per chunk
+        workers: Scoring processes (defaults to all cores; 1 scores in-process)
+        artifact_dir: Model artifact directory (legacy .pkl files are the fallback)
+        input_format, output_format: "csv" or "parquet" (default: from the extension)
+
+    Returns:
+        Summary dict with row counts, seconds and rows_per_second
+    """
+    schema = load_schemas()[name]
+    positive, negative = LABELS[name]
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(name, artifact_dir))
+        submit = lambda matrix: pool.submit(_score_matrix, matrix)  # noqa: E731
+    else:
+        pool = None
+        _init_worker(name, artifact_dir)
+        submit = _ImmediateResult.of(_score_matrix)
+
+    writer = None
+    pending = deque()
+    columns = None
+    rows = invalid = 0
+    start = last_report = time.perf_counter()
+
+    def drain(limit):
+        nonlocal rows, invalid, last_report
+        while len(pending) > limit:
+            frame, future = pending.popleft()
+            labels, messages = future.result()
+            frame["prediction"] = np.where(labels == 1, positive, np.where(labels == 0, negative, ""))
+            frame["prediction_value"] = labels
+            frame["error"] = messages
+            writer.write(frame)
+            rows += len(frame)
+            invalid += int((labels < 0).sum())
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_SECONDS:
+                last_report = now
+                logger.info(f"{rows:,} rows scored ({rows / (now - start):,.0f} rows/s)")
+
+    try:
+        for frame in read_chunks(source, chunk_size, input_format):
+            if columns is None:
+                columns = schema.match_columns(frame.columns)
+                unmatched = [f.name for f, c in zip(schema.features, columns) if c is None and f.required]
+                if unmatched:
+                    raise ValueError(f"Input is missing required columns for {name}: {', '.join(unmatched)}")
+                arrow_schema = None
+                if _file_format(destination, output_format) == "parquet":
+                    arrow_schema = output_schema(schema, columns, list(frame.columns),
+                                                 input_types(source, input_format))
+                writer = ChunkWriter(destination, output_format, arrow_schema)
+            pending.append((frame, submit(_feature_matrix(frame, columns))))
+            drain(2 * workers)
+        drain(0)
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "model": name,
+        "rows": rows,
+        "valid": rows - invalid,
+        "invalid": invalid,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed) if elapsed else None,
+        "workers": workers,
+        "chunk_size": chunk_size,
+    }
+
+
+class _ImmediateResult:
+    """Future-like wrapper so in-process scoring shares the pooled code path."""
+
+    def __init__(self, value):
+        self._value = value
+
+    def result(self):
+        return self._value
+
+    @classmethod
+    def of(cls, fn):
+        return lambda *args: cls(fn(*args))
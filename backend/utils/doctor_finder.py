@@ -1 +1,385 @@
-# placeholder
+"""
+Local doctor search over data/doctor_data.json.
+
+Doctor records are stored column-wise (NumPy arrays for coordinates, ratings
+and coded specialty/city) with three indexes built once at load time:
+
+- (specialty, city) -> doctor ids, pre-sorted by rating, so a
+  "condition + city" query is a dictionary lookup and a slice;
+- specialty -> doctor ids, for queries without a known city;
+- (specialty, lat/lon grid cell) -> doctor ids, for "near these coordinates"
+  queries, which only scan the cells overlapping the search radius.
+
+Conditions are mapped to specialties with a keyword table, falling back to
+the local symptom lookup. An unrecognized condition, or a query that finds
+nothing locally, returns an empty list so the caller can fall back to the
+remote doctor model.
+
+The repository ships ``data/doctor_data.json`` empty: the directory is
+deployment data, not code. Export it from your clinic/doctor directory as a
+JSON list (or ``{"doctors": [...]}``) and point ``DOCTOR_DATA_PATH`` at it or
+replace the bundled file; until then every search takes the remote path.
+Each record is a dict with at least ``name`` and ``specialty``; ``city``,
+``latitude``, ``longitude``, ``rating`` and any other fields (address,
+phone, ...) are optional, e.g.::
+
+    {"name": "Dr. A. Rao", "specialty": "Cardiologist", "city": "Pune",
+     "latitude": 18.52, "longitude": 73.85, "rating": 4.6,
+     "address": "...", "phone": "..."}
+"""
+
+import json
+import logging
+import math
+import os
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_PATH = Path(os.environ.get(
+    "DOCTOR_DATA_PATH", Path(__file__).resolve().parent.parent / "data" / "doctor_data.json"
+))
+
+GENERAL_PHYSICIAN = "general physician"
+
+# Condition / symptom keywords -> specialty
+CONDITION_SPECIALTIES = {
+    "heart": "cardiologist",
+    "cardiac": "cardiologist",
+    "chest pain": "cardiologist",
+    "heart attack": "cardiologist",
+    "blood pressure": "cardiologist",
+    "hypertension": "cardiologist",
+    "shortness of breath": "pulmonologist",
+    "asthma": "pulmonologist",
+    "lung": "pulmonologist",
+    "migraine": "neurologist",
+    "headache": "neurologist",
+    "parkinson": "neurologist",
+    "seizure": "neurologist",
+    "stroke": "neurologist",
+    "diabetes": "endocrinologist",
+    "diabetic": "endocrinologist",
+    "thyroid": "endocrinologist",
+    "sore throat": "ent specialist",
+    "strep throat": "ent specialist",
+    "ear": "ent specialist",
+    "sinus": "ent specialist",
+    "abdominal pain": "gastroenterologist",
+    "gastroenteritis": "gastroenterologist",
+    "diarrhea": "gastroenterologist",
+    "stomach": "gastroenterologist",
+    "skin": "dermatologist",
+    "rash": "dermatologist",
+    "acne": "dermatologist",
+    "pregnancy": "gynecologist",
+    "period": "gynecologist",
+    "child": "pediatrician",
+    "kidney": "nephrologist",
+    "bone": "orthopedist",
+    "fracture": "orthopedist",
+    "joint": "orthopedist",
+    "depression": "psychiatrist",
+    "anxiety": "psychiatrist",
+    "eye": "ophthalmologist",
+    "vision": "ophthalmologist",
+    "tooth": "dentist",
+    "cold": GENERAL_PHYSICIAN,
+    "flu": GENERAL_PHYSICIAN,
+    "fever": GENERAL_PHYSICIAN,
+    "cough": GENERAL_PHYSICIAN,
+}
+
+# Fields stored in columns; anything else is kept as per-doctor details
+_CORE_FIELDS = frozenset({"name", "specialty", "city", "latitude", "longitude", "rating"})
+
+GRID_CELL_DEGREES = 0.25  # ~28 km at the equator
+_CELL_SPACE = 10 ** 10  # cell keys are below this, so specialty * _CELL_SPACE + cell is unique
+DEFAULT_RADIUS_KM = 25.0
+EARTH_RADIUS_KM = 6371.0
+
+
+def _norm(value) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def parse_location(location: str):
+    """
+    Split a free-form location into (city, latitude, longitude).
+
+    "12.97,77.59" is treated as coordinates; anything else as a city name
+    (only the part before the first comma, so "Pune, Maharashtra" -> "pune").
+    """
+    parts = [p.strip() for p in str(location or "").split(",")]
+    if len(parts) == 2:
+        try:
+            return None, float(parts[0]), float(parts[1])
+        except ValueError:
+            pass
+    return (_norm(parts[0]) or None), None, None
+
+
+class DoctorIndex:
+    """
+    Column store plus specialty, city and geospatial indexes over doctors.
+
+    Args:
+        records: Iterable of doctor dicts
+        cell_degrees: Size of a geospatial grid cell in degrees
+    """
+
+    def __init__(self, records, cell_degrees=GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.names = []
+        self.details = []  # remaining record fields, None when there are none
+        self.specialties = []  # code -> specialty
+        self.cities = []  # code -> city
+        specialty_codes, city_codes = {}, {}
+        spec_col, city_col, lat_col, lon_col, rating_col = [], [], [], [], []
+
+        for record in records:
+            specialty = _norm(record.get("specialty")) or GENERAL_PHYSICIAN
+            city = _norm(record.get("city"))
+            spec_col.append(specialty_codes.setdefault(specialty, len(specialty_codes)))
+            city_col.append(city_codes.setdefault(city, len(city_codes)))
+            lat = record.get("latitude")
+            lon = record.get("longitude")
+            lat_col.append(np.nan if lat is None else float(lat))
+            lon_col.append(np.nan if lon is None else float(lon))
+            rating_col.append(float(record.get("rating") or 0.0))
+            self.names.append(record.get("name", ""))
+            extra = {k: v for k, v in record.items() if k not in _CORE_FIELDS}
+            self.details.append(extra or None)
+
+        self.specialties = list(specialty_codes)
+        self.cities = list(city_codes)
+        self.specialty_codes = specialty_codes
+        self.city_codes = city_codes
+        self.specialty = np.asarray(spec_col, dtype=np.int32)
+        self.city = np.asarray(city_col, dtype=np.int32)
+        self.lat = np.asarray(lat_col, dtype=np.float64)
+        self.lon = np.asarray(lon_col, dtype=np.float64)
+        self.rating = np.asarray(rating_col, dtype=np.float32)
+
+        self._build_indexes()
+
+    # --- construction ----------------------------------------------------
+
+    @classmethod
+    def from_json(cls, path=DEFAULT_DATA_PATH):
+        """Load doctors from a JSON list (an empty or missing file gives an empty index)."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = f.read().strip()
+        except FileNotFoundError:
+            raw = ""
+        records = json.loads(raw) if raw else []
+        if isinstance(records, dict):
+            records = records.get("doctors", [])
+        return cls(records)
+
+    def _group(self, keys, order):
+        """Split ``order`` (doctor ids) into {key: ids} runs of equal ``keys[order]``."""
+        if len(order) == 0:
+            return {}
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        starts = np.concatenate(([0], boundaries))
+        return {
+            int(sorted_keys[start]): ids
+            for start, ids in zip(starts, np.split(order, boundaries))
+        }
+
+    def _build_indexes(self):
+        n = len(self.names)
+        # Best-rated first; stable sort keeps file order among equal ratings
+        by_rating = np.argsort(-self.rating, kind="stable")
+
+        self.by_specialty = self._group(self.specialty, by_rating[np.argsort(self.specialty[by_rating], kind="stable")])
+
+        pair = self.specialty.astype(np.int64) * max(len(self.cities), 1) + self.city
+        self.by_specialty_city = self._group(pair, by_rating[np.argsort(pair[by_rating], kind="stable")])
+
+        located = np.flatnonzero(~(np.isnan(self.lat) | np.isnan(self.lon))) if n else np.array([], dtype=np.int64)
+        cells = np.full(n, -1, dtype=np.int64)
+        cells[located] = self.specialty[located].astype(np.int64) * _CELL_SPACE + self._cell_key(self.lat[located], self.lon[located])
+        self.by_specialty_cell = self._group(cells, located[np.argsort(cells[located], kind="stable")])
+
+    def _cell_coords(self, lat, lon):
+        return (
+            np.floor((np.asarray(lat) + 90.0) / self.cell_degrees).astype(np.int64),
+            np.floor((np.asarray(lon) + 180.0) / self.cell_degrees).astype(np.int64),
+        )
+
+    def _cell_key(self, lat, lon):
+        row, col = self._cell_coords(lat, lon)
+        return row * 100_000 + col
+
+    # --- queries ---------------------------------------------------------
+
+    def specialties_for(self, condition: str):
+        """
+        Specialties (known to this index) that treat a condition.
+
+        Empty when the condition is not recognized, so the caller asks the
+        remote model instead of listing arbitrary general physicians.
+        """
+        condition = _norm(condition)
+        padded = f" {condition} "
+        wanted = []
+        if condition in self.specialty_codes:
+            wanted.append(condition)
+        for keyword, specialty in CONDITION_SPECIALTIES.items():
+            if f" {keyword} " in padded and specialty not in wanted:
+                wanted.append(specialty)
+        if not wanted:
+            wanted.extend(self._specialties_from_symptoms(condition))
+        return [s for s in wanted if s in self.specialty_codes]
+
+    @staticmethod
+    def _specialties_from_symptoms(condition):
+        try:
+            from utils.symptom_lookup import get_engine
+            matches = get_engine().search([condition], top_k=1)
+        except Exception:
+            return []
+        if not matches:
+            return []
+        specialty = CONDITION_SPECIALTIES.get(matches[0]["disease"])
+        return [specialty] if specialty else []
+
+    def _near(self, spec_codes, lat, lon, radius_km):
+        reach = max(1, math.ceil(radius_km / (111.0 * self.cell_degrees)))
+        row, col = self._cell_coords(lat, lon)
+        lon_reach = math.ceil(reach / max(math.cos(math.radians(lat)), 0.01))
+        chunks = []
+        for code in spec_codes:
+            for r in range(int(row) - reach, int(row) + reach + 1):
+                for c in range(int(col) - lon_reach, int(col) + lon_reach + 1):
+                    ids = self.by_specialty_cell.get(code * _CELL_SPACE + r * 100_000 + c)
+                    if ids is not None:
+                        chunks.append(ids)
+        if not chunks:
+            return np.array([], dtype=np.int64), np.array([])
+        ids = np.concatenate(chunks)
+        distance = haversine_km(lat, lon, self.lat[ids], self.lon[ids])
+        keep = distance <= radius_km
+        return ids[keep], distance[keep]
+
+    def search(self, condition, location=None, latitude=None, longitude=None,
+               limit=5, radius_km=DEFAULT_RADIUS_KM):
+        """
+        Rank doctors for a condition near a location.
+
+        Args:
+            condition: Condition, symptom or specialty name
+            location: City name or "lat,lon" string
+            latitude, longitude: Explicit coordinates (take precedence)
+            limit: Maximum number of doctors to return
+            radius_km: Search radius for coordinate queries
+
+        Returns:
+            List of doctor dicts (empty when nothing matches locally)
+        """
+        specialties = self.specialties_for(condition)
+        if not specialties:
+            return []
+        spec_codes = [self.specialty_codes[s] for s in specialties]
+
+        city = None
+        if latitude is None or longitude is None:
+            city, latitude, longitude = parse_location(location)
+
+        if latitude is not None and longitude is not None:
+            ids, distance = self._near(spec_codes, float(latitude), float(longitude), radius_km)
+            if len(ids) == 0:
+                return []
+            # Closer and better rated first: each km costs 0.1 rating points
+            score = self.rating[ids] - 0.1 * distance
+            top = np.argsort(-score, kind="stable")[:limit]
+            return [self._record(int(ids[i]), float(distance[i])) for i in top]
+
+        if city is not None:
+            city_code = self.city_codes.get(city)
+            if city_code is None:
+                return []
+            width = max(len(self.cities), 1)
+            chunks = [
+                self.by_specialty_city.get(code * width + city_code)
+                for code in spec_codes
+            ]
+        else:
+            chunks = [self.by_specialty.get(code) for code in spec_codes]
+        chunks = [c[:limit] for c in chunks if c is not None]
+        if not chunks:
+            return []
+        ids = np.concatenate(chunks)
+        if len(chunks) > 1:
+            ids = ids[np.argsort(-self.rating[ids], kind="stable")]
+        return [self._record(int(i)) for i in ids[:limit]]
+
+    def _record(self, doctor_id, distance_km=None):
+        record = {
+            "name": self.names[doctor_id],
+            "specialty": self.specialties[self.specialty[doctor_id]],
+            "city": self.cities[self.city[doctor_id]] or None,
+            "rating": round(float(self.rating[doctor_id]), 2),
+        }
+        if not np.isnan(self.lat[doctor_id]):
+            record["latitude"] = float(self.lat[doctor_id])
+            record["longitude"] = float(self.lon[doctor_id])
+        if distance_km is not None:
+            record["distance_km"] = round(distance_km, 2)
+        if self.details[doctor_id]:
+            record.update(self.details[doctor_id])
+        return record
+
+    def __len__(self):
+        return len(self.names)
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distance from one point to arrays of points, in km."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def format_doctors(doctors) -> str:
+    """Plain-text listing in the style of the remote doctor model's output."""
+    lines = []
+    for i, doctor in enumerate(doctors, 1):
+        line = f"{i}. {doctor['name']} - {doctor['specialty'].title()}"
+        if doctor.get("city"):
+            line += f", {doctor['city'].title()}"
+        if doctor.get("rating"):
+            line += f" (rating {doctor['rating']})"
+        if doctor.get("distance_km") is not None:
+            line += f", {doctor['distance_km']} km away"
+        for key in ("address", "phone"):
+            if doctor.get(key):
+                line += f"\n   {key.title()}: {doctor[key]}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+_index = None
+_index_lock = Lock()
+
+
+def get_doctor_index(path=DEFAULT_DATA_PATH) -> DoctorIndex:
+    """Process-wide index, loaded from the bundled JSON on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DoctorIndex.from_json(path)
+                if len(_index):
+                    logger.info(f"Doctor index: {len(_index)} doctors from {path}")
+                else:
+                    logger.warning(f"No doctors in {path}; doctor searches use the remote model")
+    return _index
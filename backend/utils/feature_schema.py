@@ -0,0 +1,319 @@
+"""
+Declarative feature schemas for the /predict models.
+
+Schemas are generated from the headers and columns of the training CSVs the
+models were fitted on (diabetes.csv, heart.csv, parkinsons.csv): feature
+order, dtype (small integer-coded columns are categorical ints, the rest are
+floats), an accepted range (the observed range widened by half its span) and
+the training median used as default where a model allows defaults.
+
+``FeatureSchema.validate`` takes a single record or a batch of records and in
+one pass coerces them into a contiguous float64 array in training column
+order, collecting structured per-field errors instead of raising.
+"""
+
+import csv
+import math
+from pathlib import Path
+
+import numpy as np
+
+TRAINING_DATA_DIR = (
+    Path(__file__).resolve().parent.parent / "models" / "ml" / "Multiple-Disease-Prediction-System-main"
+)
+
+# Columns with at most this many distinct integer values are categorical
+MAX_CATEGORIES = 10
+RANGE_MARGIN = 0.5
+
+# Short API names for the Parkinson's voice measures (the CSV headers such as
+# "MDVP:Fo(Hz)" are accepted too)
+PARKINSONS_ALIASES = {
+    "MDVP:Fo(Hz)": "fo",
+    "MDVP:Fhi(Hz)": "fhi",
+    "MDVP:Flo(Hz)": "flo",
+    "MDVP:Jitter(%)": "jitter_percent",
+    "MDVP:Jitter(Abs)": "jitter_abs",
+    "MDVP:RAP": "rap",
+    "MDVP:PPQ": "ppq",
+    "Jitter:DDP": "ddp",
+    "MDVP:Shimmer": "shimmer",
+    "MDVP:Shimmer(dB)": "shimmer_db",
+    "Shimmer:APQ3": "apq3",
+    "Shimmer:APQ5": "apq5",
+    "MDVP:APQ": "apq",
+    "Shimmer:DDA": "dda",
+    "NHR": "nhr",
+    "HNR": "hnr",
+    "RPDE": "rpde",
+    "DFA": "dfa",
+    "spread1": "spread1",
+    "spread2": "spread2",
+    "D2": "d2",
+    "PPE": "ppe",
+}
+
+# name -> (csv file, target column, columns to drop, aliases, required fields)
+# required=None means every feature is required (no defaults)
+MODEL_DATASETS = {
+    "diabetes": ("diabetes.csv", "Outcome", (), {}, None),
+    "heart": ("heart.csv", "target", (), {}, None),
+    "parkinsons": (
+        "parkinsons.csv", "status", ("name",), PARKINSONS_ALIASES,
+        ("fo", "fhi", "flo", "jitter_percent", "shimmer", "nhr", "hnr"),
+    ),
+}
+
+
+class Feature:
+    """A single model input column."""
+
+    __slots__ = ("name", "column", "dtype", "min", "max", "default", "required", "keys")
+
+    def __init__(self, name, column, dtype, min, max, default, required):
+        self.name = name
+        self.column = column
+        self.dtype = dtype
+        self.min = min
+        self.max = max
+        self.default = default
+        self.required = required
+        # Accepted request keys, matched case-insensitively
+        self.keys = tuple(dict.fromkeys([name, column, name.lower(), column.lower()]))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "column": self.column,
+            "dtype": self.dtype,
+            "min": self.min,
+            "max": self.max,
+            "default": None if self.required else self.default,
+            "required": self.required,
+        }
+
+
+class FeatureSchema:
+    """Ordered list of features for one model."""
+
+    def __init__(self, model, features):
+        self.model = model
+        self.features = list(features)
+        self.names = [f.name for f in self.features]
+        self._mins = np.array([f.min for f in self.features], dtype=np.float64)
+        self._maxs = np.array([f.max for f in self.features], dtype=np.float64)
+        self._lookup = {}
+        for i, feature in enumerate(self.features):
+            for key in feature.keys:
+                self._lookup.setdefault(key.lower(), i)
+
+    @classmethod
+    def from_csv(cls, model, path, target, drop=(), aliases=None, required=None):
+        """
+        Build a schema from a training CSV.
+
+        Args:
+            model: Model name
+            path: Training CSV
+            target: Label column (excluded)
+            drop: Other non-feature columns (e.g. recording name)
+            aliases: Mapping of CSV column -> API field name
+            required: Field names that must be provided; others default to
+                the training median. None makes every field required.
+        """
+        aliases = aliases or {}
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = [h.strip() for h in next(reader)]
+            rows = [row for row in reader if row]
+
+        features = []
+        for j, column in enumerate(header):
+            if column == target or column in drop:
+                continue
+            values = np.array([float(row[j]) for row in rows], dtype=np.float64)
+            lo, hi = float(values.min()), float(values.max())
+            distinct = np.unique(values)
+            categorical = len(distinct) <= MAX_CATEGORIES and np.all(distinct == np.round(distinct))
+            if categorical:
+                dtype, vmin, vmax = "int", lo, hi
+            else:
+                margin = (hi - lo) * RANGE_MARGIN
+                dtype = "float"
+                vmin = 0.0 if lo >= 0 and lo - margin < 0 else lo - margin
+                vmax = hi + margin
+            name = aliases.get(column, column)
+            features.append(Feature(
+                name=name,
+                column=column,
+                dtype=dtype,
+                min=round(vmin, 6),
+                max=round(vmax, 6),
+                default=float(np.median(values)),
+                required=required is None or name in required,
+            ))
+        return cls(model, features)
+
+    def to_dict(self):
+        return {"model": self.model, "features": [f.to_dict() for f in self.features]}
+
+    def validate(self, payload):
+        """
+        Validate and coerce one record (dict) or a batch (list of dicts).
+
+        Returns:
+            Tuple of (array, errors, imputed, is_batch):
+            - array: float64 C-contiguous array of shape (n_records, n_features)
+            - errors: list of {"row", "field", "code", "message"} dicts
+            - imputed: per-row lists of fields filled with defaults
+            - is_batch: whether the payload was a batch
+        """
+        is_batch = isinstance(payload, list)
+        records = payload if is_batch else [payload]
+        n, k = len(records), len(self.features)
+        out = np.empty((n, k), dtype=np.float64)
+        seen = np.zeros((n, k), dtype=bool)
+        errors, imputed = [], []
+
+        for r, record in enumerate(records):
+            row_imputed = []
+            imputed.append(row_imputed)
+            invalid = set()
+            if not isinstance(record, dict):
+                errors.append(field_error(r, None, "invalid_record", "Each record must be a JSON object"))
+                continue
+            row = out[r]
+            row_seen = seen[r]
+            for key, value in record.items():
+                i = self._lookup.get(key.lower()) if isinstance(key, str) else None
+                if i is None or row_seen[i]:
+                    continue
+                feature = self.features[i]
+                number = coerce(value, feature.dtype)
+                if number is None:
+                    invalid.add(i)
+                    errors.append(field_error(
+                        r, feature.name, "invalid_type",
+                        f"Expected {'an integer' if feature.dtype == 'int' else 'a number'}, got {value!r}",
+                    ))
+                    continue
+                row[i] = number
+                row_seen[i] = True
+            for i in np.flatnonzero(~row_seen):
+                if i in invalid:
+                    continue
+                feature = self.features[i]
+                if feature.required:
+                    errors.append(field_error(r, feature.name, "missing", "Missing required feature"))
+                else:
+                    row[i] = feature.default
+                    row_imputed.append(feature.name)
+
+        # Range checks for every row at once
+        bad_rows, bad_cols = np.nonzero(seen & ((out < self._mins) | (out > self._maxs)))
+        for r, i in zip(bad_rows.tolist(), bad_cols.tolist()):
+            feature = self.features[i]
+            errors.append(field_error(
+                r, feature.name, "out_of_range",
+                f"{out[r, i]:g} is outside the accepted range [{feature.min:g}, {feature.max:g}]",
+            ))
+        errors.sort(key=lambda e: (e["row"], e["field"] or ""))
+        return out, errors, imputed, is_batch
+
+    def match_columns(self, names):
+        """
+        Map input column names (e.g. a CSV header) onto the schema.
+
+        Returns:
+            List with, for each feature, the matching input name or None
+        """
+        matched = [None] * len(self.features)
+        for name in names:
+            i = self._lookup.get(str(name).strip().lower())
+            if i is not None and matched[i] is None:
+                matched[i] = name
+        return matched
+
+    def validate_matrix(self, matrix):
+        """
+        Vectorized validation for bulk scoring.
+
+        Args:
+            matrix: (n_rows, n_features) float64 array in schema order, with
+                NaN for missing or non-numeric values
+
+        Returns:
+            Tuple of (array with defaults filled in, per-row error message or
+            None for valid rows)
+        """
+        out = np.array(matrix, dtype=np.float64, copy=True)
+        missing = np.isnan(out)
+        required = np.array([f.required for f in self.features])
+        defaults = np.array([f.default for f in self.features], dtype=np.float64)
+        is_int = np.array([f.dtype == "int" for f in self.features])
+
+        out = np.where(missing & ~required, defaults, out)
+        missing_required = missing & required
+        present = ~missing
+        with np.errstate(invalid="ignore"):
+            not_int = present & is_int & (out != np.round(out))
+            out_of_range = present & ((out < self._mins) | (out > self._maxs))
+
+        messages = [None] * len(out)
+        problems = (("missing_or_invalid", missing_required), ("not_integer", not_int), ("out_of_range", out_of_range))
+        bad_rows = np.flatnonzero(missing_required.any(axis=1) | not_int.any(axis=1) | out_of_range.any(axis=1))
+        for r in bad_rows.tolist():
+            messages[r] = "; ".join(
+                f"{code}: {', '.join(self.names[i] for i in np.flatnonzero(mask[r]))}"
+                for code, mask in problems if mask[r].any()
+            )
+        return out, messages
+
+
+def coerce(value, dtype):
+    """A finite float for a request value of the given dtype ("int"/"float"), or None if invalid."""
+    if isinstance(value, bool):
+        return float(value) if dtype == "int" else None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(number):
+        return None
+    if dtype == "int" and number != int(number):
+        return None
+    return number
+
+
+def field_error(row, field, code, message):
+    """Validation error entry as returned in 400 responses."""
+    return {"row": row, "field": field, "code": code, "message": message}
+
+
+def load_schemas(data_dir=TRAINING_DATA_DIR):
+    """Schemas for every model whose training CSV is available."""
+    schemas = {}
+    for model, (filename, target, drop, aliases, required) in MODEL_DATASETS.items():
+        path = Path(data_dir) / filename
+        if path.exists():
+            schemas[model] = FeatureSchema.from_csv(model, path, target, drop, aliases, required)
+    return schemas
+
+
+def load_dataset(model, data_dir=TRAINING_DATA_DIR):
+    """
+    Read a model's training CSV in model column order.
+
+    Returns:
+        Tuple of (X float64 array, y int array, feature column names)
+    """
+    filename, target, drop, _, _ = MODEL_DATASETS[model]
+    with open(Path(data_dir) / filename, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        rows = [row for row in reader if row]
+    columns = [j for j, h in enumerate(header) if h != target and h not in drop]
+    target_index = header.index(target)
+    X = np.array([[float(row[j]) for j in columns] for row in rows], dtype=np.float64)
+    y = np.array([int(float(row[target_index])) for row in rows])
+    return X, y, [header[j] for j in columns]
@@ -0,0 +1,338 @@
+"""
+Durable background jobs backed by SQLite.
+
+``JobQueue.submit`` stores a job and returns at once; a pool of worker
+threads claims queued jobs, runs the handler registered for the job's kind
+and stores the result, and optionally POSTs the finished job to a callback
+URL. Clients poll with ``get``.
+
+Durability: jobs live in a SQLite database (WAL mode), and a claimed job
+holds a lease identified by an owner token. A heartbeat thread renews the
+leases of running jobs, so a slow handler keeps its job; if the process dies
+mid-job the lease expires and another worker (in this or any other process
+sharing the file) picks it up again, up to ``max_attempts``. A worker that
+lost its lease cannot store its result or requeue the job: those updates
+only apply while it still owns the lease. Claiming is a single atomic
+UPDATE ... RETURNING, so several gunicorn workers can share one database.
+
+Idempotency: a submit with an idempotency key that was already used for the
+same kind returns the existing job instead of enqueuing a duplicate; reusing
+a key with a different payload raises ``IdempotencyConflict``.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = ("succeeded", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    payload_hash TEXT NOT NULL,
+    idempotency_key TEXT UNIQUE,
+    callback_url TEXT,
+    callback_status TEXT,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_until REAL,
+    lease_owner TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+"""
+
+
+class IdempotencyConflict(ValueError):
+    """An idempotency key was reused with a different payload."""
+
+
+class PermanentJobError(Exception):
+    """
+    Raised by a handler for failures that retrying cannot fix.
+
+    Args:
+        message: Error message stored on the job
+        result: Optional result body stored alongside the error
+    """
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+class JobQueue:
+    """
+    Args:
+        db_path: SQLite database file
+        handlers: Mapping of job kind -> callable(payload) returning a JSON-able result
+        workers: Worker threads in this process
+        lease_seconds: How long a claimed job is reserved without a heartbeat
+            before it may be retried (renewed every third of that while running)
+        max_attempts: Attempts before a job fails for good
+        poll_interval: Seconds between checks for jobs submitted by other processes
+        retention_seconds: Finished jobs older than this are deleted
+        callback_timeout: Seconds allowed per callback POST
+    """
+
+    def __init__(self, db_path, handlers, workers=2, lease_seconds=300, max_attempts=3,
+                 poll_interval=1.0, retention_seconds=7 * 86400, callback_timeout=10):
+        self.db_path = str(db_path)
+        self.handlers = dict(handlers)
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.callback_timeout = callback_timeout
+
+        self._local = threading.local()
+        self._wakeup = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        self._leases = {}  # job id -> owner token, for jobs running in this process
+        self._leases_lock = threading.Lock()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "lease_owner" not in columns:
+            try:
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_owner TEXT")
+            except sqlite3.OperationalError:
+                pass  # added by another process just now
+
+    # --- storage ---------------------------------------------------------
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_dict(row, include_payload=False):
+        job = {
+            "id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        if row["callback_url"]:
+            job["callback_status"] = row["callback_status"]
+        if include_payload:
+            job["payload"] = json.loads(row["payload"])
+        return job
+
+    # --- client API ------------------------------------------------------
+
+    def submit(self, kind, payload, idempotency_key=None, callback_url=None):
+        """
+        Enqueue a job, or return the existing one for a reused idempotency key.
+
+        Returns:
+            Tuple of (job dict, created)
+
+        Raises:
+            IdempotencyConflict: key reused with a different payload
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        body = json.dumps(payload, sort_keys=True)
+        payload_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        key = f"{kind}:{idempotency_key}" if idempotency_key else None
+        now = time.time()
+        job_id = uuid.uuid4().hex
+
+        conn = self._connection()
+        cursor = conn.execute(
+            "INSERT INTO jobs (id, kind, status, payload, payload_hash, idempotency_key, callback_url,"
+            " available_at, created_at) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(idempotency_key) DO NOTHING",
+            (job_id, kind, body, payload_hash, key, callback_url, now, now),
+        )
+        if cursor.rowcount == 1:
+            with self._wakeup:
+                self._wakeup.notify()
+            return self.get(job_id), True
+
+        row = conn.execute("SELECT * FROM jobs WHERE idempotency_key = ?", (key,)).fetchone()
+        if row["payload_hash"] != payload_hash:
+            raise IdempotencyConflict(f"Idempotency key '{idempotency_key}' was used with a different request")
+        return self._to_dict(row), False
+
+    def get(self, job_id):
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def stats(self):
+        rows = self._connection().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {"workers": self.workers, "jobs": {row["status"]: row["n"] for row in rows}}
+
+    # --- workers ---------------------------------------------------------
+
+    def start(self):
+        """Start the worker threads (idempotent)."""
+        if self._threads:
+            return self
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        logger.info(f"Job queue started with {self.workers} workers ({self.db_path})")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _claim(self):
+        now = time.time()
+        return self._connection().execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, lease_owner = ?,"
+            " started_at = ?"
+            " WHERE id = (SELECT id FROM jobs"
+            "   WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_until < ?)"
+            "   ORDER BY available_at LIMIT 1)"
+            " RETURNING *",
+            (now + self.lease_seconds, uuid.uuid4().hex, now, now, now),
+        ).fetchone()
+
+    def _heartbeat(self):
+        """Renew the leases of jobs running in this process until stopped."""
+        while not self._stop.wait(self.lease_seconds / 3):
+            with self._leases_lock:
+                leases = list(self._leases.items())
+            for job_id, owner in leases:
+                try:
+                    renewed = self._connection().execute(
+                        "UPDATE jobs SET lease_until = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                        (time.time() + self.lease_seconds, job_id, owner),
+                    ).rowcount
+                except sqlite3.OperationalError as e:
+                    logger.warning(f"Lease renewal for job {job_id} failed: {e}")
+                    continue
+                if not renewed:
+                    logger.warning(f"Job {job_id} lease was taken over; this attempt's result will be discarded")
+                    with self._leases_lock:
+                        self._leases.pop(job_id, None)
+
+    def _work(self):
+        last_purge = 0.0
+        while not self._stop.is_set():
+            try:
+                row = self._claim()
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Job claim failed: {e}")
+                row = None
+            if row is None:
+                if time.time() - last_purge > 3600:
+                    last_purge = time.time()
+                    self._purge()
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+            self._run(row)
+
+    def _run(self, row):
+        job_id, attempts, owner = row["id"], row["attempts"], row["lease_owner"]
+        if attempts > self.max_attempts:
+            self._finish(job_id, owner, "failed", error="Exceeded maximum attempts (worker lost during processing)")
+            return
+        with self._leases_lock:
+            self._leases[job_id] = owner
+        start = time.monotonic()
+        try:
+            result = self.handlers[row["kind"]](json.loads(row["payload"]))
+        except PermanentJobError as e:
+            self._finish(job_id, owner, "failed", result=e.result, error=str(e))
+        except Exception as e:
+            retry_after = getattr(e, "retry_after", None) or min(60, 2 ** attempts)
+            if attempts >= self.max_attempts:
+                logger.warning(f"Job {job_id} failed after {attempts} attempts: {e}")
+                self._finish(job_id, owner, "failed", error=str(e))
+            else:
+                logger.info(f"Job {job_id} attempt {attempts} failed ({e}); retrying in {retry_after}s")
+                requeued = self._connection().execute(
+                    "UPDATE jobs SET status = 'queued', available_at = ?, lease_until = NULL, lease_owner = NULL,"
+                    " error = ? WHERE id = ? AND lease_owner = ?",
+                    (time.time() + retry_after, str(e), job_id, owner),
+                ).rowcount
+                if not requeued:
+                    logger.warning(f"Job {job_id} attempt {attempts} lost its lease; not requeued")
+        else:
+            if self._finish(job_id, owner, "succeeded", result=result):
+                logger.info(f"Job {job_id} ({row['kind']}) finished in {time.monotonic() - start:.2f}s")
+        finally:
+            with self._leases_lock:
+                self._leases.pop(job_id, None)
+
+    def _finish(self, job_id, owner, status, result=None, error=None):
+        """Store the outcome if this worker still owns the job; returns whether it did."""
+        conn = self._connection()
+        finished = conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL, lease_owner = NULL"
+            " WHERE id = ? AND lease_owner = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id, owner),
+        ).rowcount
+        if not finished:
+            logger.warning(f"Job {job_id} lost its lease to another worker; discarding this attempt's result")
+            return False
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row["callback_url"]:
+            self._callback(row)
+        return True
+
+    def _callback(self, row):
+        job = self._to_dict(row)
+        job.pop("callback_status", None)
+        status = "failed"
+        for attempt in range(3):
+            try:
+                response = requests.post(row["callback_url"], json=job, timeout=self.callback_timeout)
+                if response.status_code < 400:
+                    status = f"delivered ({response.status_code})"
+                    break
+                status = f"failed ({response.status_code})"
+            except requests.RequestException as e:
+                status = f"failed ({type(e).__name__})"
+            time.sleep(2 ** attempt)
+        self._connection().execute("UPDATE jobs SET callback_status = ? WHERE id = ?", (status, row["id"]))
+
+    def _purge(self):
+        cutoff = time.time() - self.retention_seconds
+        placeholders = ", ".join("?" for _ in TERMINAL_STATES)
+        self._connection().execute(
+            f"DELETE FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?", (*TERMINAL_STATES, cutoff)
+        )
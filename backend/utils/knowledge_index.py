@@ -0,0 +1,406 @@
+"""
+Local embedding retrieval over the curated medical knowledge base.
+
+Passages come from data/symptom_disease.csv (one per disease row) and from
+remedy documents in data/knowledge/ (*.md / *.txt, split into paragraphs of
+up to ``MAX_PASSAGE_CHARS``). They are embedded once with a
+sentence-transformers model and stored in data/knowledge_index/:
+
+- ``embeddings.npy``: L2-normalized float16 matrix, opened memory-mapped,
+  so worker processes share the pages through the OS cache;
+- ``passages.json``: passage text and source per row;
+- ``manifest.json``: model, dimension and a fingerprint of the sources.
+  The index is rebuilt automatically when a source file or the model changes.
+
+A query is embedded (with an LRU cache, since chat traffic repeats the same
+questions) and scored by cosine similarity with an exact matrix-vector
+product plus argpartition for the top k. NumPy has no fast float16
+arithmetic, so indexes up to ``KNOWLEDGE_RESIDENT_MB`` are converted to a
+resident float32 copy once at load (under 1 ms per query at 10k passages of
+384 dimensions, ~6 ms at 40k); larger ones are streamed from the memmap in
+blocks of ``BLOCK_ROWS`` rows.
+See benchmarks/bench_knowledge_index.py.
+
+Build ahead of deployment with ``python -m utils.knowledge_index``. Worker
+processes that find the index missing or stale build it under an exclusive
+lock on ``.build.lock`` in the index directory, so only one of them embeds
+the corpus and the others load its result. If retrieval is unavailable,
+``get_index`` retries after ``KNOWLEDGE_RETRY_SECONDS``, doubling up to
+``KNOWLEDGE_RETRY_MAX_SECONDS``.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows - no advisory locks, assume a single process
+    fcntl = None
+
+from utils.symptom_lookup import DEFAULT_CSV_PATH, read_csv_rows
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DEFAULT_DOCS_DIR = DATA_DIR / "knowledge"
+DEFAULT_INDEX_DIR = DATA_DIR / "knowledge_index"
+DEFAULT_MODEL = os.environ.get("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+DOC_SUFFIXES = (".md", ".txt")
+MAX_PASSAGE_CHARS = 800
+BLOCK_ROWS = 16384
+RESIDENT_BYTES = int(float(os.environ.get("KNOWLEDGE_RESIDENT_MB", 64)) * 1e6)
+QUERY_CACHE_SIZE = 4096
+RETRY_SECONDS = float(os.environ.get("KNOWLEDGE_RETRY_SECONDS", 60))
+RETRY_MAX_SECONDS = float(os.environ.get("KNOWLEDGE_RETRY_MAX_SECONDS", 3600))
+_HEADING_RE = re.compile(r"^#+\s*")
+
+
+# -------------------------
+# Corpus
+# -------------------------
+
+def source_files(csv_path=DEFAULT_CSV_PATH, docs_dir=DEFAULT_DOCS_DIR):
+    files = [Path(csv_path)] if Path(csv_path).exists() else []
+    if Path(docs_dir).is_dir():
+        files += sorted(p for p in Path(docs_dir).rglob("*") if p.suffix.lower() in DOC_SUFFIXES)
+    return files
+
+
+def fingerprint(files, model_name):
+    """SHA-256 over the model name and every source file's name and contents."""
+    digest = hashlib.sha256(model_name.encode("utf-8"))
+    for path in files:
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def csv_passages(path):
+    for symptoms, disease, recommendation in read_csv_rows(path):
+        yield {
+            "source": path.name,
+            "title": disease,
+            "text": f"{disease}: symptoms include {', '.join(symptoms)}. Recommendation: {recommendation}.",
+        }
+
+
+def document_passages(path, max_chars=MAX_PASSAGE_CHARS):
+    """Split a document on blank lines, merging paragraphs up to max_chars."""
+    title = path.stem.replace("_", " ").replace("-", " ")
+    chunk = []
+
+    def flush():
+        if chunk:
+            yield {"source": path.name, "title": title, "text": "\n".join(chunk)}
+            chunk.clear()
+
+    for paragraph in re.split(r"\n\s*\n", path.read_text(encoding="utf-8")):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if paragraph.startswith("#"):
+            yield from flush()
+            heading, _, paragraph = paragraph.partition("\n")
+            title = _HEADING_RE.sub("", heading).strip() or title
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+        if chunk and sum(len(p) for p in chunk) + len(paragraph) > max_chars:
+            yield from flush()
+        chunk.append(paragraph)
+    yield from flush()
+
+
+def load_passages(csv_path=DEFAULT_CSV_PATH, docs_dir=DEFAULT_DOCS_DIR):
+    passages = []
+    for path in source_files(csv_path, docs_dir):
+        produced = csv_passages(path) if path.suffix.lower() == ".csv" else document_passages(path)
+        passages.extend(produced)
+    for i, passage in enumerate(passages):
+        passage["id"] = i
+    return passages
+
+
+# -------------------------
+# Embedding
+# -------------------------
+
+def load_encoder(model_name=DEFAULT_MODEL):
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        raise RuntimeError("Knowledge retrieval requires sentence-transformers (pip install sentence-transformers)")
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def build_index(index_dir=DEFAULT_INDEX_DIR, csv_path=DEFAULT_CSV_PATH, docs_dir=DEFAULT_DOCS_DIR,
+                model_name=DEFAULT_MODEL, encoder=None, batch_size=64):
+    """
+    Embed the corpus and write embeddings.npy, passages.json and manifest.json.
+
+    Returns:
+        The manifest dict
+    """
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    files = source_files(csv_path, docs_dir)
+    passages = load_passages(csv_path, docs_dir)
+    encoder = encoder or load_encoder(model_name)
+
+    start = time.perf_counter()
+    embeddings = encoder.encode(
+        [p["text"] for p in passages], batch_size=batch_size, normalize_embeddings=True,
+        convert_to_numpy=True, show_progress_bar=False,
+    ).astype(np.float16)
+    if embeddings.ndim != 2:
+        embeddings = embeddings.reshape(len(passages), -1)
+
+    manifest = {
+        "model": model_name,
+        "dimension": int(embeddings.shape[1]) if len(passages) else 0,
+        "passages": len(passages),
+        "sources": [p.name for p in files],
+        "fingerprint": fingerprint(files, model_name),
+        "build_seconds": round(time.perf_counter() - start, 3),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    # Write to temporary names unique to this build, then swap in, so readers
+    # never see a half-built index and concurrent builds never share a file
+    outputs = [
+        ("embeddings.npy", lambda f: np.save(f, embeddings)),
+        ("passages.json", lambda f: f.write(json.dumps(passages, ensure_ascii=False).encode("utf-8"))),
+        ("manifest.json", lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8"))),
+    ]
+    tmp_paths = []
+    try:
+        for name, write in outputs:
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=index_dir)
+            tmp_paths.append(tmp_path)
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+        # Manifest last: it is what marks the index as built
+        for (name, _), tmp_path in zip(outputs, tmp_paths):
+            os.replace(tmp_path, index_dir / name)
+    finally:
+        for tmp_path in tmp_paths:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return manifest
+
+
+def read_manifest(index_dir=DEFAULT_INDEX_DIR):
+    try:
+        return json.loads((Path(index_dir) / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def is_stale(index_dir=DEFAULT_INDEX_DIR, csv_path=DEFAULT_CSV_PATH, docs_dir=DEFAULT_DOCS_DIR,
+             model_name=DEFAULT_MODEL):
+    manifest = read_manifest(index_dir)
+    return manifest is None or manifest.get("fingerprint") != fingerprint(source_files(csv_path, docs_dir), model_name)
+
+
+# -------------------------
+# Search
+# -------------------------
+
+class KnowledgeIndex:
+    """
+    Args:
+        embeddings: (n, dim) L2-normalized matrix (typically a float16 memmap)
+        passages: Passage dicts, one per row
+        encoder: Object with a sentence-transformers style encode(); loaded lazily if None
+        model_name: Model used when the encoder is loaded lazily
+        cache_size: Query embeddings kept in the LRU cache
+        resident_bytes: Largest float32 copy of the matrix to keep in memory
+    """
+
+    def __init__(self, embeddings, passages, encoder=None, model_name=DEFAULT_MODEL,
+                 cache_size=QUERY_CACHE_SIZE, resident_bytes=RESIDENT_BYTES):
+        if len(embeddings) != len(passages):
+            raise ValueError(f"{len(embeddings)} embeddings for {len(passages)} passages")
+        self.embeddings = embeddings
+        self._resident = None
+        if embeddings.size * 4 <= resident_bytes:
+            self._resident = np.asarray(embeddings, dtype=np.float32)
+        self.passages = passages
+        self.model_name = model_name
+        self._encoder = encoder
+        self._encoder_lock = Lock()
+        self._embed_cached = lru_cache(maxsize=cache_size)(self._embed)
+
+    @classmethod
+    def load(cls, index_dir=DEFAULT_INDEX_DIR, encoder=None, cache_size=QUERY_CACHE_SIZE):
+        index_dir = Path(index_dir)
+        manifest = read_manifest(index_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No knowledge index in {index_dir}")
+        embeddings = np.load(index_dir / "embeddings.npy", mmap_mode="r")
+        passages = json.loads((index_dir / "passages.json").read_text(encoding="utf-8"))
+        return cls(embeddings, passages, encoder, manifest["model"], cache_size)
+
+    def _get_encoder(self):
+        if self._encoder is None:
+            with self._encoder_lock:
+                if self._encoder is None:
+                    self._encoder = load_encoder(self.model_name)
+        return self._encoder
+
+    def _embed(self, text: str):
+        vector = self._get_encoder().encode([text], normalize_embeddings=True, convert_to_numpy=True,
+                                            show_progress_bar=False)[0]
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.flags.writeable = False  # shared through the cache
+        return vector
+
+    def embed(self, text: str):
+        """Normalized query embedding (cached by whitespace/case-normalized text)."""
+        return self._embed_cached(" ".join(text.lower().split()))
+
+    def search_vector(self, query, top_k=3):
+        """Return [(row, cosine score)] for the top_k rows, best first."""
+        n = len(self.embeddings)
+        top_k = min(top_k, n)
+        if top_k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        if self._resident is not None:
+            scores = self._resident @ query
+            ids = np.argpartition(scores, -top_k)[-top_k:]
+            scores = scores[ids]
+        else:
+            ids, scores = [], []
+            for start in range(0, n, BLOCK_ROWS):
+                block_scores = np.asarray(self.embeddings[start:start + BLOCK_ROWS], dtype=np.float32) @ query
+                k = min(top_k, len(block_scores))
+                best = np.argpartition(block_scores, -k)[-k:]
+                ids.append(best + start)
+                scores.append(block_scores[best])
+            ids, scores = np.concatenate(ids), np.concatenate(scores)
+        order = np.argsort(-scores)[:top_k]
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def search(self, text: str, top_k=3, min_score=0.0) -> list:
+        """Top passages for a text query, each with its cosine score."""
+        if not text or not text.strip():
+            return []
+        return [
+            {**self.passages[row], "score": round(score, 4)}
+            for row, score in self.search_vector(self.embed(text), top_k)
+            if score >= min_score
+        ]
+
+    def status(self) -> dict:
+        cache = self._embed_cached.cache_info()
+        return {
+            "model": self.model_name,
+            "passages": len(self.passages),
+            "dimension": int(self.embeddings.shape[1]) if len(self.passages) else 0,
+            "resident": self._resident is not None,
+            "query_cache": {"hits": cache.hits, "misses": cache.misses, "size": cache.currsize},
+        }
+
+
+_index = None
+_index_error = None
+_index_retry_at = 0.0
+_index_failures = 0
+_index_lock = Lock()
+
+
+@contextmanager
+def build_lock(index_dir=DEFAULT_INDEX_DIR):
+    """Exclusive lock shared by every process building or loading the index"""
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(index_dir / ".build.lock", "a") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def get_index(index_dir=DEFAULT_INDEX_DIR):
+    """
+    Process-wide index, (re)built on first use if missing or stale.
+
+    Returns None (and logs) when retrieval is unavailable, e.g. without
+    sentence-transformers, so callers can skip it. The next attempt is made
+    once the retry backoff has passed.
+    """
+    global _index, _index_error, _index_retry_at, _index_failures
+    if _index is None and time.monotonic() >= _index_retry_at:
+        with _index_lock:
+            if _index is None and time.monotonic() >= _index_retry_at:
+                try:
+                    with build_lock(index_dir):
+                        encoder = None
+                        # Re-checked under the lock: another process may have just built it
+                        if is_stale(index_dir):
+                            encoder = load_encoder(DEFAULT_MODEL)
+                            manifest = build_index(index_dir, encoder=encoder)
+                            logger.info(f"Built knowledge index: {manifest['passages']} passages")
+                        _index = KnowledgeIndex.load(index_dir, encoder=encoder)
+                    _index_error = None
+                    _index_failures = 0
+                except Exception as e:
+                    delay = min(RETRY_SECONDS * 2 ** _index_failures, RETRY_MAX_SECONDS)
+                    _index_error = str(e)
+                    _index_failures += 1
+                    _index_retry_at = time.monotonic() + delay
+                    logger.warning(f"Knowledge retrieval unavailable (retrying in {delay:.0f}s): {e}")
+    return _index
+
+
+def retry_wait(index_dir=DEFAULT_INDEX_DIR):
+    """Seconds until get_index() will try again after a failure (0 when it would try now)."""
+    if _index is not None:
+        return 0.0
+    return max(0.0, _index_retry_at - time.monotonic())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local knowledge retrieval index")
+    parser.add_argument("--index-dir", default=str(DEFAULT_INDEX_DIR))
+    parser.add_argument("--csv", default=str(DEFAULT_CSV_PATH))
+    parser.add_argument("--docs-dir", default=str(DEFAULT_DOCS_DIR))
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--query", help="Search the built index and print the top passages")
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    with build_lock(args.index_dir):
+        manifest = build_index(args.index_dir, args.csv, args.docs_dir, args.model)
+    print(
+        f"Indexed {manifest['passages']} passages from {len(manifest['sources'])} sources "
+        f"({manifest['dimension']}-d, {manifest['build_seconds']}s) -> {args.index_dir}"
+    )
+    if args.query:
+        index = KnowledgeIndex.load(args.index_dir)
+        start = time.perf_counter()
+        results = index.search(args.query, args.top_k)
+        print(f"\n{len(results)} results in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for result in results:
+            print(f"  {result['score']:.3f}  [{result['source']}] {result['text'][:100]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Versioned, checksummed model artifacts with a single manifest.
+
+Layout (under ``models/artifacts`` by default)::
+
+    manifest.json
+    diabetes/1/model.joblib.z
+    heart/1/model.joblib.z
+    parkinsons/1/model.joblib
+
+``manifest.json`` maps each model name to its current artifact: version,
+relative file path, compression, SHA-256, size, measured load time, the
+scikit-learn version it was written with and its feature schema. At serve
+time ``ArtifactStore`` reads the manifest once and loads each model from its
+recorded path (verifying the checksum) instead of probing directories.
+
+Build artifacts from the legacy .sav/.pkl files with::
+
+    python -m utils.model_artifacts --compress auto
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_ARTIFACT_DIR = BACKEND_DIR / "models" / "artifacts"
+LEGACY_MODEL_DIR = BACKEND_DIR / "models" / "ml"
+MANIFEST_NAME = "manifest.json"
+
+# model name -> legacy file name
+MODEL_FILES = {
+    "diabetes": "diabetes_model.pkl",
+    "heart": "heart_disease_model.pkl",
+    "parkinsons": "parkinsons_model.pkl",
+}
+
+# Compression choices: name -> joblib ``compress`` argument
+COMPRESSION = {
+    "none": 0,
+    "zlib": ("zlib", 3),
+    "gzip": ("gzip", 3),
+    "lzma": ("lzma", 3),
+    "bz2": ("bz2", 3),
+    "lz4": ("lz4", 3),  # requires the lz4 package
+}
+SUFFIXES = {"none": "", "zlib": ".z", "gzip": ".gz", "lzma": ".xz", "bz2": ".bz2", "lz4": ".lz4"}
+# Candidates tried by --compress auto, cheapest to decode first
+AUTO_CANDIDATES = ("none", "lz4", "zlib", "gzip")
+
+
+class ArtifactError(RuntimeError):
+    """Raised when an artifact is missing or fails verification."""
+
+
+def _sklearn_version():
+    try:
+        import sklearn
+        return sklearn.__version__
+    except ImportError:
+        return None
+
+
+def _measure_load(data: bytes, repeats=3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        joblib.load(io.BytesIO(data))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _dump_bytes(model, compression) -> bytes:
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer, compress=COMPRESSION[compression])
+    return buffer.getvalue()
+
+
+def build_artifact(name, source, artifact_dir=DEFAULT_ARTIFACT_DIR, compression="zlib", version=None, schema=None):
+    """
+    Convert one legacy model file into an artifact and return its manifest entry.
+
+    Args:
+        name: Model name (manifest key)
+        source: Path to the legacy .sav/.pkl file
+        artifact_dir: Root directory for artifacts and the manifest
+        compression: One of COMPRESSION, or "auto" to pick the fastest to load
+        version: Artifact version (defaults to the next integer)
+        schema: Feature names to record in the manifest
+
+    Returns:
+        Manifest entry dict
+    """
+    entry = write_artifact(name, joblib.load(source), artifact_dir, compression, version, schema)
+    entry["source"] = Path(source).name
+    return entry
+
+
+def write_artifact(name, model, artifact_dir=DEFAULT_ARTIFACT_DIR, compression="zlib", version=None, schema=None):
+    """
+    Write a fitted model as a new artifact version and return its manifest entry.
+
+    Args:
+        name: Model name (manifest key)
+        model: Fitted estimator
+        artifact_dir: Root directory for artifacts and the manifest
+        compression: One of COMPRESSION, or "auto" to pick the fastest to load
+        version: Artifact version (defaults to the next integer)
+        schema: Feature names to record in the manifest
+
+    Returns:
+        Manifest entry dict
+    """
+    artifact_dir = Path(artifact_dir)
+
+    if compression == "auto":
+        candidates = {}
+        for candidate in AUTO_CANDIDATES:
+            try:
+                data = _dump_bytes(model, candidate)
+            except (ValueError, ImportError):
+                continue  # codec not installed
+            candidates[candidate] = (_measure_load(data), len(data), data)
+        # Fastest load wins; a codec within 10% of the fastest wins on size
+        fastest = min(v[0] for v in candidates.values())
+        compression, (load_seconds, size, data) = min(
+            ((c, v) for c, v in candidates.items() if v[0] <= fastest * 1.1),
+            key=lambda item: item[1][1],
+        )
+    else:
+        data = _dump_bytes(model, compression)
+        load_seconds, size = _measure_load(data), len(data)
+
+    if version is None:
+        existing = [int(p.name) for p in (artifact_dir / name).glob("*") if p.name.isdigit()]
+        version = max(existing, default=0) + 1
+
+    relative = Path(name) / str(version) / f"model.joblib{SUFFIXES[compression]}"
+    path = artifact_dir / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+    return {
+        "version": version,
+        "file": relative.as_posix(),
+        "compression": compression,
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "size_bytes": size,
+        "load_seconds": round(load_seconds, 6),
+        "model_type": type(model).__name__,
+        "n_features": getattr(model, "n_features_in_", None),
+        "feature_schema": schema,
+        "sklearn_version": _sklearn_version(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _build_job(args):
+    return args[0], build_artifact(*args)
+
+
+def build_all(sources, artifact_dir=DEFAULT_ARTIFACT_DIR, compression="zlib", schemas=None, workers=None):
+    """
+    Convert several models in parallel and update the manifest.
+
+    Args:
+        sources: Mapping of model name -> source file
+        artifact_dir: Root directory for artifacts and the manifest
+        compression: Compression name or "auto"
+        schemas: Mapping of model name -> feature names
+        workers: Process pool size (defaults to one per model)
+
+    Returns:
+        The updated manifest
+    """
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    schemas = schemas or {}
+    jobs = [(name, str(src), str(artifact_dir), compression, None, schemas.get(name)) for name, src in sources.items()]
+
+    with ProcessPoolExecutor(max_workers=workers or len(jobs) or 1) as pool:
+        entries = dict(pool.map(_build_job, jobs))
+    return update_manifest(artifact_dir, entries)
+
+
+def update_manifest(artifact_dir, entries):
+    """Point the manifest at new artifact entries (name -> entry) and save it."""
+    manifest = read_manifest(artifact_dir)
+    manifest.setdefault("models", {}).update(entries)
+    manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+    write_manifest(artifact_dir, manifest)
+    return manifest
+
+
+def read_manifest(artifact_dir=DEFAULT_ARTIFACT_DIR):
+    path = Path(artifact_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {"format": 1, "models": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_manifest(artifact_dir, manifest):
+    path = Path(artifact_dir) / MANIFEST_NAME
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ArtifactStore:
+    """
+    Serve-time loader driven by the manifest.
+
+    Args:
+        artifact_dir: Directory holding manifest.json
+        verify: Check SHA-256 before unpickling
+    """
+
+    def __init__(self, artifact_dir=DEFAULT_ARTIFACT_DIR, verify=True):
+        self.artifact_dir = Path(artifact_dir)
+        self.verify = verify
+        self.manifest = read_manifest(self.artifact_dir)
+        self.models = self.manifest.get("models", {})
+
+    def __contains__(self, name):
+        return name in self.models
+
+    def load(self, name):
+        """Load a model by name, verifying its checksum."""
+        entry = self.models.get(name)
+        if entry is None:
+            raise ArtifactError(f"No artifact for '{name}' in {self.artifact_dir / MANIFEST_NAME}")
+        path = self.artifact_dir / entry["file"]
+        if not path.exists():
+            raise ArtifactError(f"Artifact file missing: {path}")
+        data = path.read_bytes()
+        if self.verify and hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for {path}")
+        running = _sklearn_version()
+        if entry.get("sklearn_version") and running and entry["sklearn_version"] != running:
+            logger.warning(
+                f"{name} artifact was written with scikit-learn {entry['sklearn_version']}, running {running}"
+            )
+        return joblib.load(io.BytesIO(data))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build versioned model artifacts and manifest.json")
+    parser.add_argument("--source-dir", default=str(LEGACY_MODEL_DIR), help="Directory with the legacy model files")
+    parser.add_argument("--artifact-dir", default=str(DEFAULT_ARTIFACT_DIR))
+    parser.add_argument("--compress", default="zlib", choices=sorted(COMPRESSION) + ["auto"])
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        from utils.feature_schema import load_schemas
+        schemas = {name: schema.names for name, schema in load_schemas().items()}
+    except Exception as e:
+        logger.warning(f"Feature schemas unavailable: {e}")
+        schemas = {}
+
+    source_dir = Path(args.source_dir)
+    sources = {}
+    for name, filename in MODEL_FILES.items():
+        for candidate in (source_dir / filename, source_dir / filename.replace(".pkl", ".sav")):
+            if candidate.exists():
+                sources[name] = candidate
+                break
+        else:
+            print(f"Skipping {name}: no {filename} (or .sav) in {source_dir}")
+
+    start = time.perf_counter()
+    manifest = build_all(sources, args.artifact_dir, args.compress, schemas, args.workers)
+    for name in sources:
+        entry = manifest["models"][name]
+        print(
+            f"{name:<11} v{entry['version']}  {entry['compression']:<5} {entry['size_bytes']:>9,} B  "
+            f"load {entry['load_seconds'] * 1000:7.2f} ms  sha256 {entry['sha256'][:12]}"
+        )
+    print(f"Built {len(sources)} artifacts in {time.perf_counter() - start:.2f}s -> {args.artifact_dir}")
+
+
+if __name__ == "__main__":
+    main()
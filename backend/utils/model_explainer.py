@@ -0,0 +1,146 @@
+"""
+Probabilities and per-feature attributions for the /predict models.
+
+Everything expensive happens once, when the explainer is built from the
+model's training CSV:
+
+- the model's raw score (decision function, or log-odds of predict_proba) is
+  computed for every training row;
+- a least-squares linear fit of that score on the features gives one weight
+  per feature. For linear models (the bundled SVCs and logistic regression,
+  with or without a StandardScaler) the fit is exact; for non-linear models
+  it is a global linear surrogate and its R² is reported;
+- models without predict_proba get a Platt-scaling sigmoid fitted on the
+  training scores.
+
+Explaining a batch is then one model call plus an (n_rows x n_features)
+element-wise product against the training means: contribution_j =
+weight_j * (x_j - mean_j), summing to the row's score minus ``base_value``.
+"""
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from utils.feature_schema import TRAINING_DATA_DIR, load_dataset
+
+# R² at or above this means the model score is linear in the features
+LINEAR_R2 = 1 - 1e-9
+PROBABILITY_CLIP = 1e-6
+
+
+def _raw_score(model, X):
+    """Model score in decision-function (log-odds-like) units."""
+    if hasattr(model, "decision_function"):
+        try:
+            return np.asarray(model.decision_function(X), dtype=np.float64).ravel()
+        except AttributeError:
+            pass
+    proba = np.clip(model.predict_proba(X)[:, 1], PROBABILITY_CLIP, 1 - PROBABILITY_CLIP)
+    return np.log(proba / (1 - proba))
+
+
+def _has_proba(model):
+    try:
+        return hasattr(model, "predict_proba") and callable(model.predict_proba)
+    except AttributeError:
+        # SVC(probability=False) raises on attribute access
+        return False
+
+
+class ModelExplainer:
+    """
+    Args:
+        model: Fitted binary classifier
+        X: Background (training) feature matrix in model column order
+        y: Training labels, used to calibrate models without predict_proba
+        feature_names: Names used as keys in the contributions
+    """
+
+    def __init__(self, model, X, y, feature_names):
+        self.model = model
+        self.feature_names = list(feature_names)
+        X = np.asarray(X, dtype=np.float64)
+        self.means = X.mean(axis=0)
+
+        scores = _raw_score(model, X)
+        centered = X - self.means
+        design = np.column_stack([centered, np.ones(len(X))])
+        solution, *_ = np.linalg.lstsq(design, scores, rcond=None)
+        self.weights = solution[:-1]
+        self.base_value = float(solution[-1])
+        residual = scores - design @ solution
+        total = np.sum((scores - scores.mean()) ** 2)
+        self.r2 = float(1 - residual @ residual / total) if total else 1.0
+        self.method = "linear" if self.r2 >= LINEAR_R2 else "linear_surrogate"
+
+        self.uses_proba = _has_proba(model)
+        if self.uses_proba:
+            self.calibration = "model"
+            self._platt = None
+        else:
+            platt = LogisticRegression(C=1e6).fit(scores.reshape(-1, 1), y)
+            self.calibration = "platt"
+            self._platt = (float(platt.coef_[0, 0]), float(platt.intercept_[0]))
+
+    def probabilities(self, X, scores=None):
+        """Probability of the positive class for each row."""
+        if self.uses_proba:
+            return self.model.predict_proba(X)[:, 1]
+        if scores is None:
+            scores = _raw_score(self.model, X)
+        a, b = self._platt
+        return 1.0 / (1.0 + np.exp(-(a * scores + b)))
+
+    def contributions(self, X):
+        """(n_rows, n_features) attribution matrix in score units."""
+        return (np.asarray(X, dtype=np.float64) - self.means) * self.weights
+
+    def explain(self, X, probability=True, contributions=True, precision=6):
+        """
+        Per-row probability and contribution dicts for a validated batch.
+
+        Returns:
+            List of dicts with "probability" and/or "contributions"
+        """
+        n = len(X)
+        rows = [{} for _ in range(n)]
+        if probability:
+            scores = None if self.uses_proba else _raw_score(self.model, X)
+            proba = np.round(self.probabilities(X, scores), precision).tolist()
+            for row, p in zip(rows, proba):
+                row["probability"] = p
+        if contributions:
+            names = self.feature_names
+            for row, values in zip(rows, np.round(self.contributions(X), precision).tolist()):
+                row["contributions"] = dict(zip(names, values))
+        return rows
+
+    def describe(self):
+        return {
+            "method": self.method,
+            "base_value": round(self.base_value, 6),
+            "surrogate_r2": round(self.r2, 6),
+            "calibration": self.calibration,
+            "units": "decision function" if hasattr(self.model, "decision_function") else "log-odds",
+        }
+
+
+def build_explainers(models, schemas, data_dir=TRAINING_DATA_DIR):
+    """
+    Build explainers for every loaded model with a training CSV.
+
+    Args:
+        models: Mapping of name -> fitted model (None entries are skipped)
+        schemas: Mapping of name -> FeatureSchema (for contribution keys)
+        data_dir: Directory with the training CSVs
+
+    Returns:
+        Mapping of name -> ModelExplainer
+    """
+    explainers = {}
+    for name, model in models.items():
+        if model is None or name not in schemas:
+            continue
+        X, y, _ = load_dataset(name, data_dir)
+        explainers[name] = ModelExplainer(model, X, y, schemas[name].names)
+    return explainers
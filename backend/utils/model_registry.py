@@ -0,0 +1,184 @@
+"""
+Registry of remote model/agent handles resolved concurrently or on first use.
+
+Each client is declared as ``name -> (factory, id)``, e.g.
+``"doc": (ModelFactory.get, DOC_MODEL_ID)``. Nothing is fetched at import:
+``resolve_all()`` resolves every handle in parallel (boot time becomes the
+slowest single round trip instead of the sum), and ``get(name)`` resolves a
+single handle on first use if it is not ready yet. A client that fails to
+resolve only affects the routes that use it.
+
+Metadata about each handle (id, type, resolve time, last error) is written to
+a JSON file. On the next start ``resolve_all()`` submits the clients that
+were slowest last time first, so with fewer workers than clients the slow
+round trips overlap instead of queueing at the end, and ``status()`` reports
+each client's previous resolve time and error next to the current state and
+the registry's time-to-ready.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class ClientUnavailable(RuntimeError):
+    """Raised when a client is not configured or failed to resolve."""
+
+
+class ClientRegistry:
+    """
+    Args:
+        specs: Mapping of name -> (factory callable, id)
+        cache_file: JSON file for handle metadata (optional)
+        max_workers: Concurrent resolutions in resolve_all()
+    """
+
+    def __init__(self, specs, cache_file=None, max_workers=None):
+        self.specs = dict(specs)
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.max_workers = max_workers or max(len(self.specs), 1)
+        self.created_at = time.monotonic()
+        self.ready_at = None
+
+        self._handles = {}
+        self._errors = {}
+        self._locks = {name: threading.Lock() for name in self.specs}
+        self._meta_lock = threading.Lock()
+        self.metadata = self._load_metadata()
+        # What the previous start recorded, before this run overwrites it
+        self.previous = {name: dict(meta) for name, meta in self.metadata.items()}
+
+        for name, meta in self.previous.items():
+            if meta.get("error"):
+                logger.warning(f"Client '{name}' failed to resolve on last start: {meta['error']}")
+
+    # --- metadata --------------------------------------------------------
+
+    def _load_metadata(self):
+        if self.cache_file is None:
+            return {}
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_metadata(self):
+        if self.cache_file is None:
+            return
+        try:
+            tmp_path = self.cache_file.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self.metadata, f, indent=2)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Could not write client metadata cache: {e}")
+
+    def _record(self, name, **fields):
+        with self._meta_lock:
+            meta = self.metadata.setdefault(name, {})
+            meta.update(fields)
+            self._save_metadata()
+
+    # --- resolution ------------------------------------------------------
+
+    def _resolve(self, name):
+        factory, client_id = self.specs[name]
+        if not client_id:
+            self._errors[name] = "missing id"
+            raise ClientUnavailable(f"Client '{name}' is not configured (missing id)")
+        start = time.monotonic()
+        try:
+            handle = factory(client_id)
+        except Exception as e:
+            self._errors[name] = str(e)
+            self._record(name, id=client_id, error=str(e), failed_at=time.time())
+            raise ClientUnavailable(f"Client '{name}' failed to resolve: {e}") from e
+        elapsed = time.monotonic() - start
+        self._handles[name] = handle
+        self._errors.pop(name, None)
+        self._record(
+            name,
+            id=client_id,
+            type=type(handle).__name__,
+            display_name=getattr(handle, "name", None),
+            resolve_seconds=round(elapsed, 3),
+            resolved_at=time.time(),
+            error=None,
+        )
+        logger.info(f"Client '{name}' ready in {elapsed:.2f}s")
+        if len(self._handles) == len(self.specs) and self.ready_at is None:
+            self.ready_at = time.monotonic()
+            logger.info(f"All clients ready {self.ready_at - self.created_at:.2f}s after start")
+        return handle
+
+    def get(self, name):
+        """Return the handle for name, resolving it now if needed."""
+        handle = self._handles.get(name)
+        if handle is not None:
+            return handle
+        if name not in self.specs:
+            raise ClientUnavailable(f"Unknown client '{name}'")
+        with self._locks[name]:
+            handle = self._handles.get(name)
+            if handle is None:
+                handle = self._resolve(name)
+            return handle
+
+    def resolution_order(self):
+        """Client names, slowest to resolve on the previous start first (unknown first of all)."""
+        def last_seconds(name):
+            seconds = self.previous.get(name, {}).get("resolve_seconds")
+            return float("inf") if seconds is None else seconds
+        return sorted(self.specs, key=last_seconds, reverse=True)
+
+    def resolve_all(self):
+        """Resolve every client concurrently; failures are logged, not raised."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {name: pool.submit(self.get, name) for name in self.resolution_order()}
+        for name, future in futures.items():
+            error = future.exception()
+            if error is not None:
+                logger.warning(str(error))
+        return self
+
+    def resolve_all_in_background(self):
+        """Start resolve_all() on a daemon thread and return immediately."""
+        thread = threading.Thread(target=self.resolve_all, name="client-registry", daemon=True)
+        thread.start()
+        return thread
+
+    # --- reporting -------------------------------------------------------
+
+    def status(self):
+        clients = {}
+        for name in self.specs:
+            meta = self.metadata.get(name, {})
+            previous = self.previous.get(name, {})
+            if name in self._handles:
+                state = "ready"
+            elif name in self._errors:
+                state = "error"
+            else:
+                state = "pending"
+            clients[name] = {
+                "state": state,
+                "resolve_seconds": meta.get("resolve_seconds") if state == "ready" else None,
+                "error": self._errors.get(name),
+                "previous_start": {
+                    "resolve_seconds": previous.get("resolve_seconds"),
+                    "error": previous.get("error"),
+                },
+            }
+        return {
+            "ready": self.ready_at is not None,
+            "time_to_ready_seconds": round(self.ready_at - self.created_at, 3) if self.ready_at else None,
+            "uptime_seconds": round(time.monotonic() - self.created_at, 3),
+            "clients": clients,
+        }
@@ -0,0 +1,251 @@
+"""
+Reproducible retraining of the /predict models from the bundled CSVs.
+
+Replaces the notebooks under ``Multiple-Disease-Prediction-System-main`` with
+a scripted pipeline: each dataset is split into train/test the same way the
+notebooks did (80/20, stratified, fixed seed), a cross-validated search runs
+over several model families, and the best candidate is refitted on the
+training split and written as a new artifact version (see model_artifacts).
+
+Every (dataset, candidate, fold) fit is an independent task, so the search
+for all three datasets runs on one process pool that keeps every core busy
+instead of searching one model at a time. All randomness comes from the
+seed, so the same seed and data give the same models and report.
+
+    python -m utils.model_training --workers 8 --seed 2
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from utils.feature_schema import MODEL_DATASETS, TRAINING_DATA_DIR, load_dataset, load_schemas
+from utils.model_artifacts import DEFAULT_ARTIFACT_DIR, update_manifest, write_artifact
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED = 2  # random_state used by the original notebooks
+TEST_SIZE = 0.2
+CV_FOLDS = 5
+REPORT_NAME = "training_report.json"
+
+
+def search_space(seed):
+    """Model families and hyperparameter grids: label -> (estimator, grid)."""
+    return {
+        "svc_linear": (
+            make_pipeline(StandardScaler(), SVC(kernel="linear", random_state=seed)),
+            {"svc__C": [0.1, 1, 10]},
+        ),
+        "svc_rbf": (
+            make_pipeline(StandardScaler(), SVC(kernel="rbf", random_state=seed)),
+            {"svc__C": [0.5, 1, 4, 16], "svc__gamma": ["scale", 0.01, 0.1]},
+        ),
+        "logistic_regression": (
+            make_pipeline(StandardScaler(), LogisticRegression(max_iter=5000)),
+            {"logisticregression__C": [0.01, 0.1, 1, 10]},
+        ),
+        "random_forest": (
+            RandomForestClassifier(n_estimators=300, n_jobs=1, random_state=seed),
+            {"max_depth": [None, 4, 8], "min_samples_leaf": [1, 3]},
+        ),
+    }
+
+
+# -------------------------
+# Worker side
+# -------------------------
+
+_WORKER_DATA = {}
+
+
+def _init_worker(data):
+    _WORKER_DATA.update(data)
+
+
+def _fit_fold(task):
+    """Fit one candidate on one CV fold and return its validation accuracy."""
+    dataset, candidate, fold, estimator, params = task
+    X, y, folds = _WORKER_DATA[dataset]
+    train_idx, val_idx = folds[fold]
+    start = time.perf_counter()
+    model = clone(estimator).set_params(**params).fit(X[train_idx], y[train_idx])
+    score = accuracy_score(y[val_idx], model.predict(X[val_idx]))
+    return dataset, candidate, fold, score, time.perf_counter() - start
+
+
+# -------------------------
+# Driver
+# -------------------------
+
+def train_all(datasets=None, seed=DEFAULT_SEED, workers=None, data_dir=TRAINING_DATA_DIR):
+    """
+    Search, select and refit a model for each dataset.
+
+    Args:
+        datasets: Dataset names (defaults to every entry in MODEL_DATASETS)
+        seed: Seed for the split, CV shuffling and the estimators
+        workers: Process pool size (defaults to all cores)
+        data_dir: Directory with the training CSVs
+
+    Returns:
+        Tuple of (fitted models by name, report dict)
+    """
+    datasets = list(datasets or MODEL_DATASETS)
+    space = search_space(seed)
+    candidates = [
+        (label, estimator, params)
+        for label, (estimator, grid) in space.items()
+        for params in ParameterGrid(grid)
+    ]
+
+    splits, worker_data = {}, {}
+    for name in datasets:
+        X, y, columns = load_dataset(name, data_dir)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=TEST_SIZE, stratify=y, random_state=seed
+        )
+        cv = StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=seed)
+        folds = list(cv.split(X_train, y_train))
+        splits[name] = (X_train, X_test, y_train, y_test, columns)
+        worker_data[name] = (X_train, y_train, folds)
+
+    tasks = [
+        (name, c, fold, estimator, params)
+        for name in datasets
+        for c, (_, estimator, params) in enumerate(candidates)
+        for fold in range(CV_FOLDS)
+    ]
+    scores = {name: np.zeros((len(candidates), CV_FOLDS)) for name in datasets}
+    fit_seconds = {name: 0.0 for name in datasets}
+
+    workers = workers or os.cpu_count() or 1
+    logger.info(f"Running {len(tasks)} fits on {workers} workers")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(worker_data,)) as pool:
+        for name, c, fold, score, seconds in pool.map(_fit_fold, tasks, chunksize=4):
+            scores[name][c, fold] = score
+            fit_seconds[name] += seconds
+    search_seconds = time.perf_counter() - start
+
+    models, results = {}, {}
+    for name in datasets:
+        X_train, X_test, y_train, y_test, columns = splits[name]
+        means, stds = scores[name].mean(axis=1), scores[name].std(axis=1)
+        # Highest mean CV accuracy; ties go to the steadier, then earlier candidate
+        best = min(range(len(candidates)), key=lambda c: (-round(means[c], 10), round(stds[c], 10), c))
+        label, estimator, params = candidates[best]
+
+        refit_start = time.perf_counter()
+        model = clone(estimator).set_params(**params).fit(X_train, y_train)
+        refit_seconds = time.perf_counter() - refit_start
+        predicted = model.predict(X_test)
+
+        models[name] = model
+        results[name] = {
+            "model": label,
+            "params": {k: v for k, v in params.items()},
+            "cv_accuracy": round(float(means[best]), 4),
+            "cv_accuracy_std": round(float(stds[best]), 4),
+            "train_accuracy": round(float(accuracy_score(y_train, model.predict(X_train))), 4),
+            "test_accuracy": round(float(accuracy_score(y_test, predicted)), 4),
+            "test_f1": round(float(f1_score(y_test, predicted)), 4),
+            "n_train": int(len(y_train)),
+            "n_test": int(len(y_test)),
+            "features": columns,
+            "candidates": {
+                f"{candidates[c][0]} {_format_params(candidates[c][2])}": round(float(means[c]), 4)
+                for c in range(len(candidates))
+            },
+            "fit_seconds_total": round(fit_seconds[name], 3),
+            "refit_seconds": round(refit_seconds, 3),
+        }
+
+    report = {
+        "seed": seed,
+        "cv_folds": CV_FOLDS,
+        "test_size": TEST_SIZE,
+        "workers": workers,
+        "fits": len(tasks),
+        "search_seconds": round(search_seconds, 3),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "models": results,
+    }
+    return models, report
+
+
+def _format_params(params):
+    return ", ".join(f"{k.split('__')[-1]}={v}" for k, v in sorted(params.items())) or "defaults"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the /predict models from the bundled CSVs")
+    parser.add_argument("--datasets", nargs="+", choices=sorted(MODEL_DATASETS), default=None)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: all cores)")
+    parser.add_argument("--data-dir", default=str(TRAINING_DATA_DIR))
+    parser.add_argument("--artifact-dir", default=str(DEFAULT_ARTIFACT_DIR))
+    parser.add_argument("--compress", default="zlib")
+    parser.add_argument("--dry-run", action="store_true", help="Report only; do not write artifacts")
+    parser.add_argument("--candidate", action="store_true",
+                        help="Write artifacts without promoting them in the manifest (for SHADOW_MODELS)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    print("🏋️  Retraining models")
+    print("=" * 60)
+    start = time.perf_counter()
+    models, report = train_all(args.datasets, args.seed, args.workers, args.data_dir)
+
+    for name, result in report["models"].items():
+        print(f"\n📊 {name}: {result['model']} ({_format_params(result['params'])})")
+        print(f"   CV accuracy   {result['cv_accuracy']:.4f} ± {result['cv_accuracy_std']:.4f}")
+        print(f"   Test accuracy {result['test_accuracy']:.4f}  F1 {result['test_f1']:.4f}  "
+              f"(train {result['train_accuracy']:.4f}, n={result['n_train']}/{result['n_test']})")
+        print(f"   Fit time      {result['fit_seconds_total']:.2f}s across folds, refit {result['refit_seconds']:.2f}s")
+
+    if not args.dry_run:
+        schemas = {name: schema.names for name, schema in load_schemas(args.data_dir).items()}
+        entries = {}
+        for name, model in models.items():
+            entry = write_artifact(name, model, args.artifact_dir, args.compress, schema=schemas.get(name))
+            entry["source"] = "model_training"
+            entry["training"] = {
+                key: report["models"][name][key]
+                for key in ("model", "params", "cv_accuracy", "test_accuracy", "test_f1")
+            }
+            entry["training"]["seed"] = args.seed
+            entries[name] = entry
+        report_path = Path(args.artifact_dir) / REPORT_NAME
+        if args.candidate:
+            shadow_spec = ",".join(f"{name}={entry['file']}" for name, entry in entries.items())
+            report_path = report_path.with_name(f"candidate_{REPORT_NAME}")
+        else:
+            update_manifest(args.artifact_dir, entries)
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\n💾 Wrote {len(entries)} artifacts and {report_path}")
+        if args.candidate:
+            print(f"   Not promoted; trial them with SHADOW_MODELS={shadow_spec}")
+
+    print(f"\n⏱️  {report['fits']} fits on {report['workers']} workers: search {report['search_seconds']:.1f}s, "
+          f"total {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
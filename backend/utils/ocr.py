@@ -0,0 +1,341 @@
+"""
+Page-parallel OCR for image and PDF medical reports.
+
+A downloaded document is split into pages: PDF pages that already carry a
+text layer are used as-is, the rest are rasterized (PyMuPDF) at ``OCR_DPI``;
+multi-frame images (TIFF) yield one page per frame. Each page image is
+preprocessed (grayscale, upscaling of small scans, autocontrast, Otsu
+binarization) and OCRed with Tesseract in a process pool, one page per task,
+using the bundled ``models/eng.traineddata``.
+
+Results are cached on disk by the SHA-256 of the page image (plus the OCR
+settings), so re-submitted reports and repeated pages skip Tesseract.
+``OcrPipeline.pages()`` submits each page as soon as it is split off and
+yields page texts in order as they finish, so callers can start analysing
+the first pages while later ones are still being rasterized and recognised.
+
+Documents come from arbitrary URLs, so they are bounded before anything is
+decoded: at most ``OCR_MAX_PAGES`` pages, and page images (checked from the
+page size or image header, before rasterizing) of at most
+``OCR_MAX_PAGE_PIXELS`` each and ``OCR_MAX_PIXELS`` in total. Past a limit
+``DocumentTooLarge`` is raised.
+"""
+
+import hashlib
+import io
+import logging
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TESSDATA_DIR = Path(os.environ.get("TESSDATA_DIR", BACKEND_DIR / "models"))
+DEFAULT_CACHE_DIR = BACKEND_DIR / "data" / "ocr_cache"
+
+OCR_DPI = int(os.environ.get("OCR_DPI", 300))
+OCR_LANG = os.environ.get("OCR_LANG", "eng")
+OCR_CONFIG = "--oem 1 --psm 3"
+# Scans narrower than this are upscaled before OCR (Tesseract prefers ~300 dpi text)
+MIN_OCR_WIDTH = 1600
+# PDF pages with at least this many characters of embedded text skip OCR
+MIN_TEXT_LAYER_CHARS = 40
+CACHE_VERSION = f"1|{OCR_LANG}|{OCR_CONFIG}"
+
+OCR_MAX_PAGES = int(os.environ.get("OCR_MAX_PAGES", 50))
+# Decompressed page images: an A4 page at 300 dpi is ~8.7 million pixels
+OCR_MAX_PAGE_PIXELS = int(os.environ.get("OCR_MAX_PAGE_PIXELS", 40_000_000))
+OCR_MAX_PIXELS = int(os.environ.get("OCR_MAX_PIXELS", 400_000_000))
+
+IMAGE_SIGNATURES = (b"\x89PNG", b"\xff\xd8\xff", b"II*\x00", b"MM\x00*", b"GIF8", b"BM", b"RIFF")
+
+
+class OcrError(RuntimeError):
+    """Raised when a document cannot be split into pages or recognised."""
+
+
+class DocumentTooLarge(OcrError):
+    """Raised when a document exceeds the page count or decompressed-size limits."""
+
+
+class _PixelBudget:
+    """Running check of page image sizes against the per-page and total limits."""
+
+    def __init__(self, max_page_pixels, max_pixels):
+        self.max_page_pixels = max_page_pixels
+        self.max_pixels = max_pixels
+        self.used = 0
+
+    def take(self, width, height, page):
+        pixels = int(width) * int(height)
+        if pixels > self.max_page_pixels:
+            raise DocumentTooLarge(
+                f"Page {page} is {width}x{height} pixels; the limit is {self.max_page_pixels:,} pixels per page"
+            )
+        self.used += pixels
+        if self.used > self.max_pixels:
+            raise DocumentTooLarge(f"Document exceeds {self.max_pixels:,} pixels of page images")
+
+
+def _check_page_count(count):
+    if count > OCR_MAX_PAGES:
+        raise DocumentTooLarge(f"Document has {count} pages; the limit is {OCR_MAX_PAGES}")
+
+
+def detect_kind(data: bytes, content_type: str = "") -> str:
+    """Return "pdf", "image" or "text" for downloaded content."""
+    content_type = (content_type or "").lower()
+    if data[:5] == b"%PDF-" or "pdf" in content_type:
+        return "pdf"
+    if data.startswith(IMAGE_SIGNATURES) or content_type.startswith("image/"):
+        return "image"
+    return "text"
+
+
+# -------------------------
+# Page splitting (parent process)
+# -------------------------
+
+def split_pages(data: bytes, kind: str, dpi: int = OCR_DPI):
+    """
+    Yield ("text", str) for pages with usable embedded text and
+    ("image", png_bytes) for pages that need OCR, one page at a time.
+
+    Raises:
+        DocumentTooLarge: past OCR_MAX_PAGES or the pixel limits (checked
+            before the offending page is rasterized or decoded)
+    """
+    budget = _PixelBudget(OCR_MAX_PAGE_PIXELS, OCR_MAX_PIXELS)
+    if kind == "pdf":
+        try:
+            import fitz  # PyMuPDF
+        except ImportError:
+            raise RuntimeError("PDF support requires PyMuPDF (pip install pymupdf)")
+        with fitz.open(stream=data, filetype="pdf") as document:
+            _check_page_count(document.page_count)
+            for number, page in enumerate(document, 1):
+                text = page.get_text().strip()
+                if len(text) >= MIN_TEXT_LAYER_CHARS:
+                    yield "text", text
+                    continue
+                scale = dpi / 72  # page sizes are in points
+                budget.take(math.ceil(page.rect.width * scale), math.ceil(page.rect.height * scale), number)
+                yield "image", page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY).tobytes("png")
+        return
+
+    from PIL import Image, ImageSequence
+    try:
+        # Only reads the header; pixels are decoded after the size checks
+        image = Image.open(io.BytesIO(data))
+    except Image.DecompressionBombError as e:
+        raise DocumentTooLarge(str(e)) from None
+    with image:
+        frames = getattr(image, "n_frames", 1)
+        _check_page_count(frames)
+        if frames == 1:
+            budget.take(*image.size, 1)
+            yield "image", data
+            return
+        for number, frame in enumerate(ImageSequence.Iterator(image), 1):
+            budget.take(*frame.size, number)
+            buffer = io.BytesIO()
+            frame.convert("L").save(buffer, format="PNG")
+            yield "image", buffer.getvalue()
+
+
+# -------------------------
+# OCR (worker processes)
+# -------------------------
+
+def _init_worker():
+    # One Tesseract thread per process; the pool provides the parallelism
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def preprocess(image):
+    """Grayscale, upscale small scans, stretch contrast and binarize (Otsu)."""
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(image).convert("L")
+    if image.width < MIN_OCR_WIDTH:
+        scale = MIN_OCR_WIDTH / image.width
+        image = image.resize((MIN_OCR_WIDTH, round(image.height * scale)), Image.LANCZOS)
+    image = ImageOps.autocontrast(image, cutoff=1)
+
+    pixels = np.asarray(image)
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    weights = np.cumsum(histogram)
+    means = np.cumsum(histogram * np.arange(256))
+    total_mean = means[-1] / weights[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (total_mean * weights - means) ** 2 / (weights * (weights[-1] - weights))
+    if np.isnan(between).all():
+        return image  # blank page: nothing to separate
+    threshold = int(np.nanargmax(between))
+    return Image.fromarray(np.where(pixels > threshold, 255, 0).astype(np.uint8))
+
+
+def ocr_image(png: bytes) -> str:
+    """OCR one page image."""
+    import pytesseract
+    from PIL import Image
+
+    with Image.open(io.BytesIO(png)) as image:
+        prepared = preprocess(image)
+    config = f'{OCR_CONFIG} --tessdata-dir "{TESSDATA_DIR}"'
+    try:
+        return pytesseract.image_to_string(prepared, lang=OCR_LANG, config=config)
+    except pytesseract.TesseractError as e:
+        raise RuntimeError(f"Tesseract failed: {e.message}") from None
+    except pytesseract.TesseractNotFoundError:
+        # pytesseract's exceptions do not survive pickling back to the parent process
+        raise RuntimeError("Tesseract is not installed or not on PATH") from None
+
+
+def clean_text(text: str) -> str:
+    """Normalize whitespace while keeping line structure."""
+    lines = (" ".join(line.split()) for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"))
+    out, blank = [], 0
+    for line in lines:
+        blank = blank + 1 if not line else 0
+        if blank <= 1:
+            out.append(line)
+    return "\n".join(out).strip()
+
+
+# -------------------------
+# Pipeline
+# -------------------------
+
+class OcrPipeline:
+    """
+    Args:
+        workers: OCR processes (defaults to the CPU count)
+        cache_dir: Directory for cached page texts (None disables caching)
+    """
+
+    def __init__(self, workers=None, cache_dir=DEFAULT_CACHE_DIR):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._pool = None
+        self.stats = {"pages": 0, "text_layer": 0, "cache_hits": 0, "ocr": 0}
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._pool
+
+    def _cache_path(self, png):
+        digest = hashlib.sha256(CACHE_VERSION.encode() + png).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.txt"
+
+    def _cached(self, png):
+        if self.cache_dir is None:
+            return None
+        path = self._cache_path(png)
+        try:
+            return path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def _store(self, png, text):
+        if self.cache_dir is None:
+            return
+        path = self._cache_path(png)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache OCR result: {e}")
+
+    def _submit(self, page_kind, content):
+        """Start one page: returns (text or None, png, future or None)."""
+        self.stats["pages"] += 1
+        if page_kind == "text":
+            self.stats["text_layer"] += 1
+            return clean_text(content), None, None
+        cached = self._cached(content)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached, None, None
+        self.stats["ocr"] += 1
+        return None, content, self._executor().submit(ocr_image, content)
+
+    def _result(self, text, png, future):
+        if future is not None:
+            try:
+                text = clean_text(future.result())
+            except Exception as e:
+                raise OcrError(f"OCR failed: {e}") from e
+            self._store(png, text)
+        return text
+
+    def pages(self, data: bytes, kind: str):
+        """
+        Yield the text of each page in order, as soon as it is available.
+
+        Each page is submitted for OCR as soon as it is split off, so the
+        first pages are recognised while later ones are still being
+        rasterized; at most ``2 * workers`` pages are held at a time.
+
+        Raises:
+            DocumentTooLarge: past OCR_MAX_PAGES or the pixel limits
+            OcrError: unreadable document or failed OCR
+        """
+        max_pending = 2 * self.workers
+        pending = deque()
+        split = split_pages(data, kind)
+        try:
+            while True:
+                try:
+                    page = next(split, None)
+                except OcrError:
+                    raise
+                except Exception as e:
+                    raise OcrError(f"Could not read {kind} document: {e}") from e
+                if page is None:
+                    break
+                pending.append(self._submit(*page))
+                # Hand over finished pages now; wait only when too many are held
+                while pending and (len(pending) >= max_pending or pending[0][2] is None or pending[0][2].done()):
+                    yield self._result(*pending.popleft())
+            while pending:
+                yield self._result(*pending.popleft())
+        finally:
+            split.close()
+            for _, _, future in pending:
+                if future is not None:
+                    future.cancel()
+
+    def extract_text(self, data: bytes, kind: str) -> str:
+        return "\n\n".join(self.pages(data, kind))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_pipeline = None
+_pipeline_lock = Lock()
+
+
+def get_pipeline():
+    """Process-wide OCR pipeline (the process pool starts on first OCR)."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = OcrPipeline(
+                    workers=int(os.environ.get("OCR_WORKERS", 0)) or None,
+                    cache_dir=os.environ.get("OCR_CACHE_DIR", str(DEFAULT_CACHE_DIR)),
+                )
+    return _pipeline
@@ -0,0 +1,322 @@
+"""
+On-demand profiling of live requests.
+
+``RequestProfiler`` installs two request hooks on the Flask app. Unarmed they
+cost two attribute checks per request. Arming it (``arm``) starts a session
+for a route pattern, bounded by a number of matching requests and/or a time
+limit, in one of two modes:
+
+- ``sampling`` (default): a background thread snapshots the stacks of the
+  threads currently serving matching requests every ``interval`` seconds
+  (``sys._current_frames``) and counts identical stacks. The result is in
+  collapsed-stack format ("root;...;leaf count" per line), which
+  flamegraph.pl, speedscope and inferno read directly. Overhead is the
+  sampler's own wake-ups, only while armed.
+- ``cprofile``: each matching request runs under ``cProfile``; the stats of
+  all profiled requests are merged and reported as a function table (exact
+  call counts and times, at a higher overhead).
+
+Profiles are per process: under gunicorn a session is armed in the worker
+that received the admin request, so arm it with a request count large
+enough to reach that worker, or run a single worker while investigating.
+"""
+
+import cProfile
+import fnmatch
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from functools import lru_cache
+
+from flask import g, request
+
+MODES = ("sampling", "cprofile")
+DEFAULT_INTERVAL = 0.005
+MAX_REQUESTS = 10_000
+MAX_SECONDS = 600
+# Finished sessions kept for retrieval
+HISTORY = 8
+
+
+class ProfileSession:
+    """One armed profile: its limits, progress and collected data."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, route, mode, requests=None, seconds=None, interval=DEFAULT_INTERVAL):
+        self.id = next(self._ids)
+        self.route = route
+        self.mode = mode
+        self.max_requests = requests
+        self.seconds = seconds
+        self.interval = interval
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.finished_at = None
+        self.reason = None
+        self.requests = 0
+        self.samples = 0
+        self.stacks = Counter()
+        self.stats = None
+        self.in_flight = 0
+        self.threads = set()  # idents of threads serving matching requests (sampling)
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def matches(self, path, rule) -> bool:
+        return fnmatch.fnmatchcase(path, self.route) or (rule is not None and rule == self.route)
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, heaviest first."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def functions(self, limit=50):
+        """Top cProfile entries by cumulative time."""
+        if self.stats is None:
+            return []
+        rows = sorted(self.stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [
+            {
+                "function": f"{func} ({_short_path(filename)}:{line})",
+                "calls": nc,
+                "primitive_calls": cc,
+                "total_ms": round(tt * 1000, 3),
+                "cumulative_ms": round(ct * 1000, 3),
+            }
+            for (filename, line, func), (cc, nc, tt, ct, _) in rows
+        ]
+
+    def to_dict(self, include_data=True) -> dict:
+        body = {
+            "id": self.id,
+            "route": self.route,
+            "mode": self.mode,
+            "state": "done" if self.done else "armed",
+            "reason": self.reason,
+            "limits": {"requests": self.max_requests, "seconds": self.seconds},
+            "requests": self.requests,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.mode == "sampling":
+            body["interval_ms"] = round(self.interval * 1000, 3)
+            body["samples"] = self.samples
+            if include_data:
+                body["collapsed"] = self.collapsed().splitlines()
+        elif include_data:
+            body["functions"] = self.functions()
+        return body
+
+
+class RequestProfiler:
+    """
+    Args:
+        app: Flask app to hook (or call ``init_app`` later)
+    """
+
+    def __init__(self, app=None):
+        self.session = None
+        self.history = deque(maxlen=HISTORY)
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._in_flight = 0  # profiled requests not yet torn down, across sessions
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    # --- control ---------------------------------------------------------
+
+    def arm(self, route, mode="sampling", requests=None, seconds=None, interval=DEFAULT_INTERVAL):
+        """
+        Start profiling the next matching requests.
+
+        Args:
+            route: Request path or glob ("/predict/*"), or a URL rule
+            mode: "sampling" or "cprofile"
+            requests: Stop after this many matching requests
+            seconds: Stop after this long (at least one limit is required)
+            interval: Seconds between stack samples (sampling mode)
+
+        Returns:
+            The new ProfileSession
+
+        Raises:
+            ValueError: on invalid arguments
+            RuntimeError: when a session is already armed
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if not route or not route.startswith("/"):
+            raise ValueError("route must be a path such as /predict/diabetes or /predict/*")
+        if requests is None and seconds is None:
+            raise ValueError("Give a request count, a duration in seconds, or both")
+        if requests is not None and not 1 <= requests <= MAX_REQUESTS:
+            raise ValueError(f"requests must be between 1 and {MAX_REQUESTS}")
+        if seconds is not None and not 0 < seconds <= MAX_SECONDS:
+            raise ValueError(f"seconds must be between 0 and {MAX_SECONDS}")
+        if not 0.0005 <= interval <= 1:
+            raise ValueError("interval must be between 0.0005 and 1 second")
+
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError(f"Profile {self.session.id} is already armed")
+            session = ProfileSession(route, mode, requests, seconds, interval)
+            self.session = session
+            self.history.append(session)
+        if mode == "sampling" or seconds:
+            self._sampler = threading.Thread(
+                target=self._run_sampler, args=(session,), name=f"profiler-{session.id}", daemon=True
+            )
+            self._sampler.start()
+        return session
+
+    def stop(self, reason="cancelled"):
+        """Finish the armed session early, keeping what was collected."""
+        with self._lock:
+            session = self.session
+            if session is not None:
+                self._finish(session, reason)
+        return session
+
+    def get(self, session_id):
+        for session in self.history:
+            if session.id == session_id:
+                return session
+        return None
+
+    def describe(self, session, include_data=True) -> dict:
+        """Consistent snapshot of a session (the sampler may still be writing)."""
+        with self._lock:
+            return session.to_dict(include_data)
+
+    def collapsed(self, session) -> str:
+        with self._lock:
+            return session.collapsed()
+
+    def _finish(self, session, reason):
+        # Caller holds self._lock
+        if session.done:
+            return
+        session.finished_at = time.time()
+        session.reason = reason
+        if self.session is session:
+            self.session = None
+
+    # --- request hooks ---------------------------------------------------
+
+    def _before_request(self):
+        session = self.session
+        if session is None:
+            return
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        if not session.matches(request.path, rule):
+            return
+        with self._lock:
+            if session.done or (session.max_requests is not None
+                                and session.requests + session.in_flight >= session.max_requests):
+                return
+            session.in_flight += 1
+            self._in_flight += 1
+            if session.mode == "sampling":
+                session.threads.add(threading.get_ident())
+            g._profile_session = session
+        if session.mode == "cprofile":
+            if sys.getprofile() is not None:
+                return  # another profiler owns this thread
+            profile = cProfile.Profile()
+            g._profile = profile
+            profile.enable()
+
+    def _teardown_request(self, exc=None):
+        if not self._in_flight:
+            return
+        session = g.pop("_profile_session", None)
+        if session is None:
+            return
+        profile = g.pop("_profile", None)
+        if profile is not None:
+            profile.disable()
+        with self._lock:
+            session.in_flight -= 1
+            self._in_flight -= 1
+            session.threads.discard(threading.get_ident())
+            if profile is not None:
+                if session.stats is None:
+                    session.stats = pstats.Stats(profile)
+                else:
+                    session.stats.add(profile)
+            session.requests += 1
+            if session.max_requests is not None and session.requests >= session.max_requests:
+                self._finish(session, "requests")
+
+    # --- sampling --------------------------------------------------------
+
+    def _run_sampler(self, session):
+        own = threading.get_ident()
+        if session.mode != "sampling":
+            # cprofile sessions only need the thread to enforce the time limit
+            while not session.done:
+                time.sleep(0.05)
+                if time.monotonic() >= session.deadline:
+                    with self._lock:
+                        self._finish(session, "seconds")
+            return
+        # The sampler only runs when the request thread gives up the GIL,
+        # which it otherwise does mostly inside C calls that release it;
+        # a short switch interval keeps samples from clustering there
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, session.interval / 10))
+        try:
+            while not session.done:
+                time.sleep(session.interval)
+                if session.deadline is not None and time.monotonic() >= session.deadline:
+                    with self._lock:
+                        self._finish(session, "seconds")
+                    break
+                threads = list(session.threads)
+                if not threads:
+                    continue
+                frames = sys._current_frames()
+                stacks = [_collapse(frames[ident]) for ident in threads if ident != own and ident in frames]
+                del frames
+                with self._lock:
+                    for stack in stacks:
+                        session.stacks[stack] += 1
+                    session.samples += len(stacks)
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+@lru_cache(maxsize=4096)
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+@lru_cache(maxsize=1024)
+def _short_path(filename) -> str:
+    """Path relative to site-packages or the working directory, for readable frames."""
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:
+        return filename
+    return filename if relative.startswith("..") else relative
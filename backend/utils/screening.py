@@ -0,0 +1,151 @@
+"""
+Combined validation for multi-disease screening (/predict/screen).
+
+A screening record carries the union of the diabetes, heart and Parkinson's
+fields. ``Screener`` merges the models' feature schemas into one lookup, so
+each request field is parsed and type-checked once and then written into
+the input matrix of every model that uses it (age, for instance, feeds both
+the diabetes and the heart model).
+
+Required fields and training ranges are then checked per model, for the
+whole batch at once. A model whose inputs are incomplete or out of range for
+a record is skipped for that record, with the reason, instead of failing the
+screen; when the caller names the models explicitly those problems are
+errors, as on the single-model endpoints.
+"""
+
+import numpy as np
+
+from utils.feature_schema import coerce, field_error
+
+
+class Screener:
+    """
+    Args:
+        schemas: Mapping of model name -> FeatureSchema
+    """
+
+    def __init__(self, schemas):
+        self.schemas = dict(schemas)
+        # request key (lower case) -> [(model, column)], plus whether any
+        # target column is integer-coded
+        self._lookup = {}
+        self._integer = {}
+        for model, schema in self.schemas.items():
+            for i, feature in enumerate(schema.features):
+                for key in {key.lower() for key in feature.keys}:
+                    self._lookup.setdefault(key, []).append((model, i))
+                    self._integer[key] = self._integer.get(key, False) or feature.dtype == "int"
+        self._columns = {}
+        for model, schema in self.schemas.items():
+            features = schema.features
+            self._columns[model] = (
+                np.array([f.min for f in features], dtype=np.float64),
+                np.array([f.max for f in features], dtype=np.float64),
+                np.array([f.required for f in features]),
+                np.array([f.default for f in features], dtype=np.float64),
+            )
+
+    def shared_fields(self):
+        """Request fields used by more than one model."""
+        return sorted(key for key, targets in self._lookup.items() if len({m for m, _ in targets}) > 1)
+
+    def validate(self, payload, models=None, strict=False):
+        """
+        Validate one record (dict) or a batch (list of dicts) for several models.
+
+        Args:
+            payload: Record or list of records
+            models: Model names to screen for (default: every schema)
+            strict: Report missing and out-of-range fields as errors instead
+                of skipping the model for that record
+
+        Returns:
+            Tuple of (plan, skipped, errors, is_batch):
+            - plan: model -> {"features": float64 array of the applicable
+              rows, "rows": their record indices, "imputed": per applicable
+              row lists of defaulted fields}
+            - skipped: per record, model -> {"reason", "fields"}
+            - errors: list of {"row", "field", "code", "message"} dicts
+            - is_batch: whether the payload was a batch
+        """
+        models = [m for m in (models or self.schemas) if m in self.schemas]
+        is_batch = isinstance(payload, list)
+        records = payload if is_batch else [payload]
+        n = len(records)
+        out = {m: np.empty((n, len(self.schemas[m].features)), dtype=np.float64) for m in models}
+        seen = {m: np.zeros(out[m].shape, dtype=bool) for m in models}
+        invalid = {m: np.zeros(out[m].shape, dtype=bool) for m in models}
+        errors = []
+
+        # One pass over the request fields: each value is coerced once and
+        # scattered to every model column it feeds
+        for r, record in enumerate(records):
+            if not isinstance(record, dict):
+                errors.append(field_error(r, None, "invalid_record", "Each record must be a JSON object"))
+                continue
+            for key, value in record.items():
+                lowered = key.lower() if isinstance(key, str) else None
+                targets = self._lookup.get(lowered)
+                if not targets:
+                    continue
+                number = coerce(value, "int" if self._integer[lowered] else "float")
+                for model, i in targets:
+                    if model not in out or seen[model][r, i]:
+                        continue
+                    if number is None:
+                        invalid[model][r, i] = True
+                    else:
+                        out[model][r, i] = number
+                        seen[model][r, i] = True
+                if number is None:
+                    errors.append(field_error(
+                        r, key, "invalid_type",
+                        f"Expected {'an integer' if self._integer[lowered] else 'a number'}, got {value!r}",
+                    ))
+
+        plan = {}
+        skipped = [{} for _ in range(n)]
+        bad_record = np.array([not isinstance(record, dict) for record in records], dtype=bool)
+        for model in models:
+            schema = self.schemas[model]
+            mins, maxs, required, defaults = self._columns[model]
+            values, present = out[model], seen[model]
+            missing = ~present & ~invalid[model] & required
+            out_of_range = present & ((values < mins) | (values > maxs))
+            imputing = ~present & ~required
+            values[imputing] = np.broadcast_to(defaults, values.shape)[imputing]
+
+            problems = (("missing", missing), ("out_of_range", out_of_range))
+            unusable = bad_record | invalid[model].any(axis=1)
+            for code, mask in problems:
+                rows = np.flatnonzero(mask.any(axis=1))
+                unusable[rows] = True
+                for r in rows.tolist():
+                    fields = [schema.names[i] for i in np.flatnonzero(mask[r])]
+                    if strict:
+                        for i in np.flatnonzero(mask[r]).tolist():
+                            errors.append(_model_error(r, model, schema.features[i], code, values[r, i]))
+                    else:
+                        skipped[r].setdefault(model, {"reason": code, "fields": fields})
+
+            rows = np.flatnonzero(~unusable)
+            plan[model] = {
+                "features": np.ascontiguousarray(values[rows]),
+                "rows": rows.tolist(),
+                "imputed": [[schema.names[i] for i in np.flatnonzero(imputing[r])] for r in rows.tolist()],
+            }
+        errors.sort(key=lambda e: (e["row"], e["field"] or ""))
+        return plan, skipped, errors, is_batch
+
+
+def _model_error(row, model, feature, code, value):
+    if code == "missing":
+        error = field_error(row, feature.name, code, "Missing required feature")
+    else:
+        error = field_error(
+            row, feature.name, code,
+            f"{value:g} is outside the accepted range [{feature.min:g}, {feature.max:g}]",
+        )
+    error["model"] = model
+    return error
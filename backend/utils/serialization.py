@@ -0,0 +1,176 @@
+"""
+Fast JSON and MessagePack encoding for Flask responses and request bodies.
+
+``install(app)`` swaps Flask's JSON provider for one backed by orjson (when
+installed) and adds content negotiation, so every existing ``jsonify`` call:
+
+- encodes with orjson, which writes NumPy arrays and scalars directly from
+  their buffers instead of converting each element to a Python object;
+- answers with ``application/msgpack`` when the client's Accept header
+  prefers it over JSON.
+
+Request bodies sent as ``Content-Type: application/msgpack`` are decoded by
+``request.get_json()`` like JSON bodies, so routes need no changes.
+
+In MessagePack, numeric NumPy arrays travel as extension type 1 holding
+``[dtype, shape, raw bytes]``; ``unpackb`` here turns them back into arrays.
+Both libraries are optional: without orjson the stdlib encoder is used,
+without msgpack the API only speaks JSON.
+"""
+
+import json
+import logging
+
+from flask import Response, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from flask.wrappers import Request
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is a backend requirement
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/msgpack"
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, "application/x-msgpack")
+NUMPY_EXT_TYPE = 1
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """Fallback for types neither encoder handles natively."""
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            if orjson is not None and obj.dtype.kind in "biuf":
+                return np.ascontiguousarray(obj)  # orjson only takes C-contiguous arrays
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def dumps(obj) -> bytes:
+    """Encode obj as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _msgpack_default(obj):
+    if np is not None and isinstance(obj, np.ndarray) and obj.dtype.kind in "biufc":
+        array = np.ascontiguousarray(obj)
+        return msgpack.ExtType(
+            NUMPY_EXT_TYPE, msgpack.packb([array.dtype.str, list(array.shape), array.tobytes()])
+        )
+    return _default(obj)
+
+
+def _msgpack_ext_hook(code, data):
+    if code == NUMPY_EXT_TYPE and np is not None:
+        dtype, shape, raw = msgpack.unpackb(data)
+        return np.frombuffer(raw, dtype=np.dtype(dtype)).reshape(shape)
+    return msgpack.ExtType(code, data)
+
+
+def packb(obj) -> bytes:
+    """Encode obj as MessagePack."""
+    if msgpack is None:
+        raise RuntimeError("MessagePack support requires the msgpack package")
+    return msgpack.packb(obj, default=_msgpack_default, use_bin_type=True)
+
+
+def unpackb(data):
+    if msgpack is None:
+        raise RuntimeError("MessagePack support requires the msgpack package")
+    return msgpack.unpackb(data, raw=False, ext_hook=_msgpack_ext_hook, strict_map_key=False)
+
+
+def wants_msgpack() -> bool:
+    """Whether the current request's Accept header prefers MessagePack to JSON."""
+    if msgpack is None or not has_request_context():
+        return False
+    best = request.accept_mimetypes.best_match((JSON_MIMETYPE,) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+
+def encode_body(obj):
+    """Return (body bytes, mimetype) for obj, negotiated for the current request."""
+    if wants_msgpack():
+        return packb(obj), MSGPACK_MIMETYPE
+    return dumps(obj), JSON_MIMETYPE
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using ``dumps``/``loads`` above and Accept negotiation."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body, mimetype = encode_body(obj)
+        response = Response(body, mimetype=mimetype)
+        response.vary.add("Accept")
+        return response
+
+
+class FastRequest(Request):
+    """Request whose get_json() also decodes MessagePack bodies."""
+
+    def get_json(self, force=False, silent=False, cache=True):
+        if self.mimetype not in MSGPACK_MIMETYPES:
+            return super().get_json(force=force, silent=silent, cache=cache)
+        cached = getattr(self, "_cached_msgpack", None)
+        if cached is not None:
+            return cached
+        try:
+            data = unpackb(self.get_data(cache=cache))
+        except Exception as e:
+            if silent:
+                return None
+            return self.on_json_loading_failed(e)
+        if cache:
+            self._cached_msgpack = data
+        return data
+
+    @property
+    def is_json(self):
+        return super().is_json or self.mimetype in MSGPACK_MIMETYPES
+
+
+def install(app):
+    """Use the fast provider and MessagePack-aware requests for app."""
+    app.json = FastJSONProvider(app)
+    app.request_class = FastRequest
+    logger.info(
+        f"Serialization: JSON via {'orjson' if orjson else 'stdlib json'}, "
+        f"MessagePack {'enabled' if msgpack else 'unavailable'}"
+    )
+    return app
@@ -0,0 +1,319 @@
+"""
+Shadow evaluation of candidate models on sampled live /predict traffic.
+
+A candidate (typically a retrained artifact version that has not been
+promoted in the manifest) scores a sample of the validated feature batches
+the primary model has just scored, and the two are compared: row-level
+agreement, disagreements split by direction, and the candidate's scoring
+latency against the primary's.
+
+None of that runs on the request path. The request thread only draws the
+sampling coin and appends the sample to a bounded deque (a lock-free,
+atomic append; when it is full the oldest sample is dropped). A single
+background thread drains the deque every ``batch_seconds`` and sends all
+waiting samples to a worker process as one task, so pickling, waking the
+pool and folding results into the counters happen once per batch rather
+than once per request, and never on a request thread. Candidates are loaded
+and run in the worker processes, so they never hold the request process's
+GIL.
+
+The workers must not win the CPU from request handling either. A niced
+process still gets a share of a busy CPU, enough to add milliseconds to the
+primary path's tail latency on small hosts, so on Linux the workers also run
+under ``SCHED_IDLE``: they only get CPU time no request thread wants.
+benchmarks/bench_shadow.py checks the primary path's p95 and p99 with and
+without shadowing.
+
+Configure with ``SHADOW_MODELS=diabetes=diabetes/2/model.joblib.z,...`` (paths
+relative to the artifact directory, or absolute) and ``SHADOW_SAMPLE_RATE``.
+"""
+
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 0.1
+DEFAULT_MAX_PENDING = 32
+DEFAULT_BATCH_SECONDS = 0.25
+DEFAULT_NICENESS = 10
+DEFAULT_IDLE_PRIORITY = True
+# Latency percentiles are computed over the most recent samples
+LATENCY_WINDOW = 1000
+
+# Candidate models, loaded once per worker process
+_CANDIDATES = {}
+
+
+def _init_worker(paths, niceness, idle_priority=DEFAULT_IDLE_PRIORITY):
+    if niceness:
+        try:
+            os.nice(niceness)
+        except (OSError, AttributeError):
+            pass
+    if idle_priority:
+        try:
+            os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        except (OSError, AttributeError):  # not Linux
+            pass
+    # The bundled heart model was fitted on a DataFrame; arrays are fine
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    import joblib
+    for name, path in paths.items():
+        _CANDIDATES[name] = joblib.load(path)
+
+
+def _ping():
+    return sorted(_CANDIDATES)
+
+
+def _score_batch(samples):
+    """Score [(name, features)] one sample at a time: [(labels, seconds) or error string]."""
+    results = []
+    for name, features in samples:
+        try:
+            start = time.perf_counter()
+            labels = np.asarray(_CANDIDATES[name].predict(features))
+            results.append((labels, time.perf_counter() - start))
+        except Exception as e:
+            results.append(str(e))
+    return results
+
+
+def _summary(values):
+    if not values:
+        return None
+    array = np.fromiter(values, dtype=np.float64) * 1000
+    return {
+        "mean": round(float(array.mean()), 3),
+        "p50": round(float(np.percentile(array, 50)), 3),
+        "p95": round(float(np.percentile(array, 95)), 3),
+    }
+
+
+class ShadowEvaluator:
+    """
+    Args:
+        candidates: Mapping of model name -> candidate model file (joblib)
+        sample_rate: Fraction of primary predictions copied to the candidate
+        max_pending: Samples waiting for the next batch before the oldest are dropped
+        batch_seconds: How often the background thread sends waiting samples
+        workers: Shadow scoring processes
+        niceness: CPU priority decrement for the workers (0 keeps it equal)
+        idle_priority: Run the workers under SCHED_IDLE where supported
+    """
+
+    def __init__(self, candidates, sample_rate=DEFAULT_SAMPLE_RATE, max_pending=DEFAULT_MAX_PENDING,
+                 batch_seconds=DEFAULT_BATCH_SECONDS, workers=1, niceness=DEFAULT_NICENESS,
+                 idle_priority=DEFAULT_IDLE_PRIORITY):
+        self.paths = {name: str(path) for name, path in candidates.items()}
+        self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+        self.max_pending = max(int(max_pending), 1)
+        self.batch_seconds = max(float(batch_seconds), 0.001)
+        self.workers = max(int(workers), 1)
+        self.niceness = niceness
+        self.idle_priority = bool(idle_priority)
+        self.error = None
+        self._pool = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._queue = deque(maxlen=self.max_pending)
+        self._in_flight = 0  # samples the background thread is scoring
+        # Per-model sample numbers; next() on a count is atomic, so offer() needs no lock
+        self._offered = {name: itertools.count() for name in self.paths}
+        self._lock = threading.Lock()  # guards _stats (background thread vs status())
+        self._stats = {name: self._empty_stats() for name in self.paths}
+
+    @classmethod
+    def from_env(cls, artifact_dir):
+        """
+        Evaluator configured from SHADOW_* environment variables, or None.
+
+        Candidate files that do not exist are skipped with a warning.
+        """
+        spec = os.environ.get("SHADOW_MODELS", "").strip()
+        if not spec:
+            return None
+        candidates = {}
+        for item in spec.split(","):
+            name, _, path = item.partition("=")
+            name, path = name.strip(), Path(path.strip())
+            if not name or not path.name:
+                logger.warning(f"Ignoring malformed SHADOW_MODELS entry {item!r} (expected name=path)")
+                continue
+            if not path.is_absolute():
+                path = Path(artifact_dir) / path
+            if not path.exists():
+                logger.warning(f"Shadow candidate for {name} not found: {path}")
+                continue
+            candidates[name] = path
+        if not candidates:
+            return None
+        return cls(
+            candidates,
+            sample_rate=float(os.environ.get("SHADOW_SAMPLE_RATE", DEFAULT_SAMPLE_RATE)),
+            max_pending=int(os.environ.get("SHADOW_MAX_PENDING", DEFAULT_MAX_PENDING)),
+            batch_seconds=float(os.environ.get("SHADOW_BATCH_SECONDS", DEFAULT_BATCH_SECONDS)),
+            workers=int(os.environ.get("SHADOW_WORKERS", 1)),
+            niceness=int(os.environ.get("SHADOW_NICENESS", DEFAULT_NICENESS)),
+            idle_priority=os.environ.get("SHADOW_IDLE_PRIORITY", "true").lower() in ("1", "true", "yes"),
+        )
+
+    @staticmethod
+    def _empty_stats():
+        return {
+            "taken": 0, "last_sample": -1, "scored": 0, "errors": 0, "rows": 0, "agreed": 0,
+            "primary_positive_only": 0, "candidate_positive_only": 0,
+            "primary_seconds": deque(maxlen=LATENCY_WINDOW),
+            "candidate_seconds": deque(maxlen=LATENCY_WINDOW),
+            "last_error": None,
+        }
+
+    def start(self):
+        """Start the worker processes and the batching thread (call at startup, not per request)."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self.paths, self.niceness, self.idle_priority),
+            )
+            self._pool.submit(_ping).add_done_callback(self._started)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="shadow-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def _started(self, future):
+        try:
+            logger.info(f"Shadow candidates loaded: {', '.join(future.result())}")
+        except Exception as e:
+            self.error = f"Shadow workers failed to start: {e}"
+            logger.warning(self.error)
+
+    def offer(self, name, features, primary_labels, primary_seconds):
+        """
+        Maybe copy a scored batch to the candidate (request path; never blocks or locks).
+
+        Args:
+            name: Model name
+            features: Validated feature array the primary model scored
+            primary_labels: Primary model predictions for it
+            primary_seconds: Primary model scoring time
+
+        Returns:
+            Whether the batch was queued for shadow scoring
+        """
+        offered = self._offered.get(name)
+        if offered is None or self._pool is None or self.error or random.random() >= self.sample_rate:
+            return False
+        self._queue.append((name, next(offered), features, primary_labels, primary_seconds))
+        return True
+
+    # --- background thread ---------------------------------------------------
+
+    def _run(self):
+        while not self._stop.wait(self.batch_seconds):
+            batch = []
+            while len(batch) < self.max_pending:
+                try:
+                    batch.append(self._queue.popleft())
+                except IndexError:
+                    break
+            if not batch or self.error:
+                continue
+            self._in_flight = len(batch)
+            # One task per worker process
+            size = -(-len(batch) // self.workers)
+            chunks = [batch[i:i + size] for i in range(0, len(batch), size)]
+            try:
+                futures = [self._pool.submit(_score_batch, [(s[0], s[2]) for s in chunk]) for chunk in chunks]
+                results = [result for future in futures for result in future.result()]
+            except Exception as e:
+                # Pool broken or shut down
+                self.error = f"Shadow pool unavailable: {e}"
+                logger.warning(self.error)
+                results = [self.error] * len(batch)
+            self._record(batch, results)
+            self._in_flight = 0
+
+    def _record(self, batch, results):
+        with self._lock:
+            for (name, number, _, primary_labels, primary_seconds), result in zip(batch, results):
+                stats = self._stats[name]
+                stats["taken"] += 1
+                stats["last_sample"] = max(stats["last_sample"], number)
+                if isinstance(result, str):
+                    stats["errors"] += 1
+                    if stats["last_error"] is None:
+                        logger.warning(f"Shadow scoring for {name} failed: {result}")
+                    stats["last_error"] = result
+                    continue
+                labels, candidate_seconds = result
+                primary = np.asarray(primary_labels)
+                stats["scored"] += 1
+                stats["rows"] += len(primary)
+                stats["agreed"] += int((labels == primary).sum())
+                stats["primary_positive_only"] += int(((primary == 1) & (labels != 1)).sum())
+                stats["candidate_positive_only"] += int(((labels == 1) & (primary != 1)).sum())
+                stats["primary_seconds"].append(primary_seconds)
+                stats["candidate_seconds"].append(candidate_seconds)
+
+    def status(self) -> dict:
+        queued = {}
+        for name, _, _, _, _ in list(self._queue):
+            queued[name] = queued.get(name, 0) + 1
+        models = {}
+        with self._lock:
+            for name, stats in self._stats.items():
+                primary, candidate = list(stats["primary_seconds"]), list(stats["candidate_seconds"])
+                deltas = [c - p for p, c in zip(primary, candidate)]
+                # Samples numbered up to the last one taken that never reached the
+                # batcher were pushed out of the full deque
+                dropped = max(stats["last_sample"] + 1 - stats["taken"] - queued.get(name, 0), 0)
+                models[name] = {
+                    "candidate": self.paths[name],
+                    "sampled": stats["taken"] + dropped + queued.get(name, 0),
+                    "scored": stats["scored"],
+                    "dropped": dropped,
+                    "errors": stats["errors"],
+                    "rows": stats["rows"],
+                    "agreement_rate": round(stats["agreed"] / stats["rows"], 6) if stats["rows"] else None,
+                    "disagreements": {
+                        "primary_positive_only": stats["primary_positive_only"],
+                        "candidate_positive_only": stats["candidate_positive_only"],
+                    },
+                    "latency_ms": {
+                        "primary": _summary(primary),
+                        "candidate": _summary(candidate),
+                        "delta": _summary(deltas),
+                    },
+                    "last_error": stats["last_error"],
+                }
+        return {
+            "sample_rate": self.sample_rate,
+            "max_pending": self.max_pending,
+            "batch_seconds": self.batch_seconds,
+            "pending": sum(queued.values()) + self._in_flight,
+            "workers": self.workers,
+            "idle_priority": self.idle_priority,
+            "error": self.error,
+            "models": models,
+        }
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,216 @@
+"""
+Startup profiling and lazy loading of heavy subsystems.
+
+Cold start matters on autoscaled containers: a new instance serves nothing
+until the app module has been imported. ``StartupReport`` measures that
+path:
+
+- an import profile: inclusive time of every top-level import made during
+  startup (like ``python -X importtime``, but collected at runtime and
+  grouped by the module the app actually asked for);
+- named phases (imports, schemas, job queue, ...) marked as startup proceeds;
+- time to ready and time to first request, both measured from process start
+  (read from /proc on Linux), against a target (``STARTUP_TARGET_SECONDS``).
+
+The report is logged once the app is ready and served at /status/startup.
+
+``Lazy`` defers a heavy subsystem (scikit-learn models alone take ~1 s to
+import) until its routes are first hit, optionally warming it in a
+background thread once the app is ready so the first request rarely waits.
+"""
+
+import builtins
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def process_start_time() -> float:
+    """Wall-clock time the current process started (Linux), else now."""
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        # starttime is field 22 of /proc/[pid]/stat; fields[0] is field 3
+        return time.time() - uptime + int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.time()
+
+
+class ImportProfiler:
+    """
+    Inclusive wall time of each outermost import in the installing thread.
+
+    Nested imports are charged to the import that triggered them, so the
+    entries add up to the total import time.
+    """
+
+    def __init__(self):
+        self.times = {}
+        self._original = None
+        self._thread = None
+        self._depth = 0
+
+    def install(self):
+        if self._original is None:
+            self._original = builtins.__import__
+            self._thread = threading.current_thread()
+            builtins.__import__ = self._import
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original or builtins.__import__
+        if self._depth or level or name in sys.modules or threading.current_thread() is not self._thread:
+            return original(name, globals, locals, fromlist, level)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - start
+
+    def top(self, n=15):
+        ranked = sorted(self.times.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [{"module": name, "ms": round(seconds * 1000, 1)} for name, seconds in ranked]
+
+
+class StartupReport:
+    """
+    Args:
+        target_seconds: Time-to-first-request goal; exceeding it logs a warning
+    """
+
+    def __init__(self, target_seconds=None):
+        self.target_seconds = target_seconds
+        self.process_start = process_start_time()
+        self.imports = ImportProfiler()
+        self.phases = {}
+        self.lazy = {}
+        self.ready_seconds = None
+        self.first_request_seconds = None
+        self._last_mark = time.perf_counter()
+
+    @classmethod
+    def begin(cls):
+        """Create the report and start profiling imports (call before other imports)."""
+        report = cls(float(os.environ.get("STARTUP_TARGET_SECONDS", 1.0)))
+        report.imports.install()
+        return report
+
+    def since_start(self) -> float:
+        return time.time() - self.process_start
+
+    def mark(self, phase):
+        """Record the time since the previous mark as `phase`."""
+        now = time.perf_counter()
+        self.phases[phase] = round(now - self._last_mark, 4)
+        self._last_mark = now
+
+    def ready(self, app):
+        """Stop profiling, log the report and time the app's first request."""
+        self.imports.uninstall()
+        self.ready_seconds = round(self.since_start(), 4)
+        slowest = ", ".join(f"{entry['module']} {entry['ms']:.0f}ms" for entry in self.imports.top(5))
+        logger.info(f"Startup ready in {self.ready_seconds:.2f}s since process start; slowest imports: {slowest}")
+
+        def record_first_request():
+            if self.first_request_seconds is None:
+                self.first_request_seconds = round(self.since_start(), 4)
+                met = self.target_seconds is None or self.first_request_seconds <= self.target_seconds
+                message = (f"First request {self.first_request_seconds:.2f}s after process start "
+                           f"(target {self.target_seconds}s)")
+                if met:
+                    logger.info(message)
+                else:
+                    logger.warning(message)
+
+        app.before_request(record_first_request)
+
+    def to_dict(self, top=15) -> dict:
+        return {
+            "target_seconds": self.target_seconds,
+            "ready_seconds": self.ready_seconds,
+            "first_request_seconds": self.first_request_seconds,
+            "within_target": (None if self.first_request_seconds is None or self.target_seconds is None
+                              else self.first_request_seconds <= self.target_seconds),
+            "phases": self.phases,
+            "import_seconds": round(sum(self.imports.times.values()), 4),
+            "slowest_imports": self.imports.top(top),
+            "lazy": {name: lazy.status() for name, lazy in self.lazy.items()},
+        }
+
+
+class Lazy:
+    """
+    A value built on first use, once, even under concurrent requests.
+
+    A factory that raises is retried on the next call.
+
+    Args:
+        name: Label in the startup report
+        factory: Zero-argument callable building the value
+        report: Optional StartupReport to register with
+    """
+
+    def __init__(self, name, factory, report=None):
+        self.name = name
+        self.factory = factory
+        self.load_seconds = None
+        self.loaded_by = None
+        self._value = None
+        self._loaded = False
+        self._warming = False
+        self._lock = threading.Lock()
+        if report is not None:
+            report.lazy[name] = self
+
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    start = time.perf_counter()
+                    self._value = self.factory()
+                    self.load_seconds = round(time.perf_counter() - start, 4)
+                    self.loaded_by = threading.current_thread().name
+                    self._loaded = True
+                    logger.info(f"Loaded {self.name} in {self.load_seconds:.2f}s ({self.loaded_by})")
+        return self._value
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def warm(self):
+        """
+        Load in a background thread; requests arriving meanwhile wait for it.
+
+        Does nothing when the value is loaded or a background load is running.
+        """
+        with self._lock:
+            if self._loaded or self._warming:
+                return
+            self._warming = True
+
+        def run():
+            try:
+                self.get()
+            except Exception as e:
+                logger.warning(f"Background load of {self.name} failed: {e}")
+            finally:
+                self._warming = False
+
+        threading.Thread(target=run, name=f"warm-{self.name}", daemon=True).start()
+
+    def status(self) -> dict:
+        return {"loaded": self._loaded, "load_seconds": self.load_seconds, "loaded_by": self.loaded_by}
@@ -0,0 +1,134 @@
+"""
+Stale-while-revalidate cache for slow, slowly-changing upstream calls.
+
+Values are stored per key after any post-processing, so a hit is a plain
+memory read. Within ``fresh_for`` seconds a value is served as-is; after
+that and up to ``stale_for`` more seconds it is still served immediately
+while one background refresh runs. Concurrent misses for the same key share
+a single upstream call, and an optional refresher thread re-fetches known
+keys on a schedule so they rarely go stale at all. Keys nobody has read for
+``stale_for`` seconds are evicted by the refresher instead of being
+re-fetched forever; callers should still validate keys that come from
+clients, since every distinct key costs an upstream call.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidateCache:
+    """
+    Args:
+        loader: Callable(key) returning the value to cache
+        fresh_for: Seconds a value is served without revalidation
+        stale_for: Extra seconds a stale value may be served while refreshing
+        max_workers: Threads used for upstream calls
+        name: Label used in log messages
+    """
+
+    def __init__(self, loader, fresh_for=900, stale_for=6 * 3600, max_workers=2, name="cache"):
+        self.loader = loader
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self.name = name
+        self._entries = {}  # key -> (value, fetched_at)
+        self._last_read = {}  # key -> monotonic time of the last get()
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-swr")
+        self._refresher = None
+        self._stop = threading.Event()
+
+    def get(self, key):
+        """
+        Return the cached value for key, loading it on a miss.
+
+        Raises whatever the loader raises when there is no usable value.
+        """
+        self._last_read[key] = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[1]
+            if age < self.fresh_for:
+                return entry[0]
+            if age < self.fresh_for + self.stale_for:
+                self._load(key)  # revalidate in the background
+                return entry[0]
+        return self._load(key).result()
+
+    def _load(self, key):
+        """Start (or join) the upstream call for key."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._fetch, key)
+                self._inflight[key] = future
+            return future
+
+    def _fetch(self, key):
+        try:
+            start = time.monotonic()
+            value = self.loader(key)
+            self._entries[key] = (value, time.monotonic())
+            logger.info(f"{self.name}: refreshed {key!r} in {time.monotonic() - start:.2f}s")
+            return value
+        except Exception as e:
+            logger.warning(f"{self.name}: refresh of {key!r} failed: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def keys(self):
+        return list(self._entries)
+
+    def evict_idle(self, keep=()):
+        """
+        Drop keys not read within ``stale_for`` seconds (except ``keep``).
+
+        Returns:
+            List of evicted keys
+        """
+        cutoff = time.monotonic() - self.stale_for
+        keep = set(keep)
+        evicted = []
+        for key in list(dict.fromkeys([*self._entries, *self._last_read])):
+            if key not in keep and self._last_read.get(key, 0) < cutoff:
+                self._entries.pop(key, None)
+                self._last_read.pop(key, None)
+                evicted.append(key)
+        if evicted:
+            logger.info(f"{self.name}: evicted {len(evicted)} idle key(s)")
+        return evicted
+
+    def start_refresher(self, keys=(), interval=None):
+        """
+        Re-fetch ``keys`` and every key read recently in a background thread.
+
+        Args:
+            keys: Keys to prefetch even before anyone asks for them
+            interval: Seconds between refresh rounds (defaults to fresh_for)
+        """
+        if self._refresher is not None:
+            return
+        interval = interval or self.fresh_for
+        prefetch = list(keys)
+
+        def run():
+            while True:
+                self.evict_idle(keep=prefetch)
+                for key in dict.fromkeys(prefetch + self.keys()):
+                    self._load(key)
+                if self._stop.wait(interval):
+                    break
+
+        self._refresher = threading.Thread(target=run, name=f"{self.name}-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False)
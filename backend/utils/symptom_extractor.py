@@ -1 +1,247 @@
-# placeholder
+"""
+Structured symptom extraction from chat messages and medical reports.
+
+A word-level Aho-Corasick automaton is compiled once from the symptom
+vocabulary (canonical terms plus synonyms from the local lookup engine), so
+every known phrase is found in a single left-to-right pass over the text
+regardless of vocabulary size. A cue such as "no", "denies" or "without" opens a short
+negation scope that ends at the next clause break ("but", ".", ";", ...),
+and symptoms starting inside that scope are reported as negated ("no fever"
+-> fever, negated). A comma is a clause break too, except between the items
+of a symptom list: "denies fever, cough, or headache" negates all three,
+while in "no fever today, cough" the comma starts a new clause and cough is
+affirmed. Cues after a symptom ("fever absent", "fever-free") negate it as
+well.
+"""
+
+import re
+from collections import deque
+from threading import Lock
+
+from utils.symptom_lookup import get_engine
+
+# Tokens that negate the symptoms following them
+NEGATION_CUES = frozenset({
+    "no", "not", "denies", "deny", "denied", "denying", "without", "never",
+    "nor", "negative",
+})
+# Tokens that negate the symptom right before them ("fever absent", "fever-free")
+POST_NEGATION_CUES = frozenset({"absent", "denied", "negative", "none", "resolved", "gone", "free"})
+# Tokens that end a negation scope
+SCOPE_BREAKS = frozenset({
+    "but", "however", "although", "though", "except", "yet", "apart",
+    ",", ".", ";", ":", "!", "?", "\n",
+})
+# Words that may join a symptom list after a comma ("fever, cough, or headache")
+LIST_CONJUNCTIONS = frozenset({"and", "or", "nor"})
+NEGATION_WINDOW = 6  # max words a negation cue reaches forward (renewed per list item)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[,.;:!?\n]")
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]?")
+
+
+class SymptomExtractor:
+    """
+    Compiled multi-pattern matcher over symptom phrases.
+
+    Args:
+        phrases: Mapping of phrase -> canonical symptom term
+    """
+
+    def __init__(self, phrases):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]  # state -> (phrase length in words, canonical) or None
+        self._dict_suffix = [0]  # state -> nearest fail-chain state with an output
+
+        for phrase, canonical in phrases.items():
+            words = _TOKEN_RE.findall(phrase.lower())
+            if words:
+                self._add(words, canonical)
+        self._build_links()
+
+    # --- automaton construction ------------------------------------------
+
+    def _add(self, words, canonical):
+        state = 0
+        for word in words:
+            nxt = self._goto[state].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][word] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_suffix.append(0)
+            state = nxt
+        self._output[state] = (len(words), canonical)
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                fail = self._fail[nxt]
+                self._dict_suffix[nxt] = fail if self._output[fail] else self._dict_suffix[fail]
+
+    # --- matching --------------------------------------------------------
+
+    def extract(self, text: str):
+        """
+        Find every known symptom in text.
+
+        Args:
+            text: Chat message or report text
+
+        Returns:
+            List of dicts with the canonical symptom, the matched phrase and
+            whether it was negated, in order of first mention. A symptom that is
+            both affirmed and negated is reported as affirmed.
+        """
+        tokens = _TOKEN_RE.findall(text.lower())
+        goto, fail, output, dict_suffix = self._goto, self._fail, self._output, self._dict_suffix
+
+        matches = []
+        state = 0
+        for i, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+
+            hit = state if output[state] else dict_suffix[state]
+            while hit:
+                length, canonical = output[hit]
+                matches.append((i - length + 1, i, canonical))
+                hit = dict_suffix[hit]
+
+        spans = self._select(matches)
+        return self._resolve(spans, tokens, self._negation_scopes(tokens, spans))
+
+    @staticmethod
+    def _select(matches):
+        # Leftmost-longest: "chest pain" wins over a nested "pain"
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        spans = []
+        covered_until = -1
+        for start, end, canonical in matches:
+            if start <= covered_until:
+                continue
+            covered_until = end
+            spans.append((start, end, canonical))
+        return spans
+
+    @staticmethod
+    def _negation_scopes(tokens, spans):
+        """Per token, whether it lies inside a negation scope."""
+        starts = {start for start, _, _ in spans}
+        ends = {end for _, end, _ in spans}
+
+        def continues_list(comma):
+            # A comma right after a symptom and right before another one
+            # (optionally "and"/"or") separates list items, not clauses
+            following = comma + 1
+            if tokens[following:following + 1] and tokens[following] in LIST_CONJUNCTIONS:
+                following += 1
+            return comma - 1 in ends and following in starts
+
+        negated_at = []
+        neg_remaining = 0
+        for i, token in enumerate(tokens):
+            if token == ",":
+                neg_remaining = NEGATION_WINDOW if neg_remaining and continues_list(i) else 0
+            elif token in SCOPE_BREAKS:
+                neg_remaining = 0
+            elif token in NEGATION_CUES or (token == "free" and tokens[i + 1:i + 2] == ["of"]):
+                # "free" only negates forward as "free of ..."
+                neg_remaining = NEGATION_WINDOW
+            negated_at.append(neg_remaining > 0)
+            if neg_remaining:
+                neg_remaining -= 1
+        return negated_at
+
+    @staticmethod
+    def _resolve(spans, tokens, negated_at):
+        found = {}
+        for start, end, canonical in spans:
+            negated = negated_at[start]
+            if not negated:
+                for t in tokens[end + 1:end + 3]:
+                    if t in SCOPE_BREAKS:
+                        break
+                    if t in POST_NEGATION_CUES:
+                        negated = True
+                        break
+            previous = found.get(canonical)
+            if previous is None:
+                found[canonical] = {
+                    "symptom": canonical,
+                    "text": " ".join(tokens[start:end + 1]),
+                    "negated": negated,
+                }
+            elif previous["negated"] and not negated:
+                previous["negated"] = False
+        return list(found.values())
+
+
+def present_symptoms(extracted):
+    """Canonical symptoms from extract() that were not negated."""
+    return [s["symptom"] for s in extracted if not s["negated"]]
+
+
+def condense_for_llm(text: str, extracted, max_chars: int = 1500) -> str:
+    """
+    Shrink long text before it is sent to the LLM.
+
+    Short messages, and texts with no recognised symptoms, are returned
+    unchanged. Longer ones (e.g. downloaded reports) are replaced by a
+    structured symptom summary followed by the sentences that mention a
+    symptom, truncated to max_chars.
+    """
+    if len(text) <= max_chars or not extracted:
+        return text
+
+    present = [s["symptom"] for s in extracted if not s["negated"]]
+    absent = [s["symptom"] for s in extracted if s["negated"]]
+    lines = []
+    if present:
+        lines.append("Reported symptoms: " + ", ".join(present) + ".")
+    if absent:
+        lines.append("Denies: " + ", ".join(absent) + ".")
+
+    mentions = {s["text"] for s in extracted}
+    budget = max_chars - sum(len(line) + 1 for line in lines)
+    for sentence in _SENTENCE_RE.findall(text):
+        sentence = " ".join(sentence.split())
+        lowered = " ".join(_TOKEN_RE.findall(sentence.lower()))
+        if not any(m in lowered for m in mentions):
+            continue
+        if len(sentence) + 1 > budget:
+            break
+        lines.append(sentence)
+        budget -= len(sentence) + 1
+    return "\n".join(lines)
+
+
+_extractor = None
+_extractor_lock = Lock()
+
+
+def get_extractor() -> SymptomExtractor:
+    """Process-wide extractor compiled from the lookup engine's vocabulary."""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = SymptomExtractor(get_engine().phrase_map())
+    return _extractor
+
+
+def extract_symptoms(text: str):
+    """Extract structured symptoms from text with the shared extractor."""
+    return get_extractor().extract(text)
@@ -0,0 +1,268 @@
+"""
+Local symptom -> disease lookup engine over data/symptom_disease.csv.
+
+The CSV rows are ``symptom, symptom, ..., disease, recommendation`` (the number
+of symptom columns varies per row). At load time every symptom is normalized to
+a canonical term (synonyms such as "high temperature" map to "fever") and an
+inverted index from term to row ids is built. A query is resolved to canonical
+terms (exact, synonym, then fuzzy match against the vocabulary) and rows are
+ranked by an IDF-weighted overlap score, so common queries are answered locally
+in microseconds without a round trip to the LLM.
+"""
+
+import csv
+import difflib
+import heapq
+import math
+import re
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+
+DEFAULT_CSV_PATH = Path(__file__).resolve().parent.parent / "data" / "symptom_disease.csv"
+
+# Colloquial phrasings -> canonical symptom term used in the CSV
+SYNONYMS = {
+    "temperature": "fever",
+    "high temperature": "fever",
+    "pyrexia": "fever",
+    "feverish": "fever",
+    "head ache": "headache",
+    "head pain": "headache",
+    "migraine pain": "headache",
+    "throat pain": "sore throat",
+    "painful throat": "sore throat",
+    "scratchy throat": "sore throat",
+    "breathlessness": "shortness of breath",
+    "short of breath": "shortness of breath",
+    "difficulty breathing": "shortness of breath",
+    "trouble breathing": "shortness of breath",
+    "chest tightness": "chest pain",
+    "chest ache": "chest pain",
+    "stomach ache": "abdominal pain",
+    "stomachache": "abdominal pain",
+    "stomach pain": "abdominal pain",
+    "belly pain": "abdominal pain",
+    "tummy ache": "abdominal pain",
+    "loose motion": "diarrhea",
+    "loose motions": "diarrhea",
+    "diarrhoea": "diarrhea",
+    "feeling sick": "nausea",
+    "queasy": "nausea",
+    "nauseous": "nausea",
+    "coughing": "cough",
+}
+
+FUZZY_CUTOFF = 0.85
+# Only the phrases sharing the most character trigrams with a query are scored
+FUZZY_CANDIDATES = 16
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(term: str) -> str:
+    """Lowercase and collapse a symptom phrase to single-spaced words."""
+    return " ".join(_WORD_RE.findall(term.lower()))
+
+
+class SymptomLookup:
+    """
+    Inverted index from canonical symptom term to the rows that list it.
+
+    Args:
+        rows: Iterable of (symptoms, disease, recommendation) tuples
+        synonyms: Mapping of alternative phrasing -> canonical term
+    """
+
+    def __init__(self, rows, synonyms=None):
+        self.synonyms = {normalize(k): normalize(v) for k, v in (synonyms or SYNONYMS).items()}
+
+        self.diseases = []
+        self.recommendations = []
+        self.row_terms = []  # row id -> tuple of term ids
+        self.terms = []  # term id -> canonical term
+        self.term_ids = {}
+        postings = []
+
+        for symptoms, disease, recommendation in rows:
+            row_id = len(self.diseases)
+            ids = []
+            for symptom in symptoms:
+                term = self._canonical(normalize(symptom))
+                if not term:
+                    continue
+                term_id = self.term_ids.get(term)
+                if term_id is None:
+                    term_id = len(self.terms)
+                    self.term_ids[term] = term_id
+                    self.terms.append(term)
+                    postings.append(array("I"))
+                if term_id not in ids:
+                    ids.append(term_id)
+                    postings[term_id].append(row_id)
+            self.diseases.append(disease.strip())
+            self.recommendations.append(recommendation.strip())
+            self.row_terms.append(tuple(ids))
+
+        self.postings = postings
+        n_rows = max(len(self.diseases), 1)
+        self.idf = [math.log(1 + n_rows / len(p)) for p in postings]
+        self.row_weight = [sum(self.idf[t] for t in ids) or 1.0 for ids in self.row_terms]
+
+        # Every phrase that resolves to a term, used for fuzzy matching and extraction
+        self.vocabulary = sorted(set(self.term_ids) | set(self.synonyms))
+        self.trigrams = {}
+        for phrase_id, phrase in enumerate(self.vocabulary):
+            for gram in _trigrams(phrase):
+                self.trigrams.setdefault(gram, []).append(phrase_id)
+        self._resolve_cached = lru_cache(maxsize=16384)(self._resolve)
+        self._search_cached = lru_cache(maxsize=16384)(self._search)
+
+    # --- construction ----------------------------------------------------
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_CSV_PATH, synonyms=None):
+        """Load the engine from a symptom/disease/recommendation CSV file."""
+        return cls(read_csv_rows(path), synonyms)
+
+    def _canonical(self, term: str) -> str:
+        return self.synonyms.get(term, term)
+
+    # --- term resolution -------------------------------------------------
+
+    def _resolve(self, term: str):
+        """Map a normalized phrase to a term id (exact, synonym, then fuzzy)."""
+        canonical = self._canonical(term)
+        term_id = self.term_ids.get(canonical)
+        if term_id is not None:
+            return term_id, 1.0
+        # Fuzzy: shortlist phrases by shared trigrams, then score with difflib
+        shared = {}
+        for gram in _trigrams(term):
+            for phrase_id in self.trigrams.get(gram, ()):
+                shared[phrase_id] = shared.get(phrase_id, 0) + 1
+        best_ratio, best_phrase = 0.0, None
+        matcher = difflib.SequenceMatcher(b=term)
+        for phrase_id in heapq.nlargest(FUZZY_CANDIDATES, shared, key=shared.get):
+            matcher.set_seq1(self.vocabulary[phrase_id])
+            if matcher.real_quick_ratio() < FUZZY_CUTOFF or matcher.quick_ratio() < FUZZY_CUTOFF:
+                continue
+            ratio = matcher.ratio()
+            if ratio > best_ratio:
+                best_ratio, best_phrase = ratio, self.vocabulary[phrase_id]
+        if best_phrase is not None and best_ratio >= FUZZY_CUTOFF:
+            return self.term_ids[self._canonical(best_phrase)], best_ratio
+        return None, 0.0
+
+    def resolve(self, symptom: str):
+        """
+        Resolve a free-form symptom to its canonical term.
+
+        Returns:
+            Tuple of (canonical term or None, match confidence 0..1)
+        """
+        term_id, confidence = self._resolve_cached(normalize(symptom))
+        return (self.terms[term_id] if term_id is not None else None), confidence
+
+    # --- search ----------------------------------------------------------
+
+    def _search(self, terms, top_k):
+        weights = {}
+        for term in terms:
+            term_id, confidence = self._resolve_cached(term)
+            if term_id is not None:
+                weights[term_id] = max(weights.get(term_id, 0.0), confidence)
+        if not weights:
+            return ()
+
+        query_weight = sum(self.idf[t] for t in weights)
+        scores = {}
+        for term_id, confidence in weights.items():
+            gain = self.idf[term_id] * confidence
+            for row_id in self.postings[term_id]:
+                scores[row_id] = scores.get(row_id, 0.0) + gain
+
+        # Keep the best row per disease, balancing "how much of the row is
+        # explained" against "how much of the query is covered"
+        best = {}
+        for row_id, raw in scores.items():
+            score = (raw / self.row_weight[row_id]) * (raw / query_weight)
+            disease = self.diseases[row_id]
+            current = best.get(disease)
+            if current is None or score > current[0]:
+                best[disease] = (score, row_id)
+
+        results = []
+        for score, row_id in heapq.nlargest(top_k, best.values()):
+            matched = tuple(self.terms[t] for t in self.row_terms[row_id] if t in weights)
+            results.append((row_id, round(score, 4), matched))
+        return tuple(results)
+
+    def search(self, symptoms, top_k: int = 3):
+        """
+        Rank diseases for a list of symptoms.
+
+        Args:
+            symptoms: Iterable of symptom phrases (any phrasing / minor typos)
+            top_k: Maximum number of distinct diseases to return
+
+        Returns:
+            List of dicts with disease, recommendation, score and matched symptoms
+        """
+        key = tuple(sorted({normalize(s) for s in symptoms if s and s.strip()}))
+        return [
+            {
+                "disease": self.diseases[row_id],
+                "recommendation": self.recommendations[row_id],
+                "score": score,
+                "matched_symptoms": list(matched),
+                "symptoms": [self.terms[t] for t in self.row_terms[row_id]],
+            }
+            for row_id, score, matched in self._search_cached(key, top_k)
+        ]
+
+    def phrase_map(self):
+        """Every phrase the engine recognises, mapped to its canonical term."""
+        return {phrase: self._canonical(phrase) for phrase in self.vocabulary}
+
+    def __len__(self):
+        return len(self.diseases)
+
+
+def _trigrams(phrase: str):
+    padded = f"  {phrase} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def read_csv_rows(path):
+    """Yield (symptoms, disease, recommendation) from a symptom/disease CSV."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header and [h.strip().lower() for h in header[-2:]] != ["disease", "recommendation"]:
+            # No header row - treat the first line as data
+            reader = _chain_row(header, reader)
+        for row in reader:
+            row = [cell.strip() for cell in row]
+            if len(row) < 3 or not row[-2]:
+                continue
+            yield row[:-2], row[-2], row[-1]
+
+
+def _chain_row(first, rest):
+    yield first
+    yield from rest
+
+
+_engine = None
+_engine_lock = Lock()
+
+
+def get_engine(path=DEFAULT_CSV_PATH) -> SymptomLookup:
+    """Process-wide engine, loaded from the bundled CSV on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SymptomLookup.from_csv(path)
+    return _engine
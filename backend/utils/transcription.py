@@ -0,0 +1,232 @@
+"""
+Speech-to-text for voice queries with faster-whisper (CTranslate2 on CPU).
+
+One int8-quantized Whisper model is loaded per process, on first use, and
+shared by all requests. Uploaded audio is decoded to 16 kHz mono and
+segmented with the Silero VAD bundled in faster-whisper, so silence is
+skipped instead of decoded. Segments are produced lazily:
+``Transcriber.stream()`` yields each one as soon as it is decoded, which
+lets the API return partial transcripts while the rest of the clip is
+still being transcribed.
+
+Concurrent requests: CTranslate2 runs up to ``WHISPER_WORKERS``
+transcriptions in parallel on the single model copy, each with
+``cpu cores / workers`` intra-op threads, so simultaneous requests share the
+CPU rather than oversubscribing it. Requests beyond that wait in an
+admission queue (utils/admission.py) and are shed with 429/503 when it is
+full. With a ``lane``, a request takes a lane slot before its audio is
+decoded and keeps it until the transcript is done, so decoding, queueing
+and transcribing together never hold more worker threads than the lane
+allows.
+
+Every result reports its real-time factor (processing seconds / audio
+seconds) for sizing CPU hosts.
+"""
+
+import logging
+import os
+import time
+from threading import Lock
+
+from utils.admission import AdmissionController
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "base")
+WHISPER_COMPUTE_TYPE = os.environ.get("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_WORKERS = int(os.environ.get("WHISPER_WORKERS", 2))
+# Greedy decoding; beam search costs ~beam_size x CPU for little gain on short queries
+WHISPER_BEAM_SIZE = int(os.environ.get("WHISPER_BEAM_SIZE", 1))
+MAX_AUDIO_SECONDS = float(os.environ.get("MAX_AUDIO_SECONDS", 300))
+VAD_PARAMETERS = {"min_silence_duration_ms": 500, "speech_pad_ms": 200}
+
+
+class TranscriptionError(ValueError):
+    """
+    Raised for audio that cannot be transcribed.
+
+    Attributes:
+        status: HTTP status to answer with (400 unreadable/empty, 413 too long)
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Transcriber:
+    """
+    Args:
+        model_size: Whisper model name or path to a converted CTranslate2 model
+        workers: Transcriptions run in parallel on the shared model
+        compute_type: CTranslate2 quantization ("int8" on CPU)
+        cpu_threads: Threads per transcription (defaults to cores / workers)
+        max_queue: Requests allowed to wait for a free worker
+        queue_timeout: Seconds a request may wait
+        lane: Optional shared Lane held from decoding to the end of the transcript
+    """
+
+    def __init__(self, model_size=WHISPER_MODEL, workers=WHISPER_WORKERS, compute_type=WHISPER_COMPUTE_TYPE,
+                 cpu_threads=None, max_queue=8, queue_timeout=30.0, lane=None):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("Voice transcription requires faster-whisper (pip install faster-whisper)")
+
+        self.model_size = model_size
+        self.workers = workers
+        self.compute_type = compute_type
+        self.lane = lane
+        self.cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // workers)
+        start = time.perf_counter()
+        self.model = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=self.cpu_threads,
+            num_workers=workers,
+        )
+        logger.info(
+            f"Whisper model '{model_size}' ({compute_type}) loaded in {time.perf_counter() - start:.1f}s "
+            f"with {workers} workers x {self.cpu_threads} threads"
+        )
+        # Fixed limit: CTranslate2 cannot run more than `workers` jobs at once
+        self.admission = AdmissionController(
+            "whisper", initial_limit=workers, min_limit=workers, max_limit=workers,
+            max_queue=max_queue, queue_timeout=queue_timeout,
+        )
+        self._lock = Lock()
+        self.stats = {"requests": 0, "audio_seconds": 0.0, "processing_seconds": 0.0}
+
+    def decode(self, audio):
+        """Decode a path or binary file object to 16 kHz mono float32 samples."""
+        from faster_whisper import decode_audio
+
+        try:
+            samples = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+        except Exception as e:
+            raise TranscriptionError(f"Could not decode audio: {e}")
+        if not len(samples):
+            raise TranscriptionError("Audio is empty")
+        duration = len(samples) / SAMPLE_RATE
+        if duration > MAX_AUDIO_SECONDS:
+            raise TranscriptionError(
+                f"Audio is {duration:.0f}s long; the limit is {MAX_AUDIO_SECONDS:.0f}s", status=413
+            )
+        return samples
+
+    def stream(self, audio, language=None):
+        """
+        Transcribe audio incrementally.
+
+        Yields:
+            ("segment", {start, end, text, elapsed_seconds}) as each segment is
+            decoded, then ("result", {...}) with the full text and timings
+
+        Raises:
+            TranscriptionError: unreadable, empty or too long audio
+            Overloaded: the lane is full or no worker became free in time
+        """
+        if self.lane is None:
+            yield from self._stream(audio, language)
+            return
+        with self.lane.hold("whisper"):
+            yield from self._stream(audio, language)
+
+    def _stream(self, audio, language):
+        samples = self.decode(audio)
+        audio_seconds = len(samples) / SAMPLE_RATE
+        texts = []
+        with self.admission.admit():
+            start = time.perf_counter()
+            segments, info = self.model.transcribe(
+                samples,
+                language=language,
+                beam_size=WHISPER_BEAM_SIZE,
+                vad_filter=True,
+                vad_parameters=VAD_PARAMETERS,
+                condition_on_previous_text=False,
+            )
+            for segment in segments:
+                text = segment.text.strip()
+                if not text:
+                    continue
+                texts.append(text)
+                yield "segment", {
+                    "start": round(segment.start, 2),
+                    "end": round(segment.end, 2),
+                    "text": text,
+                    "elapsed_seconds": round(time.perf_counter() - start, 3),
+                }
+            elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["audio_seconds"] += audio_seconds
+            self.stats["processing_seconds"] += elapsed
+        rtf = elapsed / audio_seconds
+        logger.info(f"Transcribed {audio_seconds:.1f}s of audio in {elapsed:.2f}s (RTF {rtf:.3f})")
+        yield "result", {
+            "text": " ".join(texts),
+            "language": info.language,
+            "language_probability": round(info.language_probability, 3),
+            "audio_seconds": round(audio_seconds, 2),
+            "processing_seconds": round(elapsed, 3),
+            "real_time_factor": round(rtf, 4),
+        }
+
+    def transcribe(self, audio, language=None) -> dict:
+        """Transcribe audio in one call; the result includes the list of segments."""
+        segments, result = [], None
+        # Run the stream to the end so its lane slot is released here
+        for kind, event in self.stream(audio, language=language):
+            if kind == "segment":
+                segments.append(event)
+            else:
+                result = event
+        return {**result, "segments": segments}
+
+    def status(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        audio = stats["audio_seconds"]
+        return {
+            "model": self.model_size,
+            "compute_type": self.compute_type,
+            "workers": self.workers,
+            "cpu_threads": self.cpu_threads,
+            **{k: round(v, 2) if isinstance(v, float) else v for k, v in stats.items()},
+            "real_time_factor": round(stats["processing_seconds"] / audio, 4) if audio else None,
+            "admission": self.admission.status(),
+            "lane": self.lane.status() if self.lane else None,
+        }
+
+
+_transcriber = None
+_transcriber_lock = Lock()
+
+
+def get_transcriber(lane=None) -> Transcriber:
+    """
+    Process-wide transcriber; the model is loaded on first use.
+
+    Args:
+        lane: Lane for the transcriber (used by the call that loads it)
+    """
+    global _transcriber
+    if _transcriber is None:
+        with _transcriber_lock:
+            if _transcriber is None:
+                _transcriber = Transcriber(
+                    max_queue=int(os.environ.get("WHISPER_QUEUE", 8)),
+                    queue_timeout=float(os.environ.get("WHISPER_QUEUE_TIMEOUT", 30)),
+                    lane=lane,
+                )
+    return _transcriber
+
+
+def loaded_transcriber():
+    """The transcriber if it has been loaded, without loading it."""
+    return _transcriber
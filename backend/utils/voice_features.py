@@ -0,0 +1,546 @@
+"""
+Voice measures for the Parkinson's model, computed from a WAV recording.
+
+The model was trained on the 22 measures of parkinsons.csv (Little et al.,
+sustained phonations analysed with MDVP and the authors' nonlinear tools).
+``extract_features`` computes the same set from raw audio with vectorized
+NumPy DSP, in stages timed individually:
+
+- decode: PCM WAV to mono float64 in [-1, 1] (stdlib ``wave``);
+- pitch: short-time autocorrelation of all frames at once (one batched
+  FFT), normalized by the window's autocorrelation (Boersma 1993); gives
+  the F0 contour (Fo, Fhi, Flo) and, from the peak correlation of voiced
+  frames, HNR and NHR;
+- pulses: one glottal pulse per period, taken as the maximum of the
+  low-passed signal within half a local period on either side, refined by
+  parabolic interpolation;
+- perturbation: period- and amplitude-based jitter (local, absolute, RAP,
+  PPQ5, DDP) and shimmer (local, dB, APQ3, APQ5, APQ11, DDA) with the
+  Praat/MDVP definitions, as fractions like the CSV;
+- nonlinear: RPDE (recurrence period density entropy), DFA (logistic of
+  the detrended fluctuation exponent), D2 (Grassberger-Procaccia
+  correlation dimension), PPE (entropy of the whitened semitone pitch
+  sequence), and spread1/spread2 (log-variance and median absolute
+  deviation of the cycle-level pitch in semitones).
+
+The perturbation measures follow their published definitions; MDVP's exact
+pitch tracker and Little's nonlinear code are not public, so the nonlinear
+measures and NHR are faithful in method but not bit-for-bit, and values
+outside the training ranges are rejected by the feature schema as usual.
+
+``VoiceFeatureExtractor.extract_many`` processes many recordings in a
+process pool, one recording per task.
+"""
+
+import io
+import logging
+import os
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.feature_schema import PARKINSONS_ALIASES
+
+logger = logging.getLogger(__name__)
+
+# API names in parkinsons.csv column order
+FEATURE_NAMES = tuple(PARKINSONS_ALIASES.values())
+
+F0_MIN = 60.0
+F0_MAX = 600.0
+FRAME_HOP = 0.01
+VOICING_THRESHOLD = 0.45
+SILENCE_THRESHOLD = 0.05  # frame RMS relative to the loudest frame
+MIN_VOICED_SECONDS = 0.5
+MIN_PERIODS = 20
+MAX_AUDIO_SECONDS = float(os.environ.get("VOICE_MAX_SECONDS", 30))
+# Pulses are located on the signal low-passed at this frequency, which
+# keeps the first formant but not broadband noise that shifts the peaks
+PULSE_LOWPASS_HZ = 1500.0
+# Period ratio beyond which consecutive periods are treated as a tracking
+# error rather than jitter (Praat's "maximum period factor")
+MAX_PERIOD_FACTOR = 1.3
+
+# Nonlinear measures, with Little et al.'s settings at 25 kHz scaled to the
+# recording's sample rate
+REFERENCE_RATE = 25000
+EMBEDDING_DIMENSION = 4
+EMBEDDING_DELAY = 35
+RPDE_RADIUS = 0.12
+RPDE_POINTS = 3000
+RPDE_MAX_PERIOD = 1000
+DFA_SCALES = np.arange(50, 201, 10)
+D2_DIMENSION = 6
+D2_POINTS = 1000
+PPE_BINS = 30
+PPE_RANGE = 3.0  # semitones either side of the whitened mean
+
+
+class VoiceFeatureError(ValueError):
+    """Raised for audio that is unreadable or has too little voicing to measure."""
+
+
+def read_wav(data: bytes):
+    """
+    Decode a PCM WAV file.
+
+    Returns:
+        Tuple of (mono float64 signal in [-1, 1], sample rate)
+    """
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+            if rate * MAX_AUDIO_SECONDS < wav.getnframes():
+                raise VoiceFeatureError(f"Recording is longer than {MAX_AUDIO_SECONDS:g} seconds")
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise VoiceFeatureError(f"Not a PCM WAV file ({e})" if str(e) else "Not a PCM WAV file") from None
+
+    if width == 1:
+        signal = (np.frombuffer(frames, dtype=np.uint8).astype(np.float64) - 128) / 128
+    elif width == 2:
+        signal = np.frombuffer(frames, dtype="<i2") / 32768.0
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((len(raw), 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        signal = padded.view("<i4").ravel() / 2147483648.0
+    elif width == 4:
+        signal = np.frombuffer(frames, dtype="<i4") / 2147483648.0
+    else:
+        raise VoiceFeatureError(f"Unsupported sample width: {width} bytes")
+    if channels > 1:
+        signal = signal.reshape(-1, channels).mean(axis=1)
+    return signal, rate
+
+
+# -------------------------
+# Pitch
+# -------------------------
+
+def track_pitch(signal, rate):
+    """
+    Frame-wise F0 by normalized autocorrelation.
+
+    Returns:
+        Tuple of (f0 per frame with NaN where unvoiced, peak correlation per
+        frame, frame centres in samples)
+    """
+    length = int(round(3 * rate / F0_MIN))  # three periods of the lowest pitch
+    hop = int(round(FRAME_HOP * rate))
+    if len(signal) < length:
+        raise VoiceFeatureError("Recording is too short")
+    frames = sliding_window_view(signal, length)[::hop]
+    centres = np.arange(len(frames)) * hop + length // 2
+
+    window = np.hanning(length)
+    nfft = 1 << int(np.ceil(np.log2(2 * length)))
+    window_ac = np.fft.irfft(np.abs(np.fft.rfft(window, nfft)) ** 2, nfft)[:length]
+    window_ac /= window_ac[0]
+
+    centred = (frames - frames.mean(axis=1, keepdims=True)) * window
+    ac = np.fft.irfft(np.abs(np.fft.rfft(centred, nfft, axis=1)) ** 2, nfft, axis=1)[:, :length]
+    energy = ac[:, :1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ac = ac / np.where(energy > 0, energy, np.inf) / window_ac
+
+    lo, hi = int(rate / F0_MAX), min(int(rate / F0_MIN), length // 2)
+    search = ac[:, lo:hi + 1]
+    # Local maxima only, then the first one within 90% of the best (avoids
+    # choosing a multiple of the period)
+    peaks = np.zeros_like(search, dtype=bool)
+    peaks[:, 1:-1] = (search[:, 1:-1] > search[:, :-2]) & (search[:, 1:-1] >= search[:, 2:])
+    best = np.where(peaks, search, -np.inf).max(axis=1, keepdims=True)
+    chosen = np.argmax(peaks & (search >= 0.9 * best), axis=1)
+
+    rows = np.arange(len(search))
+    inner = np.clip(chosen, 1, search.shape[1] - 2)
+    left, mid, right = search[rows, inner - 1], search[rows, inner], search[rows, inner + 1]
+    denominator = left - 2 * mid + right
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shift = np.where(denominator < 0, 0.5 * (left - right) / denominator, 0.0)
+    lag = lo + inner + shift
+    strength = np.clip(mid - 0.25 * (left - right) * shift, 0.0, 1.0)
+
+    rms = np.sqrt((frames ** 2).mean(axis=1) - frames.mean(axis=1) ** 2)
+    voiced = np.isfinite(best[:, 0]) & (strength >= VOICING_THRESHOLD) & (rms >= SILENCE_THRESHOLD * rms.max())
+    f0 = np.where(voiced, rate / lag, np.nan)
+    return f0, np.where(voiced, strength, np.nan), centres
+
+
+def _median_filter(values, width=5):
+    padded = np.pad(values, width // 2, mode="edge")
+    return np.nanmedian(sliding_window_view(padded, width), axis=1)
+
+
+# -------------------------
+# Glottal pulses
+# -------------------------
+
+def lowpass(signal, rate, cutoff):
+    """Zero-phase windowed-sinc low-pass filter."""
+    if cutoff >= rate / 2:
+        return signal
+    half = int(round(2 * rate / cutoff))
+    t = np.arange(-half, half + 1)
+    kernel = np.sinc(2 * cutoff / rate * t) * np.hamming(len(t))
+    return np.convolve(signal, kernel / kernel.sum(), mode="same")
+
+
+def find_pulses(signal, rate, f0, centres):
+    """
+    Glottal pulses: per voiced stretch, the samples that are the maximum
+    within 0.45 of the stretch's median period on either side.
+
+    Returns:
+        Tuple of (periods in seconds, peak-to-peak amplitudes, valid mask)
+        for consecutive pulses. Stretches are separated by a NaN period, and
+        periods deviating from the local pitch period by more than
+        MAX_PERIOD_FACTOR are marked invalid.
+    """
+    hop = int(round(FRAME_HOP * rate))
+    smoothed = lowpass(signal, rate, PULSE_LOWPASS_HZ)
+    separator = np.array([np.nan])
+    periods, amplitudes, expected = [], [], []
+    for start, stop in zip(*_runs(np.isfinite(f0))):
+        lo = max(centres[start] - hop // 2, 0)
+        hi = min(centres[stop - 1] + hop // 2, len(signal))
+        segment, raw = smoothed[lo:hi], signal[lo:hi]
+        radius = max(int(0.45 * rate / np.median(f0[start:stop])), 1)
+        if len(segment) < 4 * radius:
+            continue
+        padded = np.pad(segment, radius, mode="constant", constant_values=-np.inf)
+        local_max = sliding_window_view(padded, 2 * radius + 1).max(axis=1)
+        peaks = np.flatnonzero(segment >= local_max)
+        peaks = peaks[(peaks > 0) & (peaks < len(segment) - 1)]
+        # Flat tops produce several equal maxima; keep the first of each
+        peaks = peaks[np.concatenate(([True], np.diff(peaks) > radius))]
+        if len(peaks) < 3:
+            continue
+
+        # Sub-sample pulse times by parabolic interpolation
+        left, mid, right = segment[peaks - 1], segment[peaks], segment[peaks + 1]
+        denominator = left - 2 * mid + right
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shift = np.where(denominator < 0, 0.5 * (left - right) / denominator, 0.0)
+        times = (peaks + np.clip(shift, -0.5, 0.5)) / rate
+
+        periods += [np.diff(times), separator]
+        amplitudes += [np.maximum.reduceat(raw, peaks)[:-1] - np.minimum.reduceat(raw, peaks)[:-1], separator]
+        local_f0 = np.interp(lo + peaks[:-1], centres[start:stop], f0[start:stop])
+        expected += [1 / local_f0, separator]
+    if not periods:
+        raise VoiceFeatureError("No voice periods found")
+
+    periods, amplitudes, expected = (np.concatenate(values) for values in (periods, amplitudes, expected))
+    with np.errstate(invalid="ignore"):
+        valid = (periods > expected / MAX_PERIOD_FACTOR) & (periods < expected * MAX_PERIOD_FACTOR)
+    return periods, amplitudes, valid
+
+
+def _runs(valid):
+    """Start/stop indices of consecutive True stretches."""
+    edges = np.diff(np.concatenate(([0], valid.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _perturbation_quotient(values, valid, points):
+    """Mean |x_i - local k-point average| over stretches of valid cycles."""
+    deviations, count = 0.0, 0
+    half = points // 2
+    for start, stop in zip(*_runs(valid)):
+        stretch = values[start:stop]
+        if len(stretch) < points:
+            continue
+        averages = sliding_window_view(stretch, points).mean(axis=1)
+        deviations += np.abs(stretch[half:len(stretch) - half] - averages).sum()
+        count += len(averages)
+    return deviations / count if count else np.nan
+
+
+def perturbation(periods, amplitudes, valid):
+    """Jitter and shimmer measures from per-cycle periods and amplitudes."""
+    pairs = valid[1:] & valid[:-1]
+    if valid.sum() < MIN_PERIODS or pairs.sum() < MIN_PERIODS - 1:
+        raise VoiceFeatureError(f"Fewer than {MIN_PERIODS} regular voice periods found")
+    mean_period = periods[valid].mean()
+    mean_amplitude = amplitudes[valid].mean()
+    period_diff = np.abs(np.diff(periods))[pairs]
+    amplitude_diff = np.abs(np.diff(amplitudes))[pairs]
+    with np.errstate(divide="ignore"):
+        ratio_db = np.abs(20 * np.log10(amplitudes[1:] / amplitudes[:-1]))[pairs]
+
+    jitter_abs = period_diff.mean()
+    rap = _perturbation_quotient(periods, valid, 3) / mean_period
+    apq3 = _perturbation_quotient(amplitudes, valid, 3) / mean_amplitude
+    triples = pairs[1:] & pairs[:-1]
+    ddp = np.abs(np.diff(periods, 2))[triples].mean() / mean_period
+    dda = np.abs(np.diff(amplitudes, 2))[triples].mean() / mean_amplitude
+    return {
+        "jitter_percent": jitter_abs / mean_period,
+        "jitter_abs": jitter_abs,
+        "rap": rap,
+        "ppq": _perturbation_quotient(periods, valid, 5) / mean_period,
+        "ddp": ddp,
+        "shimmer": amplitude_diff.mean() / mean_amplitude,
+        "shimmer_db": ratio_db[np.isfinite(ratio_db)].mean(),
+        "apq3": apq3,
+        "apq5": _perturbation_quotient(amplitudes, valid, 5) / mean_amplitude,
+        "apq": _perturbation_quotient(amplitudes, valid, 11) / mean_amplitude,
+        "dda": dda,
+    }
+
+
+# -------------------------
+# Nonlinear measures
+# -------------------------
+
+def _embed(signal, dimension, delay):
+    span = (dimension - 1) * delay
+    return sliding_window_view(signal, span + 1)[:, ::delay]
+
+
+def _voiced_excerpt(signal, rate, f0, centres, seconds):
+    """The longest voiced stretch, trimmed to at most `seconds` around its middle."""
+    starts, stops = _runs(np.isfinite(f0))
+    longest = np.argmax(stops - starts)
+    lo, hi = centres[starts[longest]], centres[stops[longest] - 1]
+    limit = int(seconds * rate)
+    if hi - lo > limit:
+        middle = (lo + hi) // 2
+        lo, hi = middle - limit // 2, middle + limit // 2
+    return signal[lo:hi]
+
+
+def rpde(signal, rate):
+    """Normalized entropy of the recurrence-time density of the embedded signal."""
+    scale = rate / REFERENCE_RATE
+    delay = max(int(round(EMBEDDING_DELAY * scale)), 1)
+    max_period = max(int(round(RPDE_MAX_PERIOD * scale)), 2)
+    x = signal / max(np.abs(signal).max(), 1e-12)
+    embedded = _embed(x, EMBEDDING_DIMENSION, delay)
+    n = len(embedded) - max_period
+    if n < 10:
+        return np.nan
+    refs = np.linspace(0, n - 1, min(RPDE_POINTS, n)).astype(int)
+    columns = [np.ascontiguousarray(embedded[:, k]) for k in range(EMBEDDING_DIMENSION)]
+    origins = [column[refs] for column in columns]
+    first_return = np.zeros(len(refs), dtype=np.int64)
+    left = np.zeros(len(refs), dtype=bool)
+    # Lags in blocks of (lags x pending points); stops once every point has
+    # returned, typically after a couple of pitch periods
+    pending = np.arange(len(refs))
+    for start in range(1, max_period + 1, 64):
+        lags = np.arange(start, min(start + 64, max_period + 1))
+        index = refs[pending][None, :] + lags[:, None]
+        squared = sum((column[index] - origin[pending]) ** 2 for column, origin in zip(columns, origins))
+        outside = squared >= RPDE_RADIUS ** 2
+        has_left = left[pending][None, :] | np.maximum.accumulate(outside, axis=0)
+        returned = has_left & ~outside
+        hit = returned.any(axis=0)
+        first_return[pending[hit]] = lags[np.argmax(returned[:, hit], axis=0)]
+        left[pending] |= outside.any(axis=0)
+        pending = pending[~hit]
+        if len(pending) == 0:
+            break
+    times = first_return[first_return > 0]
+    if len(times) == 0:
+        return np.nan
+    density = np.bincount(times, minlength=max_period + 1)[1:] / len(times)
+    density = density[density > 0]
+    return float(-(density * np.log(density)).sum() / np.log(max_period))
+
+
+def dfa(signal, rate):
+    """Logistic of the detrended fluctuation scaling exponent (Little et al.'s normalization)."""
+    scales = np.unique(np.maximum((DFA_SCALES * rate / REFERENCE_RATE).round().astype(int), 4))
+    profile = np.cumsum(signal - signal.mean())
+    fluctuation = []
+    for n in scales:
+        windows = profile[:len(profile) // n * n].reshape(-1, n)
+        t = np.arange(n) - (n - 1) / 2
+        centred = windows - windows.mean(axis=1, keepdims=True)
+        slope = centred @ t / (t @ t)
+        residual = centred - slope[:, None] * t
+        fluctuation.append(np.sqrt((residual ** 2).mean()))
+    alpha = np.polyfit(np.log(scales), np.log(fluctuation), 1)[0]
+    return float(1 / (1 + np.exp(-alpha)))
+
+
+def correlation_dimension(signal, rate):
+    """Grassberger-Procaccia D2: slope of log C(r) against log r."""
+    delay = max(int(round(EMBEDDING_DELAY * rate / REFERENCE_RATE)), 1)
+    embedded = _embed(signal / max(np.abs(signal).max(), 1e-12), D2_DIMENSION, delay)
+    idx = np.linspace(0, len(embedded) - 1, min(D2_POINTS, len(embedded))).astype(int)
+    points = embedded[idx]
+    squared = (points ** 2).sum(axis=1)
+    d2 = squared[:, None] + squared[None, :] - 2 * points @ points.T
+    # Theiler window: ignore pairs closer in time than the embedding delay
+    far = np.abs(idx[:, None] - idx[None, :]) > delay
+    distances = np.sqrt(np.maximum(d2[np.triu(far, 1)], 0))
+    distances = distances[distances > 0]
+    if len(distances) < 100:
+        return np.nan
+    radii = np.geomspace(*np.percentile(distances, [1, 20]), 12)
+    counts = np.searchsorted(np.sort(distances), radii) / len(distances)
+    return float(np.polyfit(np.log(radii), np.log(counts), 1)[0])
+
+
+def pitch_entropy(cycle_f0, valid):
+    """
+    PPE, spread1 and spread2 from the cycle-level pitch sequence.
+
+    PPE: semitone pitch is whitened with a 2nd-order linear predictor (fitted
+    over consecutive valid cycles) and the entropy of the residual
+    distribution is normalized to [0, 1].
+    """
+    semitones = 12 * np.log2(cycle_f0 / np.median(cycle_f0[valid]))
+    usable = valid[2:] & valid[1:-1] & valid[:-2]
+    design = np.column_stack([semitones[1:-1], semitones[:-2], np.ones(len(semitones) - 2)])[usable]
+    target = semitones[2:][usable]
+    coefficients = np.linalg.lstsq(design, target, rcond=None)[0]
+    residual = target - design @ coefficients
+    histogram = np.histogram(residual - residual.mean(), bins=PPE_BINS, range=(-PPE_RANGE, PPE_RANGE))[0]
+    p = histogram[histogram > 0] / histogram.sum()
+    return {
+        "spread1": float(np.log(max(semitones[valid].var(), 1e-12))),
+        "spread2": float(np.median(np.abs(semitones[valid] - np.median(semitones[valid])))),
+        "ppe": float(-(p * np.log(p)).sum() / np.log(PPE_BINS)),
+    }
+
+
+# -------------------------
+# Pipeline
+# -------------------------
+
+def extract_features(data: bytes) -> dict:
+    """
+    Compute the parkinsons.csv voice measures from a WAV recording.
+
+    Returns:
+        {"features": {api name: value}, "timings_ms": {stage: ms},
+        "audio": {"seconds", "sample_rate", "voiced_seconds", "periods"}}
+
+    Raises:
+        VoiceFeatureError: unreadable audio or too little voicing
+    """
+    timings = {}
+    clock = time.perf_counter()
+
+    def lap(stage):
+        nonlocal clock
+        now = time.perf_counter()
+        timings[stage] = round((now - clock) * 1000, 3)
+        clock = now
+
+    signal, rate = read_wav(data)
+    if len(signal) == 0 or not np.any(signal):
+        raise VoiceFeatureError("Recording is silent")
+    lap("decode")
+
+    f0, strength, centres = track_pitch(signal, rate)
+    voiced_seconds = np.isfinite(f0).sum() * FRAME_HOP
+    if voiced_seconds < MIN_VOICED_SECONDS:
+        raise VoiceFeatureError(f"Less than {MIN_VOICED_SECONDS:g}s of voiced speech found")
+    smoothed = _median_filter(f0)[np.isfinite(f0)]
+    r = strength[np.isfinite(strength)].clip(1e-6, 1 - 1e-6)
+    features = {
+        "fo": float(np.mean(smoothed)),
+        "fhi": float(np.max(smoothed)),
+        "flo": float(np.min(smoothed)),
+        "nhr": float(np.mean((1 - r) / r)),
+        "hnr": float(np.mean(10 * np.log10(r / (1 - r)))),
+    }
+    lap("pitch")
+
+    periods, amplitudes, valid = find_pulses(signal, rate, f0, centres)
+    lap("pulses")
+
+    features.update(perturbation(periods, amplitudes, valid))
+    lap("perturbation")
+
+    excerpt = _voiced_excerpt(signal, rate, f0, centres, seconds=1.0)
+    features["rpde"] = rpde(excerpt, rate)
+    features["dfa"] = dfa(excerpt, rate)
+    features["d2"] = correlation_dimension(excerpt, rate)
+    features.update(pitch_entropy(1 / np.where(periods > 0, periods, np.nan), valid))
+    lap("nonlinear")
+
+    timings["total"] = round(sum(timings.values()), 3)
+    return {
+        "features": {name: float(f"{features[name]:.6g}") for name in FEATURE_NAMES},
+        "timings_ms": timings,
+        "audio": {
+            "seconds": round(len(signal) / rate, 3),
+            "sample_rate": rate,
+            "voiced_seconds": round(float(voiced_seconds), 2),
+            "periods": int(valid.sum()),
+        },
+    }
+
+
+def _extract_or_error(data: bytes) -> dict:
+    # Worker entry point: errors come back as values (they fail one
+    # recording, not the batch)
+    try:
+        return extract_features(data)
+    except VoiceFeatureError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        logger.exception("Voice feature extraction failed")
+        return {"error": f"Feature extraction failed: {e}"}
+
+
+class VoiceFeatureExtractor:
+    """
+    Args:
+        workers: Extraction processes (defaults to the CPU count)
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def extract_many(self, recordings):
+        """
+        Extract features for several WAV recordings, in input order.
+
+        A single recording (or a single worker) is processed in-process;
+        otherwise one recording per pool task.
+
+        Returns:
+            List of extract_features() results, or {"error": message} for
+            recordings that could not be measured
+        """
+        recordings = list(recordings)
+        if len(recordings) <= 1 or self.workers == 1:
+            return [_extract_or_error(data) for data in recordings]
+        return list(self._executor().map(_extract_or_error, recordings))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_extractor = None
+_extractor_lock = Lock()
+
+
+def get_extractor():
+    """Process-wide extractor (the process pool starts on first batch)."""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = VoiceFeatureExtractor(workers=int(os.environ.get("VOICE_WORKERS", 0)) or None)
+    return _extractor
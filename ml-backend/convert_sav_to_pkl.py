@@ -1,31 +1,24 @@
-import joblib
-import os
+"""
+Convert the original .sav models into versioned artifacts.
 
-# Source folder where your .sav files are
-source_folder = "models/Multiple-Disease-Prediction-System-main"
+Thin wrapper around backend/utils/model_artifacts.py: models are converted in
+parallel and recorded in backend/models/artifacts/manifest.json, which
+backend/app.py reads at startup. Extra arguments are passed through, e.g.
 
-# Destination folder for .pkl files
-dest_folder = "models"
-os.makedirs(dest_folder, exist_ok=True)
+    python ml-backend/convert_sav_to_pkl.py --compress auto
+"""
 
-# List of model files
-model_files = [
-    "diabetes_model.sav",
-    "heart_disease_model.sav",
-    "parkinsons_model.sav"
-]
+import sys
+from pathlib import Path
 
-for file in model_files:
-    sav_path = os.path.join(source_folder, file)
-    pkl_name = file.replace(".sav", ".pkl")
-    pkl_path = os.path.join(dest_folder, pkl_name)
-    
-    # Load .sav model
-    model = joblib.load(sav_path)
-    
-    # Save as .pkl
-    joblib.dump(model, pkl_path)
-    print(f"Converted {file} → {pkl_name}")
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
 
-print("All models converted successfully!")
+from utils.model_artifacts import main  # noqa: E402
 
+if __name__ == "__main__":
+    # Source folder where the .sav files are
+    source_folder = BACKEND_DIR / "models" / "ml" / "Multiple-Disease-Prediction-System-main"
+    if "--source-dir" not in sys.argv:
+        sys.argv[1:1] = ["--source-dir", str(source_folder)]
+    main()